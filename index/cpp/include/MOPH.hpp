@@ -0,0 +1,196 @@
+// SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+//
+// SPDX-License-Identifier: ISC
+
+// Format of the MOPH tables created by build.cpp and reader shared by lookup.cpp
+// and moph.cpp.
+//
+// The keys (OCIs) are hashed with XXH64 and routed to a shard according to the
+// MOPH_BUCKET_BITS most significant bits of the hash. The output directory contains:
+//   - manifest.tsv: tab separated lines, "hash xxh64", "buckets <n>",
+//     "file <archive> <member>" for each member of the dump (in order, the
+//     position is the file id) and "shard <name> <first bucket> <last bucket> <keys>";
+//   - <name>.bin: the BBHash function of the shard, built over the key hashes;
+//   - <name>.off: one little-endian record of MOPH_SLOT_SIZE bytes for each slot of
+//     the hash function, made of the key hash (uint64, used as fingerprint to
+//     reject the keys not in the table), the file id (uint32) and the offset of
+//     the OCI in the file (uint32).
+
+#pragma once
+#include <fstream>
+#include <sstream>
+#include <string>
+#include <vector>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include "BooPHF.h"
+
+#include "StringHasher.hpp"
+
+using namespace std;
+
+#define MOPH_BUCKET_BITS 8
+#define MOPH_BUCKETS (1 << MOPH_BUCKET_BITS)
+#define MOPH_SLOT_SIZE 16
+#define MOPH_MANIFEST "manifest.tsv"
+
+typedef boomphf::mphf<uint64_t, boomphf::SingleHashFunctor<uint64_t>> boophf_t;
+
+struct moph_slot
+{
+    uint64_t hash;
+    uint32_t file;
+    uint32_t offset;
+};
+
+static inline uint64_t moph_hash(const char *key, size_t len)
+{
+    return xxh64(key, len, 0);
+}
+
+static inline uint32_t moph_bucket(uint64_t hash)
+{
+    return hash >> (64 - MOPH_BUCKET_BITS);
+}
+
+static inline void moph_encode_slot(const moph_slot &slot, unsigned char *out)
+{
+    for (int i = 0; i < 8; i++)
+        out[i] = (slot.hash >> (8 * i)) & 0xFF;
+    for (int i = 0; i < 4; i++)
+    {
+        out[8 + i] = (slot.file >> (8 * i)) & 0xFF;
+        out[12 + i] = (slot.offset >> (8 * i)) & 0xFF;
+    }
+}
+
+static inline moph_slot moph_decode_slot(const unsigned char *in)
+{
+    moph_slot slot;
+    slot.hash = xxh_read64(in);
+    slot.file = xxh_read32(in + 8);
+    slot.offset = xxh_read32(in + 12);
+    return slot;
+}
+
+class MOPHIndex
+{
+public:
+    // Files of the dump, as pairs (archive, member), indexed by file id
+    vector<pair<string, string>> files;
+
+    MOPHIndex()
+    {
+        for (int i = 0; i < MOPH_BUCKETS; i++)
+            route[i] = -1;
+    }
+
+    ~MOPHIndex()
+    {
+        for (shard_info shard : shards)
+        {
+            delete shard.moph;
+            if (shard.map_size)
+                munmap((void *)shard.slots, shard.map_size);
+        }
+    }
+
+    // Load the manifest and all the shards in the directory specified
+    bool open(const string &moph_dir)
+    {
+        ifstream manifest(moph_dir + "/" + MOPH_MANIFEST);
+        if (!manifest.is_open())
+            return false;
+        string line;
+        while (getline(manifest, line))
+        {
+            vector<string> fields;
+            istringstream split(line);
+            for (string field; getline(split, field, '\t');)
+                fields.push_back(field);
+            if (fields.empty())
+                continue;
+
+            if (fields[0] == "hash" && (fields.size() != 2 || fields[1] != "xxh64"))
+                return false;
+            else if (fields[0] == "buckets" && (fields.size() != 2 || stoi(fields[1]) != MOPH_BUCKETS))
+                return false;
+            else if (fields[0] == "file" && fields.size() == 3)
+                files.push_back(make_pair(fields[1], fields[2]));
+            else if (fields[0] == "shard" && fields.size() == 5)
+            {
+                shard_info shard;
+                string filename = moph_dir + "/" + fields[1];
+
+                ifstream moph_fin(filename + ".bin", ios::in | ios::binary);
+                if (!moph_fin.is_open())
+                    return false;
+                shard.moph = new boophf_t();
+                shard.moph->load(moph_fin);
+
+                int fd = ::open((filename + ".off").c_str(), O_RDONLY);
+                struct stat st;
+                if (fd < 0 || fstat(fd, &st) != 0 || st.st_size == 0)
+                {
+                    if (fd >= 0)
+                        close(fd);
+                    delete shard.moph;
+                    return false;
+                }
+                shard.map_size = st.st_size;
+                shard.n_slots = st.st_size / MOPH_SLOT_SIZE;
+                shard.slots = (const unsigned char *)mmap(NULL, st.st_size, PROT_READ, MAP_SHARED, fd, 0);
+                close(fd);
+                if (shard.slots == MAP_FAILED)
+                {
+                    delete shard.moph;
+                    return false;
+                }
+
+                for (int i = stoi(fields[2]); i <= stoi(fields[3]); i++)
+                    route[i] = shards.size();
+                shards.push_back(shard);
+            }
+        }
+        return true;
+    }
+
+    // Number of keys stored in the tables
+    uint64_t size() const
+    {
+        uint64_t n = 0;
+        for (shard_info shard : shards)
+            n += shard.n_slots;
+        return n;
+    }
+
+    // Check if the key is in the tables, when found its slot is stored in 'slot'
+    bool lookup(const char *key, size_t len, moph_slot &slot) const
+    {
+        uint64_t hash = moph_hash(key, len);
+        int shard_index = route[moph_bucket(hash)];
+        if (shard_index < 0)
+            return false;
+        const shard_info &shard = shards[shard_index];
+        uint64_t position = shard.moph->lookup(hash);
+        if (position >= shard.n_slots)
+            return false;
+        slot = moph_decode_slot(shard.slots + position * MOPH_SLOT_SIZE);
+        return slot.hash == hash;
+    }
+
+private:
+    struct shard_info
+    {
+        boophf_t *moph;
+        const unsigned char *slots;
+        size_t n_slots;
+        size_t map_size;
+    };
+
+    vector<shard_info> shards;
+    int route[MOPH_BUCKETS];
+};
@@ -1,24 +1,122 @@
 // SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 // SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 // SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+// SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 //
 // SPDX-License-Identifier: ISC
 
 #pragma once
 #include <iostream>
+#include <cstdint>
+#include <cstring>
 
 using namespace std;
 
+// XXH64 (https://github.com/Cyan4973/xxHash), the result is the same of the
+// reference implementation for the same input and seed
+static const uint64_t XXH_PRIME64_1 = 11400714785074694791ULL;
+static const uint64_t XXH_PRIME64_2 = 14029467366897019727ULL;
+static const uint64_t XXH_PRIME64_3 = 1609587929392839161ULL;
+static const uint64_t XXH_PRIME64_4 = 9650029242287828579ULL;
+static const uint64_t XXH_PRIME64_5 = 2870177450012600261ULL;
+
+static inline uint64_t xxh_rotl64(uint64_t x, int r)
+{
+    return (x << r) | (x >> (64 - r));
+}
+
+static inline uint64_t xxh_read64(const unsigned char *p)
+{
+    uint64_t v = 0;
+    for (int i = 7; i >= 0; i--)
+        v = (v << 8) | p[i];
+    return v;
+}
+
+static inline uint64_t xxh_read32(const unsigned char *p)
+{
+    return (uint64_t)p[0] | ((uint64_t)p[1] << 8) | ((uint64_t)p[2] << 16) | ((uint64_t)p[3] << 24);
+}
+
+static inline uint64_t xxh_round(uint64_t acc, uint64_t input)
+{
+    acc += input * XXH_PRIME64_2;
+    acc = xxh_rotl64(acc, 31);
+    return acc * XXH_PRIME64_1;
+}
+
+static inline uint64_t xxh_merge_round(uint64_t acc, uint64_t val)
+{
+    acc ^= xxh_round(0, val);
+    return acc * XXH_PRIME64_1 + XXH_PRIME64_4;
+}
+
+static inline uint64_t xxh64(const char *input, size_t len, uint64_t seed = 0)
+{
+    const unsigned char *p = (const unsigned char *)input;
+    const unsigned char *end = p + len;
+    uint64_t h64;
+
+    if (len >= 32)
+    {
+        const unsigned char *limit = end - 32;
+        uint64_t v1 = seed + XXH_PRIME64_1 + XXH_PRIME64_2;
+        uint64_t v2 = seed + XXH_PRIME64_2;
+        uint64_t v3 = seed;
+        uint64_t v4 = seed - XXH_PRIME64_1;
+        do
+        {
+            v1 = xxh_round(v1, xxh_read64(p));
+            v2 = xxh_round(v2, xxh_read64(p + 8));
+            v3 = xxh_round(v3, xxh_read64(p + 16));
+            v4 = xxh_round(v4, xxh_read64(p + 24));
+            p += 32;
+        } while (p <= limit);
+        h64 = xxh_rotl64(v1, 1) + xxh_rotl64(v2, 7) + xxh_rotl64(v3, 12) + xxh_rotl64(v4, 18);
+        h64 = xxh_merge_round(h64, v1);
+        h64 = xxh_merge_round(h64, v2);
+        h64 = xxh_merge_round(h64, v3);
+        h64 = xxh_merge_round(h64, v4);
+    }
+    else
+    {
+        h64 = seed + XXH_PRIME64_5;
+    }
+    h64 += (uint64_t)len;
+
+    while (p + 8 <= end)
+    {
+        h64 ^= xxh_round(0, xxh_read64(p));
+        h64 = xxh_rotl64(h64, 27) * XXH_PRIME64_1 + XXH_PRIME64_4;
+        p += 8;
+    }
+    if (p + 4 <= end)
+    {
+        h64 ^= xxh_read32(p) * XXH_PRIME64_1;
+        h64 = xxh_rotl64(h64, 23) * XXH_PRIME64_2 + XXH_PRIME64_3;
+        p += 4;
+    }
+    while (p < end)
+    {
+        h64 ^= (*p) * XXH_PRIME64_5;
+        h64 = xxh_rotl64(h64, 11) * XXH_PRIME64_1;
+        p++;
+    }
+
+    h64 ^= h64 >> 33;
+    h64 *= XXH_PRIME64_2;
+    h64 ^= h64 >> 29;
+    h64 *= XXH_PRIME64_3;
+    h64 ^= h64 >> 32;
+    return h64;
+}
+
 class StringHasher
 {
 public:
     // the class should have operator () with this signature :
-    uint64_t operator()(string key, uint64_t seed = 0) const
+    uint64_t operator()(const string &key, uint64_t seed = 0) const
     {
-        uint64_t hash = hash_fn(key);
-        hash ^= seed;
-        return hash;
+        return xxh64(key.data(), key.size(), seed);
     }
-
-    hash<string> hash_fn;
-};
\ No newline at end of file
+};
@@ -1,6 +1,7 @@
 // SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 // SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 // SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+// SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 //
 // SPDX-License-Identifier: ISC
 
@@ -23,10 +24,9 @@ error "Missing the <filesystem> header."
 #include <thread>
 #include <algorithm>
 #include <iterator>
+#include <sys/time.h>
 
-#include "BooPHF.h"
-
-#include "StringHasher.hpp"
+#include "MOPH.hpp"
 
 using namespace std;
 
@@ -44,22 +44,78 @@ void usage(const char *basename)
             "  -o, --output=DIRNAME\t"
             "Path to the output directory.\n"
             "  -b, --batchsize=batchsize\t"
-            "Batch size to use to create hash tables, by default is 5E7.\n";
+            "Maximum number of keys of each hash table (unless a single bucket is larger), by default is 5E7.\n";
 }
 
-typedef boomphf::mphf<string, StringHasher> boophf_t;
+// The records of the buckets on disk are the slots followed by a second hash of
+// the key, which tells apart the keys sharing the same hash (fingerprint)
+#define BUILD_RECORD_SIZE (MOPH_SLOT_SIZE + 8)
+
+struct build_record
+{
+    moph_slot slot;
+    uint64_t check;
+};
+
+static inline uint64_t build_check(const char *key, size_t len)
+{
+    return xxh64(key, len, 1);
+}
+
+string bucket_filename(string output, uint bucket)
+{
+    return (filesystem::path(output) / filesystem::path("bucket_" + to_string(bucket) + ".tmp")).string();
+}
 
-void save_moph(vector<string> input_keys, vector<pair<uint, uint>> input_keys_offsets, bool verbose, uint workers, string filename)
+uint64_t save_moph(vector<build_record> &slots, bool verbose, uint workers, string filename)
 {
     boophf_t *bphf = NULL;
     double t_begin, t_end;
     struct timeval timet;
 
-    uint nelem = input_keys.size();
+    // The hash is the key of the table, thus keys sharing it are stored once:
+    // the duplicated OCIs, which have the same second hash as well, and the
+    // different keys colliding on the hash, which are reported since only the
+    // first one can be looked up
+    sort(slots.begin(), slots.end(), [](const build_record &a, const build_record &b)
+         { return a.slot.hash < b.slot.hash || (a.slot.hash == b.slot.hash && a.check < b.check); });
+    uint64_t duplicates = 0;
+    uint64_t collisions = 0;
+    size_t kept = 0;
+    for (size_t i = 0; i < slots.size(); i++)
+    {
+        if (kept > 0 && slots[kept - 1].slot.hash == slots[i].slot.hash)
+        {
+            if (slots[i].check != slots[i - 1].check)
+            {
+                collisions++;
+                cerr << "Warning: in " << filename << " the key in file " << slots[i].slot.file
+                     << " at offset " << slots[i].slot.offset << " has the same hash of the key in file "
+                     << slots[kept - 1].slot.file << " at offset " << slots[kept - 1].slot.offset
+                     << ", it is dropped\n";
+            }
+            else
+                duplicates++;
+            continue;
+        }
+        slots[kept++] = slots[i];
+    }
+    slots.resize(kept);
+
+    vector<uint64_t> input_keys(slots.size());
+    for (size_t i = 0; i < slots.size(); i++)
+        input_keys[i] = slots[i].slot.hash;
+    uint64_t nelem = input_keys.size();
 
+    if (collisions > 0)
+    {
+        cerr << "Warning: " << collisions << " keys of " << filename
+             << " collide with another key on the hash and are dropped\n";
+    }
     if (verbose)
     {
-        cout << "Construct MOPH with " << nelem << " elements" << endl;
+        cout << "Construct MOPH with " << nelem << " elements (" << duplicates << " duplicates and "
+             << collisions << " colliding keys removed)\n";
     }
 
     gettimeofday(&timet, NULL);
@@ -70,7 +126,7 @@ void save_moph(vector<string> input_keys, vector<pair<uint, uint>> input_keys_of
     double gammaFactor = 2.0;
 
     // build the mphf
-    bphf = new boomphf::mphf<string, StringHasher>(nelem, input_keys, workers, gammaFactor);
+    bphf = new boophf_t(nelem, input_keys, workers, gammaFactor, verbose);
 
     gettimeofday(&timet, NULL);
     t_end = timet.tv_sec + (timet.tv_usec / 1000000.0);
@@ -78,41 +134,37 @@ void save_moph(vector<string> input_keys, vector<pair<uint, uint>> input_keys_of
 
     if (verbose)
     {
-        cout << "MOPH constructed in " << elapsed << " seconds" << endl;
-        cout << "MOPH bits per element: " << (float)(bphf->totalBitSize()) / nelem << endl;
+        cout << "MOPH constructed in " << elapsed << " seconds\n";
+        cout << "MOPH bits per element: " << (float)(bphf->totalBitSize()) / nelem << "\n";
         cout << "Saving the MOPH " << filename + ".bin"
-             << "..." << endl;
+             << "...\n";
     }
     ofstream moph_os(filename + ".bin", ios::out | ios::binary);
     bphf->save(moph_os);
+    moph_os.close();
     if (verbose)
     {
-        cout << "MOPH saved on disk" << endl;
+        cout << "MOPH saved on disk\n";
+        cout << "Saving indexed offset " << filename + ".off"
+             << "...\n";
     }
 
-    if (verbose)
-    {
-        cout << "Saving indexed offset " << filename + ".csv"
-             << "..." << endl;
-    }
-    // Save offset vector in csv format in according to lookup table ranking
-    ofstream offset_os(filename + ".csv", ios::out | ios::binary);
-    vector<pair<uint, uint>> input_keys_offsets_ordered(input_keys_offsets.size());
-    for (uint i = 0; i < input_keys_offsets.size(); i++)
-    {
-        uint position = bphf->lookup(input_keys[i]);
-        input_keys_offsets_ordered[position] = input_keys_offsets[i];
-    }
-    for (uint i = 0; i < input_keys_offsets.size(); i++)
+    // Save the slots in according to lookup table ranking, see MOPH.hpp for the format
+    vector<unsigned char> slots_ordered(nelem * MOPH_SLOT_SIZE);
+    for (uint64_t i = 0; i < nelem; i++)
     {
-        pair<uint, uint> offset = input_keys_offsets_ordered[i];
-        offset_os << offset.first << "," << offset.second << endl;
+        uint64_t position = bphf->lookup(slots[i].slot.hash);
+        moph_encode_slot(slots[i].slot, slots_ordered.data() + position * MOPH_SLOT_SIZE);
     }
+    ofstream offset_os(filename + ".off", ios::out | ios::binary);
+    offset_os.write((const char *)slots_ordered.data(), slots_ordered.size());
     offset_os.close();
+    delete bphf;
     if (verbose)
     {
-        cout << "Indexed offset saved" << endl;
+        cout << "Indexed offset saved\n";
     }
+    return collisions;
 }
 
 int main(int argc, char **argv)
@@ -142,7 +194,7 @@ int main(int argc, char **argv)
         return EXIT_FAILURE;
     };
     int workers = 1;
-    int batch_size = 5E7;
+    uint64_t batch_size = 5E7;
 
     // Parse the parameters
     int opt;
@@ -163,7 +215,7 @@ int main(int argc, char **argv)
             required_parameters--;
             break;
         case 'b':
-            batch_size = atoi(optarg);
+            batch_size = atoll(optarg);
             break;
         case 'o':
             output = optarg;
@@ -195,11 +247,20 @@ int main(int argc, char **argv)
     zip *input_archive;
     zip_stat_t f_stat;
     filesystem::path file_path;
-    size_t file_length;
+    zip_int64_t file_length;
     zip_file *input_file;
     int err = 0;
     char errstr[1024];
-    uint header = 0;
+
+    // The slots of all the keys are first partitioned on disk in buckets, according
+    // to the most significant bits of their hash, and then each group of adjacent
+    // buckets becomes a shard
+    vector<ofstream> buckets(MOPH_BUCKETS);
+    vector<uint64_t> bucket_size(MOPH_BUCKETS, 0);
+    for (uint b = 0; b < MOPH_BUCKETS; b++)
+        buckets[b].open(bucket_filename(output, b), ios::out | ios::binary);
+    vector<pair<string, string>> files;
+    unsigned char encoded[BUILD_RECORD_SIZE];
 
     // Iterate over the files in the input directory
     for (const auto &entry : filesystem::directory_iterator(input_directory))
@@ -211,7 +272,7 @@ int main(int argc, char **argv)
         {
             // Open zip archive
             if (verbose)
-                cout << "Processing : " << file_path << endl;
+                cout << "Processing : " << file_path << "\n";
             input_archive = zip_open(file_path.c_str(), 0, &err);
             if (input_archive == NULL)
             {
@@ -237,11 +298,12 @@ int main(int argc, char **argv)
                     }
                     if (verbose)
                     {
-                        cout << "\t Working on : " << f_stat.name << endl;
+                        cout << "\t Working on : " << f_stat.name << "\n";
                     }
 
                     char *buffer = (char *)calloc(f_stat.size, sizeof(char));
                     file_length = zip_fread(input_file, buffer, f_stat.size);
+                    zip_fclose(input_file);
                     if (file_length < 0)
                     {
                         zip_error_to_str(errstr, sizeof(errstr), err, errno);
@@ -250,51 +312,89 @@ int main(int argc, char **argv)
                         return EXIT_FAILURE;
                     }
 
-                    header = 1;
-                    string lines(buffer);
-                    istringstream split(lines);
-
-                    // Oci list and their offset in the file
-                    vector<string> input_keys;
-                    vector<pair<uint, uint>> input_keys_offsets;
-                    uint start = 0;
+                    moph_slot slot;
+                    slot.file = files.size();
+                    files.push_back(make_pair(file_path.filename().string(), string(f_stat.name)));
 
-                    // Read all the oci and save the position in the file
-                    for (string line; getline(split, line, '\n');)
+                    // Read all the oci, i.e. the first column of each line after the
+                    // header, and save their position in the file
+                    const char *end = buffer + file_length;
+                    const char *line = (const char *)memchr(buffer, '\n', file_length);
+                    line = line ? line + 1 : end;
+                    while (line < end)
                     {
-                        if (header)
+                        const char *line_end = (const char *)memchr(line, '\n', end - line);
+                        if (line_end == NULL)
+                            line_end = end;
+                        const char *key_end = (const char *)memchr(line, ',', line_end - line);
+                        if (key_end == NULL)
+                            key_end = line_end > line && line_end[-1] == '\r' ? line_end - 1 : line_end;
+                        if (key_end > line)
                         {
-                            start += line.length() + 2;
-                            header = 0;
-                            continue;
+                            slot.hash = moph_hash(line, key_end - line);
+                            slot.offset = line - buffer;
+                            uint bucket = moph_bucket(slot.hash);
+                            uint64_t check = build_check(line, key_end - line);
+                            moph_encode_slot(slot, encoded);
+                            for (int j = 0; j < 8; j++)
+                                encoded[MOPH_SLOT_SIZE + j] = (check >> (8 * j)) & 0xFF;
+                            buckets[bucket].write((const char *)encoded, BUILD_RECORD_SIZE);
+                            bucket_size[bucket]++;
                         }
-                        uint end = line.find(',');
-                        string oci = line.substr(0, end);
-                        input_keys.push_back(oci);
-
-                        pair<uint, uint> offset;
-                        offset.first = start;
-                        offset.second = oci.length();
-                        input_keys_offsets.push_back(offset);
-                        start += line.length() + 1;
+                        line = line_end + 1;
                     }
-                    string archive_name = file_path.filename().string();
-                    save_moph(
-                        input_keys,
-                        input_keys_offsets,
-                        verbose,
-                        workers,
-                        filesystem::path(output) / filesystem::path(archive_name.substr(0, archive_name.length() - 4) + "_" + to_string(i)));
                     free(buffer);
                 }
             }
             zip_close(input_archive);
         }
     }
+    for (uint b = 0; b < MOPH_BUCKETS; b++)
+        buckets[b].close();
+
+    // Build the shards and the manifest
+    ofstream manifest((filesystem::path(output) / filesystem::path(MOPH_MANIFEST)).string());
+    manifest << "hash\txxh64\n";
+    manifest << "buckets\t" << MOPH_BUCKETS << "\n";
+    for (pair<string, string> file : files)
+        manifest << "file\t" << file.first << "\t" << file.second << "\n";
+
+    uint first_bucket = 0;
+    uint64_t shard_size = 0;
+    uint64_t collisions = 0;
+    for (uint b = 0; b < MOPH_BUCKETS; b++)
+    {
+        shard_size += bucket_size[b];
+        bool last_bucket = b == MOPH_BUCKETS - 1;
+        if (!last_bucket && (shard_size == 0 || shard_size + bucket_size[b + 1] <= batch_size))
+            continue;
+
+        if (shard_size > 0)
+        {
+            vector<build_record> slots;
+            slots.reserve(shard_size);
+            for (uint i = first_bucket; i <= b; i++)
+            {
+                ifstream bucket_fin(bucket_filename(output, i), ios::in | ios::binary);
+                while (bucket_fin.read((char *)encoded, BUILD_RECORD_SIZE))
+                    slots.push_back({moph_decode_slot(encoded), xxh_read64(encoded + MOPH_SLOT_SIZE)});
+            }
+            string name = "shard_" + to_string(first_bucket) + "_" + to_string(b);
+            collisions += save_moph(slots, verbose, workers, (filesystem::path(output) / filesystem::path(name)).string());
+            manifest << "shard\t" << name << "\t" << first_bucket << "\t" << b << "\t" << slots.size() << "\n";
+        }
+        first_bucket = b + 1;
+        shard_size = 0;
+    }
+    manifest.close();
+    for (uint b = 0; b < MOPH_BUCKETS; b++)
+        filesystem::remove(bucket_filename(output, b));
+    if (collisions > 0)
+        cerr << "Warning: " << collisions << " keys collide with another key on the hash and cannot be looked up\n";
 
     gettimeofday(&timet, NULL);
     t_end = timet.tv_sec + (timet.tv_usec / 1000000.0);
     double elapsed = t_end - t_begin;
     cout << "The process of building the tables took " << elapsed / 60 << " minutes" << endl;
     return EXIT_SUCCESS;
-}
\ No newline at end of file
+}
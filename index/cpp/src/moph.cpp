@@ -0,0 +1,68 @@
+// SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+//
+// SPDX-License-Identifier: ISC
+
+// Shared library exposing the MOPH tables created by build.cpp to other
+// languages (e.g. Python via ctypes, see oc_index/oci/moph.py).
+//
+// Build with:
+//   g++ -O3 -std=c++17 -shared -fPIC -I../include -I../lib moph.cpp -o libmoph.so -lpthread
+
+#include <cstdint>
+#include <string>
+
+#include "MOPH.hpp"
+
+using namespace std;
+
+extern "C"
+{
+    // Load the MOPH tables stored in the directory specified, it returns NULL
+    // if they cannot be read
+    void *moph_open(const char *moph_dir)
+    {
+        MOPHIndex *moph = new MOPHIndex();
+        if (!moph->open(moph_dir))
+        {
+            delete moph;
+            return NULL;
+        }
+        return moph;
+    }
+
+    // Number of keys stored in the MOPH tables
+    uint64_t moph_size(void *moph)
+    {
+        return ((MOPHIndex *)moph)->size();
+    }
+
+    // Lookup a batch of keys. The keys are concatenated in 'buffer' and 'ends'
+    // contains the end position of each of them. The file id and the offset of
+    // each key are stored in 'files' and 'offsets', the file id is UINT32_MAX
+    // if the key is not in the tables.
+    void moph_lookup(void *moph, const char *buffer, const uint64_t *ends, uint64_t n, uint32_t *files, uint32_t *offsets)
+    {
+        MOPHIndex *index = (MOPHIndex *)moph;
+        moph_slot slot;
+        uint64_t start = 0;
+        for (uint64_t i = 0; i < n; i++)
+        {
+            if (index->lookup(buffer + start, ends[i] - start, slot))
+            {
+                files[i] = slot.file;
+                offsets[i] = slot.offset;
+            }
+            else
+            {
+                files[i] = UINT32_MAX;
+                offsets[i] = 0;
+            }
+            start = ends[i];
+        }
+    }
+
+    void moph_close(void *moph)
+    {
+        delete (MOPHIndex *)moph;
+    }
+}
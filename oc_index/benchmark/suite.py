@@ -0,0 +1,431 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import tempfile
+import traceback
+from datetime import datetime, timezone
+from functools import partial
+from time import perf_counter
+from urllib.parse import quote
+
+import redis
+
+from oc_index.benchmark.synthetic import SyntheticDump
+from oc_index.oci.citation import Citation
+from oc_index.oci.storer import CitationStorer
+from oc_index.scripts import cits2redis, cnc, dump_index, meta2redis
+from oc_index.utils.redis_scan import RedisScanner
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# The configuration of the index used by the scripts benchmarked
+IDBASE_URL = "https://w3id.org/oc/meta/"
+BASEURL = "https://w3id.org/oc/index/"
+AGENT = "https://w3id.org/oc/index/prov/pa/1"
+SOURCE = "https://api.crossref.org/"
+SERVICE_NAME = "OpenCitations Index"
+INDEX_IDENTIFIER = "omid"
+COLLECTION = "COCI"
+
+# The Redis DBs used, numbered from the first DB of the run
+REDIS_DBS = ("br", "ra", "metadata", "cits", "cits_cache")
+STORE_FORMATS = ("csv_data", "csv_prov", "rdf_data", "rdf_prov", "scholix_data")
+
+_logger = logging.getLogger("oc_index.benchmark")
+
+
+class BenchmarkContext(object):
+    """The synthetic data and the resources of a benchmark: a working directory, in
+    which the input files are written the first time they are needed, and the Redis
+    DBs, on a fakeredis server or, if 'redis_host' is specified, on a Redis server
+    (using the DBs from 'redis_db' on, which are flushed)."""
+
+    def __init__(self, dump, work_dir, redis_host=None, redis_port=6379, redis_db=0):
+        if redis_host is None and fakeredis is None:
+            raise ValueError(
+                "fakeredis (the 'benchmark' extra of oc-index) is needed when no "
+                "Redis server is specified"
+            )
+        self.dump = dump
+        self.work_dir = work_dir
+        self.redis_host = redis_host
+        self.redis_port = redis_port
+        self.redis_db = redis_db
+        self._server = fakeredis.FakeServer() if redis_host is None else None
+        self._files = {}
+
+    def redis(self, name, decode_responses=True):
+        db = self.redis_db + REDIS_DBS.index(name)
+        if self._server is not None:
+            return fakeredis.FakeRedis(
+                server=self._server, db=db, decode_responses=decode_responses
+            )
+        return redis.Redis(
+            host=self.redis_host,
+            port=self.redis_port,
+            db=db,
+            decode_responses=decode_responses,
+        )
+
+    def flush(self):
+        for name in REDIS_DBS:
+            self.redis(name).flushdb()
+
+    def path(self, name):
+        return os.path.join(self.work_dir, name)
+
+    def clean_path(self, name):
+        path = self.path(name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        return path
+
+    def file(self, name, writer):
+        """It returns the path of an input file, written by 'writer' (called with
+        the path) the first time."""
+        if name not in self._files:
+            self._files[name] = writer(self.path(name))
+        return self._files[name]
+
+
+def _configure(module):
+    # The globals set by the main functions of the scripts
+    module._logger = _logger
+    module.idbase_url = IDBASE_URL
+    module.baseurl = BASEURL
+    module.agent = AGENT
+    module.source = SOURCE
+    module.service_name = SERVICE_NAME
+    module.index_identifier = INDEX_IDENTIFIER
+
+
+def _redis_db(client):
+    db = meta2redis.RedisDB.__new__(meta2redis.RedisDB)
+    db.rconn = client
+    return db
+
+
+def make_citations(dump, pairs):
+    """It returns the Citation objects of the OMID pairs in input, as created by
+    dump_index."""
+    prov_date = datetime.now(tz=timezone.utc).replace(microsecond=0).isoformat(sep="T")
+    metadata = {}
+    for citing, cited in pairs:
+        for omid in (citing, cited):
+            if omid not in metadata:
+                metadata[omid] = dump.metadata(int(omid[len("omid:br/060") :]) - 1)
+
+    citations = []
+    for citing, cited in pairs:
+        m_citing = metadata[citing]
+        m_cited = metadata[cited]
+        citations.append(
+            Citation(
+                "oci:" + citing.replace("omid:br/", "") + "-" + cited.replace("omid:br/", ""),
+                IDBASE_URL + quote(citing.replace("omid:", "")),
+                m_citing["date"],
+                IDBASE_URL + quote(cited.replace("omid:", "")),
+                m_cited["date"],
+                None,
+                None,
+                1,
+                AGENT,
+                SOURCE,
+                prov_date,
+                SERVICE_NAME,
+                INDEX_IDENTIFIER,
+                IDBASE_URL + "([[XXX__decode]])",
+                "reference",
+                bool(set(m_citing["issn"]) & set(m_cited["issn"])),
+                bool(set(m_citing["orcid"]) & set(m_cited["orcid"])),
+                None,
+                "Creation of the citation",
+                None,
+            )
+        )
+    return citations
+
+
+# Each benchmark prepares its data in the context and returns the number of rows
+# processed and the function to time.
+def bench_cnc_set_cits(ctx):
+    db_br = ctx.redis("br")
+    ctx.dump.populate_redis(db_br=db_br)
+    _configure(cnc)
+    cnc.source_identifier = "doi"
+    cnc.redis_br = db_br
+    cnc.redis_cits = ctx.redis("cits")
+    pairs = ctx.dump.anyid_pairs()
+    return len(pairs), partial(cnc.set_cits, COLLECTION, True, pairs)
+
+
+def bench_cnc_gen_cits(ctx):
+    _configure(cnc)
+    cnc.redis_cits_cache = ctx.redis("cits_cache", decode_responses=False)
+    cits = {
+        citing.replace("omid:br/", "") + "-" + cited.replace("omid:br/", ""): (citing, cited)
+        for citing, cited in ctx.dump.omid_pairs()
+    }
+    return len(cits), partial(cnc.gen_cits, cits)
+
+
+def bench_citation(ctx):
+    pairs = ctx.dump.omid_pairs()
+    return len(pairs), partial(make_citations, ctx.dump, pairs)
+
+
+def bench_store(store_as, ctx):
+    citations = make_citations(ctx.dump, ctx.dump.omid_pairs())
+    storer = CitationStorer(ctx.clean_path(store_as), BASEURL, store_as=[store_as])
+    return len(citations), partial(storer.store_citation, citations)
+
+
+def bench_meta2redis_csv(ctx):
+    meta_csv = ctx.file("meta.csv", ctx.dump.write_meta_csv)
+    dbs = [_redis_db(ctx.redis(name)) for name in ("br", "ra", "metadata")]
+
+    def run():
+        with open(meta_csv, "rb") as f:
+            meta2redis._process_csv_file(f, *dbs)
+
+    return ctx.dump.brs, run
+
+
+def bench_meta2redis_rdf(ctx):
+    dump_dir = ctx.file("meta_rdf", ctx.dump.write_meta_rdf)
+    files = meta2redis._get_rdf_files(dump_dir)
+    db_br, db_ra, db_metadata = [
+        _redis_db(ctx.redis(name)) for name in ("br", "ra", "metadata")
+    ]
+
+    def run():
+        meta2redis._entities_by_id.cache_clear()
+        for filepath in files:
+            br_data, ra_data, metadata = meta2redis._extract_rdf_indexes(
+                filepath,
+                dump_dir,
+                meta2redis.BASE_IRI,
+                meta2redis.DIR_SPLIT,
+                meta2redis.ITEMS_PER_FILE,
+            )
+            db_br.flush_index(br_data)
+            db_ra.flush_index(ra_data)
+            db_metadata.flush_metadata(metadata)
+
+    return ctx.dump.brs, run
+
+
+def bench_cits2redis(ctx):
+    def write_ttl(path):
+        os.makedirs(path)
+        ctx.dump.write_index_ttl(os.path.join(path, "index.ttl"))
+        return path
+
+    ttl_dir = ctx.file("index_ttl", write_ttl)
+    return len(ctx.dump.omid_pairs()), partial(
+        cits2redis.upload2redis, ctx.redis("cits"), _logger, ttl_dir, "TTL"
+    )
+
+
+def bench_dump_index(ctx):
+    db_cits = ctx.redis("cits")
+    db_metadata = ctx.redis("metadata")
+    ctx.dump.populate_redis(db_metadata=db_metadata, db_cits=db_cits)
+    _configure(dump_index)
+    dump_index.FILE_OUTPUT_DIR = ctx.clean_path("dump")
+
+    def run():
+        scanner = RedisScanner(
+            db_cits,
+            fetch="smembers",
+            count=dump_index.CITED_BATCH_SIZE,
+            batch_size=dump_index.CITED_BATCH_SIZE,
+        )
+        batches = iter(scanner)
+        batch = next(batches, None)
+        while batch is not None:
+            cited_keys, citing_values = batch
+            batch = next(batches, None)
+            pairs, br_meta = dump_index.collect_pairs(cited_keys, citing_values, db_metadata)
+            # as in main, where each batch is processed by a new process
+            dump_index.data_to_dump.clear()
+            dump_index.process_pair(pairs, 0, br_meta, batch is None)
+
+    return len(ctx.dump.omid_pairs()), run
+
+
+BENCHMARKS = {
+    "cnc_set_cits": bench_cnc_set_cits,
+    "cnc_gen_cits": bench_cnc_gen_cits,
+    "citation": bench_citation,
+}
+BENCHMARKS.update(
+    ("store_" + store_as, partial(bench_store, store_as)) for store_as in STORE_FORMATS
+)
+BENCHMARKS.update(
+    {
+        "meta2redis_csv": bench_meta2redis_csv,
+        "meta2redis_rdf": bench_meta2redis_rdf,
+        "cits2redis": bench_cits2redis,
+        "dump_index": bench_dump_index,
+    }
+)
+
+
+def _peak_rss_kb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if platform.system() == "Darwin" else peak
+
+
+def run_benchmark(name, dump_options, repeat=3, redis_host=None, redis_port=6379, redis_db=0):
+    """It runs a benchmark 'repeat' times on the synthetic data created with
+    'dump_options' and returns its best time and throughput, with the peak RSS of
+    the process before (i.e. after creating the data) and after running it."""
+    dump = SyntheticDump(**dump_options)
+    with tempfile.TemporaryDirectory() as work_dir:
+        ctx = BenchmarkContext(dump, work_dir, redis_host, redis_port, redis_db)
+        base_rss = _peak_rss_kb()
+        best = None
+        rows = 0
+        for _ in range(max(1, repeat)):
+            ctx.flush()
+            rows, run = BENCHMARKS[name](ctx)
+            gc.collect()
+            start = perf_counter()
+            run()
+            elapsed = perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        ctx.flush()
+    return {
+        "name": name,
+        "rows": rows,
+        "seconds": best,
+        "rows_per_second": rows / best if best else None,
+        "base_rss_kb": base_rss,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def _run_child(queue, *args):
+    try:
+        queue.put(run_benchmark(*args))
+    except BaseException:
+        queue.put(traceback.format_exc())
+
+
+def run_isolated(*args):
+    """It calls run_benchmark with the arguments in input in a new process, so that
+    the peak RSS is the one of the benchmark alone."""
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_child, args=(queue,) + args)
+    process.start()
+    result = queue.get()
+    process.join()
+    if isinstance(result, str):
+        raise RuntimeError("The benchmark failed:\n" + result)
+    return result
+
+
+def run_suite(
+    names=None,
+    brs=10000,
+    degree=10,
+    skew=1.0,
+    seed=42,
+    repeat=3,
+    redis_host=None,
+    redis_port=6379,
+    redis_db=0,
+    isolate=True,
+):
+    """It runs the benchmarks specified (all, by default) and returns the report,
+    a JSON serialisable dictionary with the configuration of the run and, in
+    'results', the result of each benchmark (see run_benchmark)."""
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError("Unknown benchmarks: %s" % ", ".join(unknown))
+
+    dump_options = {"brs": brs, "degree": degree, "skew": skew, "seed": seed}
+    runner = run_isolated if isolate else run_benchmark
+    results = [
+        runner(name, dump_options, repeat, redis_host, redis_port, redis_db)
+        for name in names
+    ]
+    return {
+        "date": datetime.now(tz=timezone.utc).replace(microsecond=0).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "redis": "fakeredis" if redis_host is None else "%s:%s" % (redis_host, redis_port),
+        "dump": dump_options,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance=0.1):
+    """It returns a list of (name, ratio) tuples with the benchmarks in both reports
+    whose throughput (rows per second) is lower than the one in the baseline by more
+    than 'tolerance' (a fraction of the baseline)."""
+    baseline_rps = {r["name"]: r["rows_per_second"] for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = baseline_rps.get(result["name"])
+        if old and result["rows_per_second"] is not None:
+            ratio = result["rows_per_second"] / old
+            if ratio < 1 - tolerance:
+                regressions.append((result["name"], ratio))
+    return regressions
+
+
+def format_report(report):
+    lines = [
+        "%-20s %10s %10s %14s %14s"
+        % ("benchmark", "rows", "seconds", "rows/s", "peak RSS (MB)")
+    ]
+    for result in report["results"]:
+        peak = result["peak_rss_kb"]
+        lines.append(
+            "%-20s %10d %10.3f %14.0f %14s"
+            % (
+                result["name"],
+                result["rows"],
+                result["seconds"],
+                result["rows_per_second"] or 0,
+                "%.1f" % (peak / 1024) if peak is not None else "-",
+            )
+        )
+    return "\n".join(lines)
+
+
+def load_report(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_report(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
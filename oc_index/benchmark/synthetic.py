@@ -0,0 +1,301 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import csv
+import json
+import os
+import random
+from collections import defaultdict
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from oc_ocdm.graph.graph_entity import GraphEntity
+
+from oc_index.scripts.meta2redis import (
+    BASE_IRI,
+    DIR_SPLIT,
+    ITEMS_PER_FILE,
+    _rdf_file_for_uri,
+)
+
+# The supplier prefix of the OMIDs generated
+SUPPLIER_PREFIX = "060"
+META_CSV_FIELDS = (
+    "id",
+    "title",
+    "author",
+    "pub_date",
+    "venue",
+    "volume",
+    "issue",
+    "page",
+    "type",
+    "publisher",
+    "editor",
+)
+INDEX_CITATION_IRI = "https://w3id.org/oc/index/ci/"
+
+
+def _ref(iri):
+    return [{"@id": str(iri)}]
+
+
+def _literal(value):
+    return [{"@value": value}]
+
+
+class SyntheticDump(object):
+    """A deterministic synthetic OpenCitations Meta dump and the citations among
+    its bibliographic resources (BRs), for the benchmarks. Each BR has a DOI, a
+    publication date, a venue with an ISSN and some authors with an ORCID. Each
+    citing BR has on average 'degree' references to older BRs, drawn with a power
+    law whose exponent grows with 'skew' (0 means uniform), so that a few BRs get
+    most of the citations as in the real data. A fraction 'unknown' of the
+    references cites DOIs which are not in Meta. The same arguments always produce
+    the same data."""
+
+    def __init__(self, brs=10000, degree=10, skew=1.0, authors=3, unknown=0.05, seed=42):
+        self.brs = brs
+        self.degree = degree
+        self.skew = skew
+        self.venues = max(1, brs // 100)
+        self.ras = max(1, brs)
+
+        rng = random.Random(seed)
+        # The BRs are sorted by publication date, and cite only older BRs
+        self.dates = sorted(
+            "%d-%02d-%02d"
+            % (rng.randint(1990, 2025), rng.randint(1, 12), rng.randint(1, 28))
+            for _ in range(brs)
+        )
+        self.br_authors = []
+        self.br_venue = []
+        self.references = []
+        for idx in range(brs):
+            self.br_authors.append(
+                [rng.randrange(self.ras) for _ in range(rng.randint(1, authors))]
+            )
+            self.br_venue.append(rng.randrange(self.venues))
+            cited = {}
+            # 'degree' is an average, so it need not be an integer
+            for _ in range(rng.randint(0, round(2 * degree)) if idx else 0):
+                if rng.random() < unknown:
+                    cited[brs + rng.randrange(brs)] = None
+                else:
+                    cited[int(idx * rng.random() ** (1 + skew))] = None
+            self.references.append(list(cited))
+
+    # Identifiers
+    def known(self, idx):
+        return idx < self.brs
+
+    def omid_digits(self, idx):
+        return SUPPLIER_PREFIX + str(idx + 1)
+
+    def omid(self, idx):
+        return "omid:br/" + self.omid_digits(idx)
+
+    def doi(self, idx):
+        if self.known(idx):
+            return "doi:10.%d/syn.%d" % (1000 + idx % 100, idx)
+        return "doi:10.9999/unknown.%d" % idx
+
+    def venue_omid(self, venue):
+        return "omid:br/%s%d" % (SUPPLIER_PREFIX, self.brs + venue + 1)
+
+    def issn(self, venue):
+        return "%04d-%04d" % (1000 + venue // 10000, venue % 10000)
+
+    def ra_omid(self, ra):
+        return "omid:ra/%s%d" % (SUPPLIER_PREFIX, ra + 1)
+
+    def orcid(self, ra):
+        return "0000-0002-%04d-%04d" % (ra // 10000, ra % 10000)
+
+    def metadata(self, idx):
+        """It returns the data of a BR as stored by meta2redis."""
+        return {
+            "date": self.dates[idx],
+            "valid": True,
+            "orcid": [self.orcid(ra) for ra in self.br_authors[idx]],
+            "issn": [self.issn(self.br_venue[idx])],
+        }
+
+    # Citations
+    def citations(self):
+        """It yields the (citing, cited) pairs of BR indexes, the cited ones not in
+        Meta having an index not lower than the number of BRs."""
+        for citing, cited_list in enumerate(self.references):
+            for cited in cited_list:
+                yield citing, cited
+
+    def anyid_pairs(self):
+        """It returns the citations among DOIs, as provided by the sources."""
+        return [(self.doi(citing), self.doi(cited)) for citing, cited in self.citations()]
+
+    def omid_pairs(self):
+        """It returns the citations among the OMIDs of the BRs in Meta."""
+        return [
+            (self.omid(citing), self.omid(cited))
+            for citing, cited in self.citations()
+            if self.known(cited)
+        ]
+
+    def write_citations_csv(self, path):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["citing", "cited"])
+            writer.writerows(self.anyid_pairs())
+        return path
+
+    def write_index_ttl(self, path):
+        """It writes the citations among the OMIDs as N-Triples, as in the RDF data
+        of the index read by cits2redis."""
+        with open(path, "w", encoding="utf-8") as f:
+            for citing, cited in self.citations():
+                if self.known(cited):
+                    f.write(
+                        "<%s%s-%s> <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> "
+                        "<http://purl.org/spar/cito/Citation> .\n"
+                        % (
+                            INDEX_CITATION_IRI,
+                            self.omid_digits(citing),
+                            self.omid_digits(cited),
+                        )
+                    )
+        return path
+
+    # Meta
+    def meta_rows(self):
+        """It yields the rows of the Meta CSV dump, as dictionaries."""
+        for idx in range(self.brs):
+            venue = self.br_venue[idx]
+            yield {
+                "id": "%s %s" % (self.omid(idx), self.doi(idx)),
+                "title": "Synthetic article %d" % idx,
+                "author": "; ".join(
+                    "Author, %d [%s orcid:%s]" % (ra, self.ra_omid(ra), self.orcid(ra))
+                    for ra in self.br_authors[idx]
+                ),
+                "pub_date": self.dates[idx],
+                "venue": "Journal %d [%s issn:%s]"
+                % (venue, self.venue_omid(venue), self.issn(venue)),
+                "volume": "",
+                "issue": "",
+                "page": "",
+                "type": "journal article",
+                "publisher": "",
+                "editor": "",
+            }
+
+    def write_meta_csv(self, path):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=META_CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.meta_rows())
+        return path
+
+    def meta_entities(self):
+        """It yields the JSON-LD entities of the Meta RDF dump (BRs, identifiers,
+        agent roles and responsible agents)."""
+        base = BASE_IRI
+        ids = [0]
+
+        def identifier(scheme, value):
+            ids[0] += 1
+            uri = "%sid/%s%d" % (base, SUPPLIER_PREFIX, ids[0])
+            entity = {
+                "@id": uri,
+                str(GraphEntity.iri_uses_identifier_scheme): _ref(
+                    "http://purl.org/spar/datacite/" + scheme
+                ),
+                str(GraphEntity.iri_has_literal_value): _literal(value),
+            }
+            return uri, entity
+
+        def omid_iri(omid):
+            return base + omid[len("omid:") :]
+
+        for venue in range(self.venues):
+            id_uri, id_entity = identifier("issn", self.issn(venue))
+            yield id_entity
+            yield {
+                "@id": omid_iri(self.venue_omid(venue)),
+                "@type": [str(GraphEntity.iri_journal)],
+                str(GraphEntity.iri_has_identifier): _ref(id_uri),
+            }
+        for ra in range(self.ras):
+            id_uri, id_entity = identifier("orcid", self.orcid(ra))
+            yield id_entity
+            yield {
+                "@id": omid_iri(self.ra_omid(ra)),
+                str(GraphEntity.iri_has_identifier): _ref(id_uri),
+            }
+        ars = 0
+        for idx in range(self.brs):
+            id_uri, id_entity = identifier("doi", self.doi(idx)[len("doi:") :])
+            yield id_entity
+            ar_uris = []
+            for ra in self.br_authors[idx]:
+                ars += 1
+                ar_uri = "%sar/%s%d" % (base, SUPPLIER_PREFIX, ars)
+                ar_uris.append({"@id": ar_uri})
+                yield {
+                    "@id": ar_uri,
+                    str(GraphEntity.iri_with_role): _ref(GraphEntity.iri_author),
+                    str(GraphEntity.iri_is_held_by): _ref(omid_iri(self.ra_omid(ra))),
+                }
+            yield {
+                "@id": omid_iri(self.omid(idx)),
+                "@type": [str(GraphEntity.iri_journal_article)],
+                str(GraphEntity.iri_has_publication_date): _literal(self.dates[idx]),
+                str(GraphEntity.iri_has_identifier): _ref(id_uri),
+                str(GraphEntity.iri_is_document_context_for): ar_uris,
+                str(GraphEntity.iri_part_of): _ref(omid_iri(self.venue_omid(self.br_venue[idx]))),
+            }
+
+    def write_meta_rdf(self, dump_dir):
+        """It writes the Meta RDF dump in 'dump_dir', with the layout of the files
+        read by meta2redis (JSON-LD in ZIP files), and returns the directory."""
+        files = defaultdict(list)
+        for entity in self.meta_entities():
+            files[
+                _rdf_file_for_uri(entity["@id"], dump_dir, BASE_IRI, DIR_SPLIT, ITEMS_PER_FILE)
+            ].append(entity)
+        for path, entities in files.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            name = os.path.splitext(os.path.basename(path))[0] + ".json"
+            with ZipFile(path, "w", ZIP_DEFLATED) as zip_file:
+                zip_file.writestr(name, json.dumps([{"@graph": entities}]))
+        return dump_dir
+
+    # Redis
+    def populate_redis(self, db_br=None, db_metadata=None, db_cits=None, batch_size=10000):
+        """It stores the data in the Redis DBs specified, as written by meta2redis
+        (db_br, the OMIDs of each DOI, and db_metadata, the data of each OMID) and
+        cits2redis (db_cits, the OMIDs citing each OMID)."""
+        if db_br is not None:
+            pipe = db_br.pipeline(transaction=False)
+            for idx in range(self.brs):
+                pipe.sadd(self.doi(idx), self.omid(idx))
+                if len(pipe) >= batch_size:
+                    pipe.execute()
+            pipe.execute()
+        if db_metadata is not None:
+            for start in range(0, self.brs, batch_size):
+                db_metadata.mset(
+                    {
+                        self.omid(idx): json.dumps(self.metadata(idx))
+                        for idx in range(start, min(start + batch_size, self.brs))
+                    }
+                )
+        if db_cits is not None:
+            pipe = db_cits.pipeline(transaction=False)
+            for citing, cited in self.citations():
+                if self.known(cited):
+                    pipe.sadd(self.omid_digits(cited), self.omid_digits(citing))
+                    if len(pipe) >= batch_size:
+                        pipe.execute()
+            pipe.execute()
@@ -3,16 +3,26 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
 import importlib
 from abc import ABCMeta, abstractmethod
-from collections import deque
+from collections import ChainMap, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 from oc_index.identifier.issn import ISSNManager
 from oc_index.identifier.orcid import ORCIDManager
+from oc_index.utils.api_client import UNAVAILABLE, get_api_client
 from oc_index.utils.config import get_config
+from oc_index.utils.response_cache import get_response_cache
+
+# Number of API requests sent at the same time by prefetch
+PREFETCH_WORKERS = 8
+# Maximum number of ids whose validity and API result are kept by a finder
+MEMO_SIZE = 10000
 
 
 class ResourceFinder(metaclass=ABCMeta):
@@ -117,7 +127,70 @@ class ApiDOIResourceFinder(ResourceFinder, metaclass=ABCMeta):
     """This is the abstract class that must be implemented by any resource finder
     for a particular service which is based on DOI retrieving via HTTP REST APIs
     (Crossref, DataCite). It provides basic methods that are be used for
-    implementing the main methods of the ResourceFinder abstract class."""
+    implementing the main methods of the ResourceFinder abstract class.
+
+    The ids can be looked up in advance with prefetch, which sends the API requests
+    of many ids at the same time (through the ApiClient shared in the process, which
+    limits the requests sent to each API), so that the following get_* calls on
+    those ids do not wait for the API.
+
+    The API results and the validity of the ids are also stored in the
+    ResponseCache specified in the config, if any, shared by all the finders and
+    kept between runs, so that each id is looked up once. The negative results
+    (invalid ids, ids not found) are kept for the negative_ttl of the cache, while
+    the lookups whose API could not be reached (UNAVAILABLE) are not stored."""
+
+    def __init__(self, data={}, use_api_service=False, id_type="doi"):
+        super().__init__(data, use_api_service, id_type)
+        # The validity and the API result of the ids looked up, used for all the
+        # columns requested
+        self._valid = {}
+        self._api_results = {}
+
+    @property
+    def _client(self):
+        return get_api_client()
+
+    @property
+    def _cache(self):
+        return get_response_cache()
+
+    def _cached_lookup(self, service, ids, lookup, default=None):
+        # It returns the results of the ids, looking up with 'lookup' only the
+        # ones not in the cache, and storing in the cache the ones looked up, the
+        # negative ones for a shorter time and the UNAVAILABLE ones (returned as
+        # 'default') not at all
+        cache = self._cache
+        results = {} if cache is None else cache.get_many(service, ids)
+        missing = [i for i in ids if i not in results]
+        if missing:
+            found = lookup(missing)
+            if cache is not None:
+                positive = {}
+                negative = {}
+                for i, v in found.items():
+                    if v is not UNAVAILABLE:
+                        (positive if v else negative)[i] = v
+                cache.set_many(service, positive)
+                cache.set_many(service, negative, cache.negative_ttl)
+            results.update(
+                (i, default if v is UNAVAILABLE else v) for i, v in found.items()
+            )
+        return results
+
+    def _memo(self, memo, doi, service, lookup, default=None):
+        if doi not in memo:
+            if len(memo) >= MEMO_SIZE:
+                memo.clear()
+            memo.update(
+                self._cached_lookup(service, [doi], lambda _: {doi: lookup()}, default)
+            )
+        return memo[doi]
+
+    def _validate(self, id_string):
+        # The validity of an id, UNAVAILABLE if the API could not be reached
+        validate = getattr(self._dm, "validate", self._dm.is_valid)
+        return validate(id_string)
 
     def _get_date(self, json_obj):
         """_summary_
@@ -165,6 +238,60 @@ class ApiDOIResourceFinder(ResourceFinder, metaclass=ABCMeta):
         """
         pass
 
+    def _call_api_many(self, ids, executor):
+        """It returns a dictionary with the result of _call_api for each id,
+        calling it on the ids in the executor specified. The finders can override
+        it to use the batch lookups of their API.
+
+        Args:
+            ids (list): the normalised ids
+            executor (Executor): the executor running the API requests
+        """
+        return dict(zip(ids, executor.map(self._call_api, ids)))
+
+    def prefetch(self, id_strings, workers=PREFETCH_WORKERS):
+        """It looks up, sending up to 'workers' API requests at the same time, the
+        validity and the API result of the ids that are not in the support data,
+        once each. They are kept for the following calls of the get_* methods,
+        until prefetch is called again.
+
+        Args:
+            id_strings (iterable): the ids to look up
+            workers (int): the maximum number of API requests sent at the same time
+        """
+        self._valid = {}
+        self._api_results = {}
+        if not self._use_api_service:
+            return
+
+        ids = []
+        for id_string in id_strings:
+            normalised = self.normalise(id_string)
+            if normalised is not None and normalised not in self._data:
+                ids.append(normalised)
+        ids = list(dict.fromkeys(ids))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            self._valid = self._cached_lookup(
+                self._valid_service,
+                ids,
+                lambda missing: dict(zip(missing, executor.map(self._validate, missing))),
+                False,
+            )
+            self._api_results = self._cached_lookup(
+                self._service,
+                [i for i in ids if self._valid[i]],
+                lambda missing: self._call_api_many(missing, executor),
+            )
+
+    @property
+    def _service(self):
+        return type(self).__name__
+
+    @property
+    def _valid_service(self):
+        return "valid:" + type(self._dm).__name__
+
     # The implementation of the following methods is strictly dependent on the actual
     # implementation of the previous three methods, since they strictly reuse them
     # for returning the result.
@@ -248,7 +375,16 @@ class ApiDOIResourceFinder(ResourceFinder, metaclass=ABCMeta):
             _type_: _description_
         """
         if not id_string in self._data or self._data[id_string] is None:
-            return self._dm.is_valid(id_string)
+            doi = self.normalise(id_string)
+            if doi is None:
+                return self._dm.is_valid(id_string)
+            return self._memo(
+                self._valid,
+                doi,
+                self._valid_service,
+                lambda: self._validate(id_string),
+                False,
+            )
         else:
             return self._data[id_string]["valid"]
 
@@ -268,7 +404,9 @@ class ApiDOIResourceFinder(ResourceFinder, metaclass=ABCMeta):
             doi = self.normalise(doi_entity)
 
             if not doi in self._data:
-                json_obj = self._call_api(doi)
+                json_obj = self._memo(
+                    self._api_results, doi, self._service, lambda: self._call_api(doi)
+                )
 
                 if json_obj is not None:
                     if column == "issn":
@@ -383,15 +521,131 @@ class OMIDResourceFinder(ResourceFinder, metaclass=ABCMeta):
 class ResourceFinderHandler(object):
     """This class allows one to use multiple resource finders at the same time
     so as to find the information needed for the creation of the citations to
-    include in the index."""
+    include in the index.
+
+    The batch methods (get_dates, get_omids, share_issn_many, share_orcid_many)
+    take the data of all the ids from the datasource, if specified, with a single
+    mget, and ask each finder only the ids not found by the previous ones, once
+    each (looking them up concurrently with prefetch, for the finders using APIs)."""
 
-    def __init__(self, resource_finders):
+    def __init__(self, resource_finders, datasource=None):
         """ResourceFinderHandler constructor.
 
         Args:
             resource_finders (iterable): resource finders to use
+            datasource (DataSource, optional): the datasource from which the data
+                of the ids are taken by the batch methods. Defaults to None.
         """
         self.resource_finders = resource_finders
+        self.datasource = datasource
+
+    @contextmanager
+    def __batch_data(self, ids):
+        # The data of the ids in the datasource are added to the support data of
+        # the finders while the batch is processed
+        loaded = {}
+        if self.datasource is not None and ids:
+            loaded = {
+                k: v for k, v in self.datasource.mget(ids).items() if v is not None
+            }
+        originals = [finder._data for finder in self.resource_finders]
+        if loaded:
+            for finder in self.resource_finders:
+                finder._data = ChainMap(loaded, finder._data)
+        try:
+            yield
+        finally:
+            for finder, data in zip(self.resource_finders, originals):
+                finder._data = data
+
+    @staticmethod
+    def __prefetch(finder, ids):
+        if ids and hasattr(finder, "prefetch"):
+            finder.prefetch(ids)
+
+    def __get_many(self, id_strings, method):
+        ids = list(dict.fromkeys(id_strings))
+        result = dict.fromkeys(ids)
+        with self.__batch_data(ids):
+            missing = ids
+            for finder in self.resource_finders:
+                if not missing:
+                    break
+                self.__prefetch(finder, missing)
+                for id_string in missing:
+                    result_set = getattr(finder, method)(id_string)
+                    if result_set:
+                        if isinstance(result_set, list):
+                            result[id_string] = result_set[-1]
+                        else:
+                            result[id_string] = result_set
+                missing = [i for i in missing if result[i] is None]
+        return result
+
+    def get_dates(self, id_strings):
+        """It returns a dictionary with the date of each id, as get_date.
+
+        Args:
+            id_strings (iterable): the ids
+        """
+        return self.__get_many(id_strings, "get_pub_date")
+
+    def get_omids(self, id_strings):
+        """It returns a dictionary with the omid of each id, as get_omid.
+
+        Args:
+            id_strings (iterable): the ids
+        """
+        return self.__get_many(id_strings, "get_unified_id")
+
+    def share_issn_many(self, pairs):
+        """It returns, for each pair of ids, the same tuple returned by share_issn.
+
+        Args:
+            pairs (iterable): the pairs of ids
+        """
+        return self.__share_data_many(pairs, "get_container_issn")
+
+    def share_orcid_many(self, pairs):
+        """It returns, for each pair of ids, the same tuple returned by share_orcid.
+
+        Args:
+            pairs (iterable): the pairs of ids
+        """
+        return self.__share_data_many(pairs, "get_orcid")
+
+    def __share_data_many(self, pairs, method):
+        pairs = list(pairs)
+        ids = list(dict.fromkeys(i for pair in pairs for i in pair))
+        sets = {i: set() for i in ids}
+        result = [None] * len(pairs)
+        with self.__batch_data(ids):
+            pending = list(range(len(pairs)))
+            for finder in self.resource_finders:
+                if not pending:
+                    break
+                pending_ids = list(dict.fromkeys(i for p in pending for i in pairs[p]))
+                self.__prefetch(finder, pending_ids)
+                for id_string in pending_ids:
+                    result_set = getattr(finder, method)(id_string)
+                    if result_set:
+                        sets[id_string].update(result_set)
+
+                still_pending = []
+                for p in pending:
+                    id_string_1, id_string_2 = pairs[p]
+                    if sets[id_string_1].intersection(sets[id_string_2]):
+                        # The sets of the pair are the ones at this point, as the
+                        # other finders are not asked
+                        result[p] = (True, set(sets[id_string_1]), set(sets[id_string_2]))
+                    else:
+                        still_pending.append(p)
+                pending = still_pending
+
+        for p in pending:
+            id_string_1, id_string_2 = pairs[p]
+            result[p] = (False, set(sets[id_string_1]), set(sets[id_string_2]))
+        return result
 
     def get_date(self, id_string):
         """_summary_
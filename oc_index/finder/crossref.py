@@ -3,18 +3,20 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
-from requests import get, ConnectionError
-import requests
 from datetime import datetime
-import time
 
 from urllib.parse import quote
 
 import oc_index.utils.dictionary as dict_utils
 from oc_index.finder.base import ApiDOIResourceFinder
+from oc_index.utils.api_client import UNAVAILABLE, unavailable
+
+# Maximum number of DOIs looked up with a single request
+BATCH_SIZE = 20
 
 
 class CrossrefResourceFinder(ApiDOIResourceFinder):
@@ -78,32 +80,47 @@ class CrossrefResourceFinder(ApiDOIResourceFinder):
 
     def _call_api(self, doi_full):
         if self._use_api_service:
-            connection_timeout = 30
-            count = 3
             doi = self._dm.normalise(doi_full)
-            try:
-                r = get(self._api + quote(doi), headers=self._headers, timeout=connection_timeout)
-                if r.status_code == 200:
-                    r.encoding = "utf-8"
-                    return r.json().get("message")
-                else:
-                    return
-            except:
-                last_connection_timeout = 60
-                start_time = time.time()
-                while count:
-                    if time.time() > start_time + last_connection_timeout:
-                        return
-                    else:
-                        try:
-                            r = get(self._api + quote(doi), headers=self._headers, timeout=connection_timeout)
-                            if r.status_code == 200:
-                                r.encoding = "utf-8"
-                                return r.json().get("message")
-                            else:
-                                return
-                        except:
-                            time.sleep(1)
-                            count -= 1
-                return
-
+            # The client retries the request if the service is not reachable
+            r = self._client.get(self._api + quote(doi), headers=self._headers)
+            if unavailable(r):
+                return UNAVAILABLE
+            if r.status_code == 200:
+                r.encoding = "utf-8"
+                return r.json().get("message")
+
+    def _call_api_many(self, ids, executor):
+        # The DOIs are looked up BATCH_SIZE at a time with the 'doi' filter, which
+        # cannot be used for the DOIs containing a comma
+        single = [doi for doi in ids if "," in doi]
+        results = super()._call_api_many(single, executor)
+        batched = [doi for doi in ids if "," not in doi]
+        batches = [
+            batched[idx : idx + BATCH_SIZE] for idx in range(0, len(batched), BATCH_SIZE)
+        ]
+        for batch, items in zip(batches, executor.map(self._call_api_batch, batches)):
+            for doi in batch:
+                results[doi] = (
+                    UNAVAILABLE if items is UNAVAILABLE else items.get(self._dm.normalise(doi))
+                )
+        return results
+
+    def _call_api_batch(self, dois):
+        items = {}
+        norm_dois = [self._dm.normalise(doi) for doi in dois]
+        r = self._client.get(
+            "%s?filter=%s&rows=%d"
+            % (
+                self._api.rstrip("/"),
+                quote(",".join("doi:" + doi for doi in norm_dois)),
+                len(norm_dois),
+            ),
+            headers=self._headers,
+        )
+        if unavailable(r):
+            return UNAVAILABLE
+        if r.status_code == 200:
+            r.encoding = "utf-8"
+            for item in r.json().get("message", {}).get("items", []):
+                items[self._dm.normalise(item.get("DOI"))] = item
+        return items
@@ -3,15 +3,16 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
 from json import loads
 from urllib.parse import quote
-from requests import get
 import datetime
 import oc_index.utils.dictionary as dict_utils
 from oc_index.finder.base import ApiDOIResourceFinder
+from oc_index.utils.api_client import UNAVAILABLE, unavailable
 
 
 class DataCiteResourceFinder(ApiDOIResourceFinder):
@@ -268,7 +269,9 @@ class DataCiteResourceFinder(ApiDOIResourceFinder):
     def _call_api(self, doi_entity):
         if self._use_api_service:
             doi = self._dm.normalise(doi_entity)
-            r = get(self._api + quote(doi), headers=self._headers, timeout=30)
+            r = self._client.get(self._api + quote(doi), headers=self._headers)
+            if unavailable(r):
+                return UNAVAILABLE
             if r.status_code == 200:
                 r.encoding = "utf-8"
                 json_res = loads(r.text)
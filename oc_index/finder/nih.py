@@ -3,10 +3,10 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
-from requests import get
 from datetime import datetime
 import re
 from urllib.parse import quote
@@ -14,6 +14,7 @@ from bs4 import BeautifulSoup
 
 import oc_index.utils.dictionary as dict_utils
 from oc_index.finder.base import ApiDOIResourceFinder
+from oc_index.utils.api_client import UNAVAILABLE, unavailable
 from oc_index.identifier.issn import ISSNManager
 
 
@@ -79,11 +80,11 @@ class NIHResourceFinder(ApiDOIResourceFinder):
     def _call_api(self, pmid_full):
         if self._use_api_service:
             pmid = self._dm.normalise(pmid_full)
-            r = get(
-                self._api + quote(pmid) + "/?format=pubmed",
-                headers=self._headers,
-                timeout=30,
+            r = self._client.get(
+                self._api + quote(pmid) + "/?format=pubmed", headers=self._headers
             )
+            if unavailable(r):
+                return UNAVAILABLE
             if r.status_code == 200:
                 r.encoding = "utf-8"
                 soup = BeautifulSoup(r.text, features="lxml")
@@ -3,15 +3,16 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
-from requests import get
 from urllib.parse import quote
 from json import loads
 
 
 from oc_index.finder.base import ApiDOIResourceFinder
+from oc_index.utils.api_client import UNAVAILABLE, unavailable
 
 
 class ORCIDResourceFinder(ApiDOIResourceFinder):
@@ -52,12 +53,13 @@ class ORCIDResourceFinder(ApiDOIResourceFinder):
             self._headers["Content-Type"] = "application/json"
 
             doi = self._dm.normalise(doi_full)
-            r = get(
+            r = self._client.get(
                 self._api
                 + quote('doi-self:"%s" OR doi-self:"%s"' % (doi, doi.upper())),
                 headers=self._headers,
-                timeout=30,
             )
+            if unavailable(r):
+                return UNAVAILABLE
             if r.status_code == 200:
                 r.encoding = "utf-8"
                 json_res = loads(r.text)
@@ -102,11 +104,11 @@ class ORCIDResourceFinderPMID(ApiDOIResourceFinder):
             self._headers["Content-Type"] = "application/json"
 
             pmid = self._dm.normalise(pmid_full)
-            r = get(
-                self._api + quote('pmid-self:"%s"' % (pmid)),
-                headers=self._headers,
-                timeout=30,
+            r = self._client.get(
+                self._api + quote('pmid-self:"%s"' % (pmid)), headers=self._headers
             )
+            if unavailable(r):
+                return UNAVAILABLE
             if r.status_code == 200:
                 r.encoding = "utf-8"
                 json_res = loads(r.text)
@@ -3,44 +3,56 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
-import json
-from os.path import exists, basename, isdir, join, isfile
+from os.path import splitext
 from oc_index.utils.config import get_config
 from oc_index.glob.datasource import DataSource
-from oc_index.legacy.csv import CSVManager
+from oc_index.utils.value_store import ValueStore
 
-import json
+# The fields of the data and the options specifying their id/value CSV files
+FIELDS = {"valid": "valid_id", "date": "id_date", "orcid": "id_orcid", "issn": "id_issn"}
 
 
 class CSVDataSource(DataSource):
+    """A datasource storing the data in a SQLite database ('store' option of the
+    service, by default next to the 'valid_id' CSV), into which the id/value CSV
+    files of the fields ('valid_id', 'id_date', 'id_orcid', 'id_issn') are loaded
+    in bulk when they change. The new values are appended to the CSV files as
+    well, in batches, and at the end of each mset."""
+
     def __init__(self, service):
         super(CSVDataSource, self).__init__(service)
+        config = get_config()
+        store = config.get(service, "store", fallback="")
+        if not store:
+            store = splitext(config.get(service, "valid_id"))[0] + ".db"
 
-        self._valid_id = CSVManager(csv_path=get_config().get(service, "valid_id"))
-        self._id_date = CSVManager(csv_path=get_config().get(service, "id_date"))
-        self._id_orcid = CSVManager(csv_path=get_config().get(service, "id_orcid"))
-        self._id_issn = CSVManager(csv_path=get_config().get(service, "id_issn"))
+        csv_paths = {}
+        for field, option in FIELDS.items():
+            csv_path = config.get(service, option, fallback="")
+            if csv_path:
+                csv_paths[field] = csv_path
+        self._store = ValueStore(store, csv_paths)
+        for field, csv_path in csv_paths.items():
+            self._store.load_csv(field, csv_path)
 
-    def get(self, resource_id):
-        entry = self.new()
-        entry["valid"] = self._valid_id.get_value(resource_id)
-        entry["date"] = self._id_date.get_value(resource_id)
-        entry["issn"] = self._id_issn.get_value(resource_id)
-        entry["orcid"] = self._id_orcid.get_value(resource_id)
-        if (
-            entry["valid"] == None
-            and entry["date"] == None
-            and entry["issn"] == None
-            and entry["orcid"] == None
-        ):
+    def __entry(self, data):
+        if data is None:
             return None
+        entry = self.new()
+        for field in FIELDS:
+            entry[field] = data.get(field)
         return entry
 
+    def get(self, resource_id):
+        return self.__entry(self._store.get(resource_id))
+
     def mget(self, resources_id):
-        return {key: self.get(key) for key in resources_id}
+        data = self._store.get_many(resources_id)
+        return {key: self.__entry(data.get(key)) for key in resources_id}
 
     def set(self, resource_id, value):
         # if the value dict was compiled for the first time, the value will be True/False
@@ -49,33 +61,37 @@ class CSVDataSource(DataSource):
         # value, either "i" or "v"
         if "valid" in value.keys():
             if value["valid"] is False or value["valid"] == {"i"}:
-                self._valid_id.add_value(resource_id, "i")
+                self._store.add(resource_id, "valid", "i")
             elif value["valid"] is True or value["valid"] == {"v"}:
-                self._valid_id.add_value(resource_id, "v")
+                self._store.add(resource_id, "valid", "v")
                 # so that all the operations and transcriptions are performed only for valid ids
 
                 if "date" in value.keys():
                     if value["date"] is not None and len(value["date"]) > 0:
                         # for multiple values and to avoid self.data[id_string].add(value) TypeError: unhashable type: 'set'
                         for date in value["date"]:
-                            self._id_date.add_value(resource_id, date)
+                            self._store.add(resource_id, "date", date)
                     else:
-                        self._id_date.add_value(resource_id, "")
+                        self._store.add(resource_id, "date", "")
                 else:
-                    self._id_date.add_value(resource_id, "")
+                    self._store.add(resource_id, "date", "")
 
                 if "issn" in value.keys():
                     if value["issn"] is not None and len(value["issn"]) > 0:
                         # for multiple values and to avoid self.data[id_string].add(value) TypeError: unhashable type: 'set'
                         for issn in value["issn"]:
-                            self._id_issn.add_value(resource_id, issn)
+                            self._store.add(resource_id, "issn", issn)
 
                 if "orcid" in value.keys():
                     if value["orcid"] is not None and len(value["orcid"]) > 0:
                         # for multiple values and to avoid self.data[id_string].add(value) TypeError: unhashable type: 'set'
                         for orcid in value["orcid"]:
-                            self._id_orcid.add_value(resource_id, orcid)
+                            self._store.add(resource_id, "orcid", orcid)
 
     def mset(self, resources):
         for key in resources.keys():
             self.set(key, resources[key])
+        self._store.flush()
+
+    def close(self):
+        self._store.close()
@@ -3,99 +3,274 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
-import redis
 import json
+import threading
+from collections.abc import Mapping
+
+import redis
+from redis.exceptions import ResponseError
 
 from oc_index.utils.config import get_config
 from oc_index.glob.datasource import DataSource
+from oc_index.utils.json_stream import json_loads
+from oc_index.utils.redis_scan import scan_batches
+
+# Ids resolved by each call of the script (Lua unpacks at most ~8000 values)
+SCRIPT_BATCH = 1000
+
+# It resolves the ids in KEYS to their OMIDs (the sets in the DB ARGV[1]) and
+# returns, for each of them, the first OMID (in lexicographic order) having
+# data in the DB ARGV[2] and the data, or the first OMID and false if none has
+# data, or false if the id has no OMID. SELECT in a script does not change the
+# DB of the connection calling it.
+RESOLVE_SCRIPT = """
+redis.call("SELECT", ARGV[1])
+local candidates = {}
+for i, key in ipairs(KEYS) do
+    local omids = redis.call("SMEMBERS", key)
+    table.sort(omids)
+    candidates[i] = omids
+end
+redis.call("SELECT", ARGV[2])
+local result = {}
+for i, omids in ipairs(candidates) do
+    result[i] = false
+    if #omids > 0 then
+        result[i] = {omids[1], false}
+        for _, omid in ipairs(omids) do
+            local value = redis.call("GET", omid)
+            if value then
+                result[i] = {omid, value}
+                break
+            end
+        end
+    end
+end
+return result
+"""
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(host, port, db):
+    """It returns the connection pool to a Redis DB shared in the process, so that
+    all the datasources (and threads) using the same DB reuse its connections."""
+    key = (host, int(port), int(db))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = redis.ConnectionPool(host=key[0], port=key[1], db=key[2])
+        return _pools[key]
+
+
+class RedisValues(Mapping):
+    """The data of the ids returned by RedisDataSource.mget: the JSON values are
+    decoded only when (and the first time) they are accessed. The ids without
+    data are mapped to None."""
+
+    def __init__(self, raw, omids):
+        self._raw = raw
+        self._omids = omids
+        self._decoded = {}
+
+    def __getitem__(self, resource_id):
+        if resource_id not in self._decoded:
+            value = self._raw[resource_id]
+            if value is not None:
+                # include the OMID of the resource, if resolved, in the data
+                value = json_loads(value)
+                value["omid"] = self._omids.get(resource_id)
+            self._decoded[resource_id] = value
+        return self._decoded[resource_id]
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __contains__(self, resource_id):
+        return resource_id in self._raw
 
 
 class RedisDataSource(DataSource):
-    def __init__(self, service, use_unified_index = False):
+    """A datasource storing the data of each id as JSON in a Redis DB.
+
+    With the unified index, the data are the ones of INDEX, stored by OMID, and the
+    ids are mapped to their OMIDs through the sets in the "db_br" DB. Both steps are
+    done server side by a Lua script, with one round trip for all the ids, or, if
+    scripting is not available, with a pipeline of SMEMBERS followed by a pipeline
+    of MGET."""
+
+    def __init__(self, service, use_unified_index=False):
         super().__init__(service)
-        self._rid = None
         self.is_index = service == "INDEX"
+        config = get_config()
+        host = config.get("redis", "host")
+        port = config.get("redis", "port")
+        self.batch_size = config.getint("redis", "batch_size", fallback=10000)
 
-        _db = get_config().get(service, "db")
+        self._rid = None
         # in case we wanto to use the unified INDEX
         # > the DB storing the data is the one of INDEX
         # > the original id should be mapped to the corrisponding OMID using the "db_br" DB
         if use_unified_index:
-            _db = get_config().get("INDEX", "db")
-            self._rid = redis.Redis(
-                host=get_config().get("redis", "host"),
-                port=get_config().get("redis", "port"),
-                db=get_config().get("cnc", "db_br")
-            )
-
-        self._rdata = redis.Redis(
-            host=get_config().get("redis", "host"),
-            port=get_config().get("redis", "port"),
-            db=_db
-        )
+            _db = config.get("INDEX", "db")
+            if not self.is_index:
+                self._db_br = config.get("cnc", "db_br")
+                self._rid = redis.Redis(
+                    connection_pool=get_connection_pool(host, port, self._db_br)
+                )
+        else:
+            _db = config.get(service, "db")
+        self._db = _db
+        self._rdata = redis.Redis(connection_pool=get_connection_pool(host, port, _db))
+        self._resolve_script = self._rdata.register_script(RESOLVE_SCRIPT)
+        self._use_script = True
+
+    def _batches(self, ids, size):
+        for idx in range(0, len(ids), size):
+            yield ids[idx : idx + size]
+
+    def _resolve_with_script(self, ids):
+        pipe = self._rdata.pipeline(transaction=False)
+        for batch in self._batches(ids, SCRIPT_BATCH):
+            self._resolve_script(keys=batch, args=[self._db_br, self._db], client=pipe)
+        result = {}
+        for batch, values in zip(
+            self._batches(ids, SCRIPT_BATCH), pipe.execute()
+        ):
+            for resource_id, value in zip(batch, values):
+                if value:
+                    result[resource_id] = (value[0].decode("utf-8"), value[1])
+        return result
+
+    def _resolve_with_pipelines(self, ids):
+        pipe = self._rid.pipeline(transaction=False)
+        for resource_id in ids:
+            pipe.smembers(resource_id)
+        candidates = {
+            resource_id: sorted(omid.decode("utf-8") for omid in omids)
+            for resource_id, omids in zip(ids, pipe.execute())
+            if omids
+        }
+
+        omids = list(dict.fromkeys(o for c in candidates.values() for o in c))
+        pipe = self._rdata.pipeline(transaction=False)
+        for batch in self._batches(omids, self.batch_size):
+            pipe.mget(batch)
+        values = {}
+        for batch, batch_values in zip(
+            self._batches(omids, self.batch_size), pipe.execute()
+        ):
+            values.update(zip(batch, batch_values))
+
+        result = {}
+        for resource_id, omid_list in candidates.items():
+            found = [omid for omid in omid_list if values[omid] is not None]
+            omid = found[0] if found else omid_list[0]
+            result[resource_id] = (omid, values[omid])
+        return result
+
+    def _resolve(self, ids):
+        """It returns a dictionary mapping the ids having an OMID to a tuple with
+        the OMID and its data (None if there are none)."""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        if self._use_script:
+            try:
+                return self._resolve_with_script(ids)
+            except ResponseError:
+                # e.g. scripting is disabled or not supported by the server
+                self._use_script = False
+        return self._resolve_with_pipelines(ids)
+
+    def _mget_raw(self, ids):
+        pipe = self._rdata.pipeline(transaction=False)
+        for batch in self._batches(ids, self.batch_size):
+            pipe.mget(batch)
+        raw = {}
+        for batch, values in zip(self._batches(ids, self.batch_size), pipe.execute()):
+            raw.update(zip(batch, values))
+        return raw
 
     def get(self, resource_id):
-        org_resource_id = resource_id
-        if self._rid != None and not self.is_index:
-            resource_id = self._rid.get(resource_id)
-        if resource_id is not None:
-            redis_data = self._rdata.get(resource_id)
-            if redis_data is not None:
-                # include the resource id in the data
-                redis_data["omid"] = resource_id.decode("utf-8") if resources_id != org_resource_id else None
-                return json.loads(redis_data)
-        return None
+        return self.mget([resource_id])[resource_id]
 
     def mget(self, resources_id):
-        org_resources_id = resources_id
+        resources_id = list(dict.fromkeys(resources_id))
+        if self._rid is None:
+            return RedisValues(self._mget_raw(resources_id), {})
 
+        resolved = self._resolve(resources_id)
+        raw = dict.fromkeys(resources_id)
+        omids = {}
+        for resource_id, (omid, value) in resolved.items():
+            raw[resource_id] = value
+            omids[resource_id] = omid
+        return RedisValues(raw, omids)
+
+    def _keys(self, resources_id):
         # check if we want to use the unified index for non-INDEX services
         # > in that case resource_id should be mapped to the corresponding OMID
-        if self._rid != None and not self.is_index:
-            tmp_org_resources_id = []
-            resources_id = []
-            for i, v in enumerate(self._rid.mget(org_resources_id)):
-                if v != None:
-                    resources_id.append(v)
-                    tmp_org_resources_id.append(org_resources_id[i])
-            org_resources_id = tmp_org_resources_id
-
+        if self._rid is None:
+            return {resource_id: resource_id for resource_id in resources_id}
         return {
-            org_resources_id[i]: json.loads(v) | {"omid":resources_id[i].decode("utf-8") if resources_id[i] != org_resources_id[i] else None} if v is not None else None
-            for i, v in enumerate(self._rdata.mget(resources_id))
+            resource_id: omid for resource_id, (omid, _) in self._resolve(resources_id).items()
         }
 
+    @staticmethod
+    def _encode(value):
+        return json.dumps({k: v for k, v in value.items() if k != "omid"})
+
     def set(self, resource_id, value, rewrite=True):
-        # check if we want to use the unified index for non-INDEX services
-        # > in that case resource_id should be mapped to the corresponding OMID
-        if self._rid != None and not self.is_index:
-            resource_id = self._rid.get(resource_id)
+        """It stores the data of an id. If 'rewrite' is False, the data are merged
+        with the stored ones: the values of the lists are added to the stored lists
+        (if missing) and the other values replace the stored ones. It returns False
+        if the id has no OMID, when using the unified index."""
+        key = self._keys([resource_id]).get(resource_id)
+        if key is None:
+            return False
 
         # in case we update just part of the values
-        svalue = value
+        svalue = dict(value)
         if not rewrite:
-            for k,v in value.items():
-                if isinstance(v,list):
-                    for elem in v:
-                        if elem not in svalue[k]:
-                            svalue[k].append(v)
-                else:
-                    svalue[k] = v
-
-        return self._rdata.set(resource_id, json.dumps(svalue))
+            stored = self._rdata.get(key)
+            if stored is not None:
+                svalue = json_loads(stored)
+                for k, v in value.items():
+                    if isinstance(v, list) and isinstance(svalue.get(k), list):
+                        for elem in v:
+                            if elem not in svalue[k]:
+                                svalue[k].append(elem)
+                    else:
+                        svalue[k] = v
 
-    def mset(self, resources_id):
-        resources = resources_id
+        return self._rdata.set(key, self._encode(svalue))
 
-        # check if we want to use the unified index for non-INDEX services
-        # > in that case resource_id should be mapped to the corresponding OMID
-        if self._rid != None and not self.is_index:
-            resources = []
-            for i, v in enumerate(self._rid.mget(resources_id)):
-                if v != None:
-                    resources.append( (resources_id[i],v) )
+    def mset(self, resources):
+        """It stores the data in the dictionary in input, mapping the ids to their
+        data. The ids without an OMID are skipped, when using the unified index."""
+        keys = self._keys(list(resources))
+        data = {keys[k]: self._encode(v) for k, v in resources.items() if k in keys}
+        if not data:
+            return False
+        return self._rdata.mset(data)
 
-        return self._rdata.mset({k: json.dumps(v) for k, v in resources.items()})
+    def scan_all(self, match="*", batch_size=None):
+        """It yields a tuple (key, data) for all the keys in the DB of the data
+        matching the pattern (the OMIDs, when using the unified index), reading
+        them in batches of 'batch_size' keys with a single SCAN cursor. As in
+        SCAN, a key may be yielded more than once."""
+        batch_size = batch_size or self.batch_size
+        for keys, values in scan_batches(
+            self._rdata, match, "get", count=batch_size, batch_size=batch_size
+        ):
+            for key, value in zip(keys, values):
+                if value is not None:
+                    yield key.decode("utf-8"), json_loads(value)
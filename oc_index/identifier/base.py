@@ -3,11 +3,15 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
 from abc import ABCMeta, abstractmethod
 
+# Maximum number of ids whose normalised form is kept by each manager
+MEMO_SIZE = 100000
+
 
 class IdentifierManager(metaclass=ABCMeta):
     """This is the interface that must be implemented by any identifier manager
@@ -23,6 +27,7 @@ class IdentifierManager(metaclass=ABCMeta):
             "User-Agent": "Identifier Manager / OpenCitations Indexes "
             "(http://opencitations.net; mailto:contact@opencitations.net)"
         }
+        self._normalised = {False: {}, True: {}}
 
     @abstractmethod
     def is_valid(self, id_string):
@@ -46,3 +51,33 @@ class IdentifierManager(metaclass=ABCMeta):
             str: normalized id
         """
         pass
+
+    def normalise_many(self, id_strings, include_prefix=False, memo=True):
+        """Returns the list of the ids normalised, as done by normalise.
+
+        Args:
+            id_strings (iterable): the ids to normalize
+            include_prefix (bool, optional): indicates if include the prefix. Defaults to False.
+            memo (bool, optional): indicates if keep (up to MEMO_SIZE) the ids
+                normalised, so that the ones repeated, also in later calls, are
+                normalised once. Defaults to True.
+        Returns:
+            list: normalized ids
+        """
+        if not memo:
+            return [self.normalise(id_string, include_prefix) for id_string in id_strings]
+
+        normalised = self._normalised[include_prefix]
+        result = []
+        for id_string in id_strings:
+            try:
+                result.append(normalised[id_string])
+            except KeyError:
+                if len(normalised) >= MEMO_SIZE:
+                    normalised.clear()
+                normalised[id_string] = self.normalise(id_string, include_prefix)
+                result.append(normalised[id_string])
+            except TypeError:
+                # Unhashable ids are not kept
+                result.append(self.normalise(id_string, include_prefix))
+        return result
@@ -3,18 +3,22 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
-from re import sub, match
+import re
+from re import match
 from urllib.parse import unquote, quote
-from requests import get
 from json import loads
-from requests import ReadTimeout
-from requests.exceptions import ConnectionError
-from time import sleep
 
 from oc_index.identifier.base import IdentifierManager
+from oc_index.utils.api_client import UNAVAILABLE, get_api_client, unavailable
+
+WHITESPACES = re.compile(r"\s+")
+NULLS = re.compile("\0+")
+# The DOIs that are already normalised, but for the case
+NORMALISED_DOI = re.compile("10\\.[^\\s\0%]*")
 
 
 class DOIManager(IdentifierManager):
@@ -37,6 +41,19 @@ class DOIManager(IdentifierManager):
         Returns:
             bool: true if the doi is valid, false otherwise.
         """
+        valid = self.validate(doi)
+        return False if valid is UNAVAILABLE else valid
+
+    def validate(self, doi):
+        """Check if a doi is valid, as is_valid.
+
+        Args:
+            id_string (str): the doi to check
+
+        Returns:
+            bool: true if the doi is valid, false otherwise, or UNAVAILABLE if the
+            API could not be reached.
+        """
         doi = self.normalise(doi, include_prefix=True)
 
         if doi is None or match("^doi:10\\..+/.+$", doi) is None:
@@ -57,9 +74,12 @@ class DOIManager(IdentifierManager):
             str: the normalized doi
         """
         try:
-            doi_string = sub(
-                "\0+", "", sub("\s+", "", unquote(id_string[id_string.index("10.") :]))
-            )
+            if NORMALISED_DOI.fullmatch(id_string):
+                doi_string = id_string
+            else:
+                doi_string = NULLS.sub(
+                    "", WHITESPACES.sub("", unquote(id_string[id_string.index("10.") :]))
+                )
             return "%s%s" % (
                 self._p if include_prefix else "",
                 doi_string.lower().strip(),
@@ -71,20 +91,13 @@ class DOIManager(IdentifierManager):
     def __doi_exists(self, doi_full):
         if self._use_api_service:
             doi = self.normalise(doi_full)
-            tentative = 3
-            while tentative:
-                tentative -= 1
-                try:
-                    r = get(self._api + quote(doi), headers=self._headers, timeout=30)
-                    if r.status_code == 200:
-                        r.encoding = "utf-8"
-                        json_res = loads(r.text)
-                        return json_res.get("responseCode") == 1
-                except ReadTimeout:
-                    # Do nothing, just try again
-                    pass
-                except ConnectionError:
-                    # Sleep 5 seconds, then try again
-                    sleep(5)
+            # The client retries the request if the service is not reachable
+            r = get_api_client().get(self._api + quote(doi), headers=self._headers)
+            if unavailable(r):
+                return UNAVAILABLE
+            if r.status_code == 200:
+                r.encoding = "utf-8"
+                json_res = loads(r.text)
+                return json_res.get("responseCode") == 1
 
         return False
@@ -3,13 +3,19 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
-from re import sub, match
+import re
+from re import match
 
 from oc_index.identifier.base import IdentifierManager
 
+NOT_ISSN_CHARS = re.compile("[^X0-9]")
+# The ISSNs that are already normalised
+NORMALISED_ISSN = re.compile("[0-9]{4}-[0-9]{3}[0-9X]")
+
 
 class ISSNManager(IdentifierManager):
     """This class implements an identifier manager for issn identifier"""
@@ -46,7 +52,9 @@ class ISSNManager(IdentifierManager):
             str: the normalized issn
         """
         try:
-            issn_string = sub("[^X0-9]", "", id_string.upper())
+            if NORMALISED_ISSN.fullmatch(id_string):
+                return "%s%s" % (self._p if include_prefix else "", id_string)
+            issn_string = NOT_ISSN_CHARS.sub("", id_string.upper())
             return "%s%s-%s" % (
                 self._p if include_prefix else "",
                 issn_string[:4],
@@ -3,13 +3,19 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
-from re import sub, match
+import re
+from re import match
 
 from oc_index.identifier.base import IdentifierManager
 
+NOT_ORCID_CHARS = re.compile("[^X0-9]")
+# The ORCIDs that are already normalised
+NORMALISED_ORCID = re.compile("([0-9]{4}-){3}[0-9]{3}[0-9X]")
+
 
 class ORCIDManager(IdentifierManager):
     """This class implements an identifier manager for orcid identifier."""
@@ -46,7 +52,9 @@ class ORCIDManager(IdentifierManager):
             str: normalized orcid
         """
         try:
-            orcid_string = sub("[^X0-9]", "", id_string.upper())
+            if NORMALISED_ORCID.fullmatch(id_string):
+                return "%s%s" % (self._p if include_prefix else "", id_string)
+            orcid_string = NOT_ORCID_CHARS.sub("", id_string.upper())
             return "%s%s-%s-%s-%s" % (
                 self._p if include_prefix else "",
                 orcid_string[:4],
@@ -60,7 +68,7 @@ class ORCIDManager(IdentifierManager):
     @staticmethod
     def __check_digit(orcid):
         total = 0
-        for d in sub("[^X0-9]", "", orcid.upper())[:-1]:
+        for d in NOT_ORCID_CHARS.sub("", orcid.upper())[:-1]:
             i = 10 if d == "X" else int(d)
             total = (total + i) * 2
         reminder = total % 11
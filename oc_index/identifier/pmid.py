@@ -3,19 +3,22 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
-from re import sub, match
+import re
+from re import match
 from urllib.parse import unquote, quote
-from requests import get
 from json import loads
-from requests import ReadTimeout
-from requests.exceptions import ConnectionError
-from time import sleep
 from bs4 import BeautifulSoup
 
 from oc_index.identifier.base import IdentifierManager
+from oc_index.utils.api_client import UNAVAILABLE, get_api_client, unavailable
+
+NOT_DIGITS = re.compile(r"[^\d+]")
+NULLS = re.compile("\0+")
+LEADING_ZEROS = re.compile("^0+")
 
 
 class PMIDManager(IdentifierManager):
@@ -38,6 +41,19 @@ class PMIDManager(IdentifierManager):
         Returns:
             bool: true if the doi is valid, false otherwise.
         """
+        valid = self.validate(pmid)
+        return False if valid is UNAVAILABLE else valid
+
+    def validate(self, pmid):
+        """Check if a pmid is valid, as is_valid.
+
+        Args:
+            id_string (str): the pmid to check
+
+        Returns:
+            bool: true if the pmid is valid, false otherwise, or UNAVAILABLE if the
+            API could not be reached.
+        """
         pmid = self.normalise(pmid, include_prefix=True)
 
         if pmid is None or match("^pmid:[1-9]\d*$", pmid) is None:
@@ -59,7 +75,13 @@ class PMIDManager(IdentifierManager):
         """
         id_string = str(id_string)
         try:
-            pmid_string = sub("^0+", "", sub("\0+", "", (sub("[^\d+]", "", id_string))))
+            # The PMIDs made only of digits just lose their leading zeros
+            if id_string.isdecimal():
+                pmid_string = id_string.lstrip("0")
+            else:
+                pmid_string = LEADING_ZEROS.sub(
+                    "", NULLS.sub("", NOT_DIGITS.sub("", id_string))
+                )
             return "%s%s" % (self._p if include_prefix else "", pmid_string)
         except:
             # Any error in processing the PMID will return None
@@ -68,28 +90,18 @@ class PMIDManager(IdentifierManager):
     def __pmid_exists(self, pmid_full):
         if self._use_api_service:
             pmid = self.normalise(pmid_full)
-            tentative = 3
-            while tentative:
-                tentative -= 1
-                try:
-                    r = get(
-                        self._api + quote(pmid) + "/?format=pmid",
-                        headers=self._headers,
-                        timeout=30,
-                    )
-                    if r.status_code == 200:
-                        r.encoding = "utf-8"
-                        soup = BeautifulSoup(r.content, features="lxml")
-                        for i in soup.find_all("meta", {"name": "uid"}):
-                            id = i["content"]
-                            if id == pmid:
-                                return True
-
-                except ReadTimeout:
-                    # Do nothing, just try again
-                    pass
-                except ConnectionError:
-                    # Sleep 5 seconds, then try again
-                    sleep(5)
+            # The client retries the request if the service is not reachable
+            r = get_api_client().get(
+                self._api + quote(pmid) + "/?format=pmid", headers=self._headers
+            )
+            if unavailable(r):
+                return UNAVAILABLE
+            if r.status_code == 200:
+                r.encoding = "utf-8"
+                soup = BeautifulSoup(r.content, features="lxml")
+                for i in soup.find_all("meta", {"name": "uid"}):
+                    id = i["content"]
+                    if id == pmid:
+                        return True
 
         return False
@@ -833,6 +833,9 @@ class OCIManager(object):
         }
         self.lookup = {}
         self.inverse_lookup = {}
+        # Translation table for str.translate, i.e. ord(c) -> code
+        self.__translation = {}
+        self.__lookup_to_write = []
         self.lookup_file = lookup_file
         self.lookup_code = -1
         if self.lookup_file is not None:
@@ -843,6 +846,7 @@ class OCIManager(object):
                     for row in lookupcsv_reader:
                         self.lookup[row["code"]] = row["c"]
                         self.inverse_lookup[row["c"]] = row["code"]
+                        self.__translation[ord(row["c"])] = row["code"]
                         code = int(row["code"])
                     self.lookup_code = code
             else:
@@ -874,12 +878,12 @@ class OCIManager(object):
             self.add_message("__init__", W, "No OCI specified!")
 
     def __match_str_to_lookup(self, str_val):
-        ci_str = []
-        for c in str_val:
-            if c not in self.inverse_lookup:
-                self.__update_lookup(c)
-            ci_str.append(str(self.inverse_lookup[c]))
-        return "".join(ci_str)
+        if not self.inverse_lookup.keys() >= set(str_val):
+            # New characters get their code in order of appearance
+            for c in dict.fromkeys(str_val):
+                if c not in self.inverse_lookup:
+                    self.__update_lookup(c)
+        return str_val.translate(self.__translation)
 
     def __update_lookup(self, c):
         if c not in self.inverse_lookup:
@@ -889,7 +893,16 @@ class OCIManager(object):
                 code = "0" + code
             self.inverse_lookup[c] = code
             self.lookup[code] = c
-            self.__write_txtblock_on_csv(self.lookup_file, '\n"%s","%s"' % (c, code))
+            self.__translation[ord(c)] = code
+            self.__lookup_to_write.append('\n"%s","%s"' % (c, code))
+
+    def flush_lookup(self):
+        """It appends to the lookup file the codes added since the last call."""
+        if self.__lookup_to_write:
+            self.__write_txtblock_on_csv(
+                self.lookup_file, "".join(self.__lookup_to_write)
+            )
+            self.__lookup_to_write = []
 
     def __write_txtblock_on_csv(self, csv_path, block_txt):
         if csv_path is not None and exists(csv_path):
@@ -942,8 +955,9 @@ class OCIManager(object):
 
         # decode using lookup table only if entity identifier is "doi"
         if self.entity_identifier == "doi":
-            _citing = self.__decode_inverse(entity_1),
-            _cited = self.__decode_inverse(entity_2),
+            _citing = self.__decode_inverse(entity_1)
+            _cited = self.__decode_inverse(entity_2)
+            self.flush_lookup()
 
         self.oci = "oci:%s%s-%s%s" % (
             prefix,
@@ -953,6 +967,34 @@ class OCIManager(object):
         )
         return self.oci
 
+    def get_ocis(self, entities_1, entities_2, prefix):
+        """It returns the ocis associated to a batch of citations, the new
+        codes of the lookup table are written once at the end of the batch.
+
+        Args:
+            entities_1 (iterable): citing entities
+            entities_2 (iterable): cited entities, in the same order of the citing ones
+            prefix (str): prefix
+
+        Returns:
+            list: the ocis, in the same order of the entities
+        """
+        encoded = {}
+        ocis = []
+        for entity_1, entity_2 in zip(entities_1, entities_2):
+            _citing = entity_1
+            _cited = entity_2
+            if self.entity_identifier == "doi":
+                _citing = encoded.get(entity_1)
+                if _citing is None:
+                    _citing = encoded[entity_1] = self.__decode_inverse(entity_1)
+                _cited = encoded.get(entity_2)
+                if _cited is None:
+                    _cited = encoded[entity_2] = self.__decode_inverse(entity_2)
+            ocis.append("oci:%s%s-%s%s" % (prefix, _citing, prefix, _cited))
+        self.flush_lookup()
+        return ocis
+
     @staticmethod
     def __join(l, j_value=""):
         if type(l) is list:
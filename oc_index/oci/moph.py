@@ -0,0 +1,142 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import ctypes
+import ctypes.util
+
+from collections import OrderedDict
+from os.path import join
+from zipfile import ZipFile
+
+
+class MOPHIndex(object):
+    """This class gives read-only access to the minimal perfect hash tables
+    (MOPH) created by the C++ tool in index/cpp/src/build.cpp, in order to check
+    whether some OCIs are already included in a dump of the index.
+
+    The tables (see index/cpp/include/MOPH.hpp for their format) are loaded and
+    memory-mapped by the shared library built from index/cpp/src/moph.cpp. Each
+    slot stores the hash of its OCI as fingerprint, thus the OCIs that are not in
+    the tables are rejected without reading the dump. If the directory of the
+    zipped dump is specified, the OCIs found are also compared with the ones
+    stored in the dump, keeping in memory only the 'members' members of the dump
+    read most recently."""
+
+    MANIFEST = "manifest.tsv"
+    UINT32_MAX = 2**32 - 1
+    MEMBERS = 4
+
+    def __init__(self, moph_dir, oci_dir=None, lib_path=None, lib=None, members=MEMBERS):
+        self._oci_dir = oci_dir
+        self._max_members = max(1, members)
+        self._lib = self.__load_lib(lib_path) if lib is None else lib
+
+        self._files = []
+        with open(join(moph_dir, self.MANIFEST), encoding="utf8") as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if fields[0] == "file":
+                    self._files.append((fields[1], fields[2]))
+
+        self._handle = self._lib.moph_open(moph_dir.encode("utf-8"))
+        if not self._handle:
+            raise IOError("Cannot load the MOPH tables stored in " + moph_dir)
+        self._members = OrderedDict()
+
+    @staticmethod
+    def __load_lib(lib_path):
+        if lib_path is None:
+            lib_path = ctypes.util.find_library("moph")
+            if lib_path is None:
+                raise OSError(
+                    "The MOPH shared library (libmoph.so) cannot be found, "
+                    "build it from index/cpp/src/moph.cpp"
+                )
+        lib = ctypes.CDLL(lib_path)
+        lib.moph_open.argtypes = [ctypes.c_char_p]
+        lib.moph_open.restype = ctypes.c_void_p
+        lib.moph_size.argtypes = [ctypes.c_void_p]
+        lib.moph_size.restype = ctypes.c_uint64
+        lib.moph_lookup.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_char_p,
+            ctypes.POINTER(ctypes.c_uint64),
+            ctypes.c_uint64,
+            ctypes.POINTER(ctypes.c_uint32),
+            ctypes.POINTER(ctypes.c_uint32),
+        ]
+        lib.moph_lookup.restype = None
+        lib.moph_close.argtypes = [ctypes.c_void_p]
+        lib.moph_close.restype = None
+        return lib
+
+    def __member(self, file_id):
+        # The content of a member is read when one of its OCIs must be verified,
+        # and kept until other members are used more recently
+        if file_id in self._members:
+            self._members.move_to_end(file_id)
+        else:
+            if len(self._members) >= self._max_members:
+                self._members.popitem(last=False)
+            archive, member = self._files[file_id]
+            with ZipFile(join(self._oci_dir, archive)) as f:
+                self._members[file_id] = f.read(member)
+        return self._members[file_id]
+
+    def __len__(self):
+        return self._lib.moph_size(self._handle)
+
+    def locate(self, ocis):
+        """It returns, for each OCI in input (without the "oci:" prefix), the
+        tuple (archive, member, offset) locating it in the dump, or None if the
+        OCI is not included in the index."""
+        keys = [oci.encode("utf-8") for oci in ocis]
+        if not keys:
+            return []
+
+        ends = (ctypes.c_uint64 * len(keys))()
+        end = 0
+        for idx, key in enumerate(keys):
+            end += len(key)
+            ends[idx] = end
+        files = (ctypes.c_uint32 * len(keys))()
+        offsets = (ctypes.c_uint32 * len(keys))()
+        self._lib.moph_lookup(
+            self._handle, b"".join(keys), ends, len(keys), files, offsets
+        )
+
+        result = []
+        for key, file_id, offset in zip(keys, files, offsets):
+            location = None
+            if file_id != self.UINT32_MAX:
+                location = self._files[file_id] + (offset,)
+            result.append(location)
+
+        if self._oci_dir is not None:
+            # The OCIs are verified member by member, so that each one is read once
+            found = [idx for idx, location in enumerate(result) if location is not None]
+            for idx in sorted(found, key=lambda idx: files[idx]):
+                key = keys[idx]
+                offset = offsets[idx]
+                member = self.__member(files[idx])
+                if member[offset : offset + len(key) + 1] not in (
+                    key + b",",
+                    key + b"\n",
+                    key + b"\r",
+                ):
+                    result[idx] = None
+        return result
+
+    def contains(self, ocis):
+        """It returns a list of booleans specifying, for each OCI in input
+        (without the "oci:" prefix), if it is already included in the index."""
+        return [location is not None for location in self.locate(ocis)]
+
+    def close(self):
+        if self._handle:
+            self._lib.moph_close(self._handle)
+            self._handle = None
+        self._members.clear()
@@ -3,12 +3,15 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
 import importlib
 
 from abc import ABCMeta, abstractmethod
+from csv import DictReader
+from itertools import islice
 from os import strerror
 from os.path import exists, isfile
 from errno import ENOENT
@@ -16,14 +19,27 @@ from errno import ENOENT
 from oc_index.utils.config import get_config
 
 
+def iter_csv_rows(filename: str):
+    """It yields the rows of a CSV file as dictionaries, while reading it."""
+    with open(filename, encoding="utf8", newline="") as csv_file:
+        yield from DictReader(csv_file)
+
+
 class CitationParser(metaclass=ABCMeta):
     """This class defines the methods required to implement to
     parse a citation data file.
+
+    The citation data are streamed from the file: a parser only implements how
+    to read its items (_iter_rows) and how to get the citation data of each item
+    (_citation_data). They can be obtained either with iter_citations, or by
+    calling parse and then get_next_citation_data (or next_batch) repeatedly.
     """
 
     def __init__(self):
         self._current_item = 0
         self._items = 0
+        self._filename = None
+        self._citations = iter(())
 
     @staticmethod
     def get_parser(service):
@@ -43,6 +59,36 @@ class CitationParser(metaclass=ABCMeta):
             raise FileNotFoundError(ENOENT, strerror(ENOENT), filename)
 
     @abstractmethod
+    def _iter_rows(self, filename: str):
+        """It yields the items of the file, reading it as they are requested.
+
+        Args:
+            filename (str): path to the file
+        """
+        pass
+
+    @abstractmethod
+    def _citation_data(self, row):
+        """It returns the citation data of an item of the file (in the format
+        described in get_next_citation_data), or None if it is not valid.
+
+        Args:
+            row: the item
+        """
+        pass
+
+    def iter_citations(self, filename: str):
+        """It yields the citation data in the file, skipping the invalid items.
+
+        Args:
+            filename (str): path to the file
+        """
+        for row in self._iter_rows(filename):
+            self._current_item += 1
+            citation_data = self._citation_data(row)
+            if citation_data is not None:
+                yield citation_data
+
     def parse(self, filename: str):
         """It updates the file on which the parser is working on.
 
@@ -50,11 +96,16 @@ class CitationParser(metaclass=ABCMeta):
             filename (str): path to the new file
         """
         self._current_item = 0
-        self._items = 0
+        self._items = None
+        self._filename = filename
+        self._citations = self.iter_citations(filename)
 
     @property
     def items(self):
-        """It returns the number of items to parse."""
+        """It returns the number of items to parse, counted (by reading the
+        file) the first time it is requested."""
+        if self._items is None:
+            self._items = sum(1 for _ in self._iter_rows(self._filename))
         return self._items
 
     @property
@@ -62,7 +113,6 @@ class CitationParser(metaclass=ABCMeta):
         """It returns the index of the current element."""
         return self._current_item
 
-    @abstractmethod
     def get_next_citation_data(self):
         """This method returns the next citation data available in the file specified.
         The citation data returned is a tuple of six elements: citing id (string), cited id (string),
@@ -74,4 +124,14 @@ class CitationParser(metaclass=ABCMeta):
         Returns:
             tuple: the next citation data available in the source specified
         """
-        pass
+        return next(self._citations, None)
+
+    def next_batch(self, n: int):
+        """It returns (as a list) the next n citation data available in the file
+        specified, or less if there are not enough. The list is empty if no more
+        citation data are available.
+
+        Args:
+            n (int): the number of citation data to return
+        """
+        return list(islice(self._citations, n))
@@ -3,48 +3,59 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
 from json import load
 from oc_index.identifier.doi import DOIManager
 from oc_index.parsing.base import CitationParser
+from oc_index.utils.json_stream import iter_json_array, json_loads
 
 
 class CrossrefParser(CitationParser):
-    def __init__(self):
+    def __init__(self, incremental=True):
         super().__init__()
-        self._rows = []
         self._doi_manager = DOIManager()
+        # The items are read one at a time, rather than loading the whole file
+        self._incremental = incremental
 
     def is_valid(self, filename: str):
         super().is_valid(filename)
         return filename.endswith(".json")
 
-    def parse(self, filename: str):
-        super().parse(filename)
-        json_content = None
-        with open(filename, encoding="utf8") as fp:
-            json_content = load(fp)
-
-        if "items" in json_content:
-            self._rows = json_content.get("items")
-            self._items = len(self._rows)
-
-    def get_next_citation_data(self):
-        if len(self._rows) == 0:
-            return None
-
-        row = self._rows.pop()
-        self._current_item += 1
+    def _iter_rows(self, filename: str):
+        if not self._incremental:
+            with open(filename, encoding="utf8") as fp:
+                json_content = load(fp)
+            yield from json_content.get("items", [])
+            return
+
+        with open(filename, "rb") as fp:
+            for item in iter_json_array(fp, "items"):
+                # The items without references are not decoded
+                if b'"reference"' in item:
+                    yield self._get_dois(json_loads(item))
+                else:
+                    yield {}
+
+    @staticmethod
+    def _get_dois(item):
+        # Only the DOIs of the item and of its references are kept
+        dois = {"DOI": item.get("DOI")}
+        if "reference" in item:
+            dois["reference"] = [{"DOI": ref.get("DOI")} for ref in item["reference"]]
+        return dois
+
+    def _citation_data(self, row):
+        # All the citations of an item are returned together
         citing = self._doi_manager.normalise(row.get("DOI"))
         if citing is not None and "reference" in row:
-            citations = []
-            for ref in row["reference"]:
-                cited = self._doi_manager.normalise(ref.get("DOI"))
-                if cited is not None:
-                    citations.append((citing, cited, None, None, None, None))
-            return citations
-
-        return self.get_next_citation_data()
-        
\ No newline at end of file
+            # The cited DOIs repeat across the items, thus they are memoised
+            return [
+                (citing, cited, None, None, None, None)
+                for cited in self._doi_manager.normalise_many(
+                    ref.get("DOI") for ref in row["reference"]
+                )
+                if cited is not None
+            ]
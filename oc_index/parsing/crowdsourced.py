@@ -3,37 +3,27 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
-from csv import DictReader
-
 from oc_index.identifier.doi import DOIManager
-from oc_index.parsing.base import CitationParser
+from oc_index.parsing.base import CitationParser, iter_csv_rows
 
 
 class CrowdsourcedParser(CitationParser):
     def __init__(self):
         super().__init__()
-        self._rows = []
         self._doi_manager = DOIManager() # MIDManager()
 
     def is_valid(self, filename: str):
         super().is_valid(filename)
         return filename.endswith(".csv")
 
-    def parse(self, filename: str):
-        super().parse(filename)
-        with open(filename, encoding="utf8") as fp:
-            self._rows = list(DictReader(fp))
-        self._items = len(self._rows)
-
-    def get_next_citation_data(self):
-        if len(self._rows) == 0:
-            return None
+    def _iter_rows(self, filename: str):
+        return iter_csv_rows(filename)
 
-        row = self._rows.pop(0)
-        self._current_item += 1
+    def _citation_data(self, row):
         citing = self._doi_manager.normalise(row.get("citing_id"))
         cited = self._doi_manager.normalise(row.get("cited_id"))
 
@@ -47,5 +37,3 @@ class CrowdsourcedParser(CitationParser):
                 cited_date = None
 
             return citing, cited, citing_date, cited_date, None, None
-
-        return self.get_next_citation_data()
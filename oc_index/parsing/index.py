@@ -3,40 +3,29 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
 from oc_index.identifier.omid import OMIDManager
-from oc_index.parsing.base import CitationParser
-import csv
+from oc_index.parsing.base import CitationParser, iter_csv_rows
 
 
 class INDEXParser(CitationParser):
     def __init__(self):
         super().__init__()
-        self._rows = []
         self._omid_manager = OMIDManager()
 
     def is_valid(self, filename: str):
         super().is_valid(filename)
         return filename.endswith(".csv")
 
-    def parse(self, filename: str):
-        super().parse(filename)
-        with open(filename, mode='r') as csv_file:
-            csv_reader_l = list(csv.DictReader(csv_file))
-            self._rows = csv_reader_l
-            self._items = len(csv_reader_l)
+    def _iter_rows(self, filename: str):
+        return iter_csv_rows(filename)
 
-    def get_next_citation_data(self):
-        if len(self._rows) == 0:
-            return None
-
-        row = self._rows.pop(0)
-        self._current_item += 1
+    def _citation_data(self, row):
         citing = self._omid_manager.normalise(str(row.get("citing")))
         cited = self._omid_manager.normalise(str(row.get("cited")))
+
         if citing is not None and cited is not None:
             return citing, cited, None, None, None, None
-
-        return self.get_next_citation_data()
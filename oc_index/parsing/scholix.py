@@ -3,6 +3,7 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
@@ -10,48 +11,51 @@ from json import load
 
 from oc_index.identifier.doi import DOIManager
 from oc_index.parsing.base import CitationParser
+from oc_index.utils.json_stream import iter_json_array, json_loads
 
 
 class ScholixParser(CitationParser):
-    def __init__(self):
+    def __init__(self, incremental=True):
         super().__init__()
-        self._rows = []
         self._doi_manager = DOIManager()
+        # The links are read one at a time, rather than loading the whole file
+        self._incremental = incremental
 
     def is_valid(self, filename: str):
         super().is_valid(filename)
         return filename.endswith(".scholix")
 
-    def parse(self, filename: str):
-        with open(filename, encoding="utf8") as fp:
-            self._rows = load(fp)
-        self._items = len(self._rows)
+    def _iter_rows(self, filename: str):
+        if not self._incremental:
+            with open(filename, encoding="utf8") as fp:
+                yield from load(fp)
+            return
 
-    def get_next_citation_data(self):
-        if len(self._rows) == 0:
-            return None
+        with open(filename, "rb") as fp:
+            for link in iter_json_array(fp):
+                yield json_loads(link)
 
-        row = self._rows.pop()
-        self._current_item += 1
+    @staticmethod
+    def _get_id(item):
+        # The Scholix schema puts the ID in the Identifier of the item
+        return (item.get("Identifier") or {}).get("ID") or item.get("ID")
 
+    def _citation_data(self, row):
         citing_item = row.get("Source")
         cited_item = row.get("Target")
 
         if not citing_item or not cited_item:
-            return self.get_next_citation_data()
+            return None
 
-        citing = citing_item.get("ID")
-        cited = cited_item.get("ID")
+        citing = self._get_id(citing_item)
+        cited = self._get_id(cited_item)
 
         if not citing or not cited:
-            return self.get_next_citation_data()
+            return None
 
         citing = self._doi_manager.normalise(citing)
         cited = self._doi_manager.normalise(cited)
 
-        citing = self._doi_manager.normalise(row.get("citing_id"))
-        cited = self._doi_manager.normalise(row.get("cited_id"))
-
         citing_date = citing_item.get("PublicationDate")
         if not citing_date:
             citing_date = None
@@ -1,6 +1,7 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
@@ -14,6 +15,8 @@ import zstandard as zstd
 import pathlib
 import zipfile
 
+from oc_index.utils.input_files import iter_input_files
+
 
 class Preprocessing(metaclass=ABCMeta):
     """This is the interface for implementing preprocessors for specific datasources.
@@ -24,7 +27,16 @@ class Preprocessing(metaclass=ABCMeta):
         for key in params:
             setattr(self, key, params[key])
 
+    def iter_input_files(self, i_dir_or_compr, req_type, workers=1):
+        """It yields the files of the input as InputFile objects, which are read as
+        streams without extracting or decompressing the archives on disk (see
+        oc_index.utils.input_files.iter_input_files)."""
+        return iter_input_files(i_dir_or_compr, req_type, workers)
+
     def get_all_files(self, i_dir_or_compr, req_type):
+        """It returns the paths of the files of the input (or the members, if a
+        tar.gz archive, returned as well), extracting ZIP and zst inputs on disk.
+        Prefer iter_input_files, which does not."""
         result = []
         targz_fd = None
 
@@ -1,9 +1,11 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
+import io
 import json
 from os import makedirs, listdir
 import glob
@@ -16,6 +18,18 @@ from oc_idmanager.doi import DOIManager
 from datetime import datetime
 from argparse import ArgumentParser
 import csv
+import shutil
+import zlib
+from oc_index.utils.input_files import byte_ranges, iter_range_lines
+from oc_index.utils.tasks import Manifest, run_tasks
+
+# The default size (in bytes) of the chunks of the input processed in parallel
+CHUNK_SIZE = 256 * 1024 * 1024
+# The default number of partitions of the citations deduplicated separately
+PARTITIONS = 64
+MANIFEST = "preprocessing_manifest.txt"
+PARTITIONS_DIR = "partitions"
+
 
 class DatacitePreProcessing(Preprocessing):
     """This class aims at pre-processing DataCite dumps.
@@ -75,19 +89,18 @@ class DatacitePreProcessing(Preprocessing):
         else:
             last_processed_dict = None
 
-        all_files, targz_fd = self.get_all_files(self._input_dir, self._req_type)
-        len_all_files = len(all_files)
         data = []
         count = 0
         if self._proc_type == "index":
             data_csv = []
             count_csv = 0
 
-        for file_idx, file in enumerate(all_files, 1):
+        for input_file in self.iter_input_files(self._input_dir, self._req_type):
+            # The input files are streamed, never extracted or decompressed on disk
+            f = io.TextIOWrapper(input_file.open(), encoding="utf8")
             if not self._low_memo:
-                f = self.load_json(file, targz_fd, file_idx, len_all_files)
-            else:
-                f = open(file, encoding="utf8")
+                with f:
+                    f = [json.loads(line) for line in f if line.strip()]
             for line in tqdm(f):
                 if line:
                     if self._low_memo:
@@ -117,51 +130,23 @@ class DatacitePreProcessing(Preprocessing):
                             continue
                     else:
                         linedict = line
-                    if 'id' not in linedict or 'type' not in linedict:
-                        continue
-                    doi_entity = self._doi_manager.normalise(linedict['id'])
-                    if linedict['type'] != "dois":
+                    if not self._contains_citations(linedict):
                         continue
-                    attributes = linedict["attributes"]
-                    rel_ids = attributes.get("relatedIdentifiers")
-                    if rel_ids:
-                        contains_citations = False
-                        for ref in rel_ids:
-                            if all(elem in ref for elem in self._needed_info):
-                                relatedIdentifierType = (str(ref["relatedIdentifierType"])).lower()
-                                relationType = str(ref["relationType"]).lower()
-                                if relatedIdentifierType == "doi":
-                                    if relationType in self._filter:
-                                        data.append(linedict)
-                                        count += 1
-                                        data = self.splitted_to_file(
-                                            count, data, ".json"
-                                        )
-                                        contains_citations = True
-                                        break
-                        if contains_citations and self._proc_type == "index":
-                            for ref in rel_ids:
-                                if all(elem in ref for elem in self._needed_info):
-                                    relatedIdentifierType = (str(ref["relatedIdentifierType"])).lower().strip()
-                                    if relatedIdentifierType == "doi":
-                                        rel_id = self._doi_manager.normalise(ref["relatedIdentifier"])
-                                        relationType = str(ref["relationType"]).lower().strip()
-                                        if relationType == "references" or relationType == "cites":
-                                            cit = (str(doi_entity), str(rel_id))
-                                            if cit not in processed_citations:
-                                                processed_citations.add(cit)
-                                                data_csv.append(cit)
-                                                count_csv += 1
-                                                data_csv = self.splitted_to_file(count_csv, data_csv, ".csv")
-                                        elif relationType == "isreferencedby" or relationType == "iscitedby":
-                                            cit = (str(rel_id), str(doi_entity))
-                                            if cit not in processed_citations:
-                                                processed_citations.add(cit)
-                                                data_csv.append(cit)
-                                                count_csv += 1
-                                                data_csv = self.splitted_to_file(count_csv, data_csv, ".csv")
-
-            f.close()
+                    data.append(linedict)
+                    count += 1
+                    data = self.splitted_to_file(
+                        count, data, ".json"
+                    )
+                    if self._proc_type == "index":
+                        for cit in self._get_citations(linedict):
+                            if cit not in processed_citations:
+                                processed_citations.add(cit)
+                                data_csv.append(cit)
+                                count_csv += 1
+                                data_csv = self.splitted_to_file(count_csv, data_csv, ".csv")
+
+            if self._low_memo:
+                f.close()
         if len(data) > 0:
             count = count + (self._interval - (int(count) % int(self._interval)))
             self.splitted_to_file(count, data, ".json")
@@ -171,6 +156,134 @@ class DatacitePreProcessing(Preprocessing):
                 self.splitted_to_file(count_csv, data_csv, ".csv")
 
 
+    def _contains_citations(self, linedict):
+        """It returns True if the entity (a DOI) has a DOI as related identifier with
+        one of the relation types in the filter."""
+        if 'id' not in linedict or 'type' not in linedict or linedict['type'] != "dois":
+            return False
+        for ref in linedict["attributes"].get("relatedIdentifiers") or []:
+            if all(elem in ref for elem in self._needed_info):
+                relatedIdentifierType = (str(ref["relatedIdentifierType"])).lower()
+                relationType = str(ref["relationType"]).lower()
+                if relatedIdentifierType == "doi" and relationType in self._filter:
+                    return True
+        return False
+
+    def _get_citations(self, linedict):
+        """It returns the (citing, cited) DOIs of the citations of the entity."""
+        citations = []
+        doi_entity = self._doi_manager.normalise(linedict['id'])
+        for ref in linedict["attributes"]["relatedIdentifiers"]:
+            if all(elem in ref for elem in self._needed_info):
+                relatedIdentifierType = (str(ref["relatedIdentifierType"])).lower().strip()
+                if relatedIdentifierType == "doi":
+                    rel_id = self._doi_manager.normalise(ref["relatedIdentifier"])
+                    relationType = str(ref["relationType"]).lower().strip()
+                    if relationType == "references" or relationType == "cites":
+                        citations.append((str(doi_entity), str(rel_id)))
+                    elif relationType == "isreferencedby" or relationType == "iscitedby":
+                        citations.append((str(rel_id), str(doi_entity)))
+        return citations
+
+    def split_input_parallel(self, workers=2, chunk_size=CHUNK_SIZE, partitions=PARTITIONS):
+        """It does the same as split_input, processing the NDJSON input files (also
+        compressed with zst) split in byte ranges of about 'chunk_size' bytes (aligned on
+        the lines) in a pool of processes. The chunks done are recorded in a manifest in the
+        output directory, so that an interrupted process restarts from the chunks not done.
+        The citations are deduplicated at the end, after having been split in partitions
+        (by the hash of the citation) small enough to be deduplicated in memory."""
+        all_files, targz_fd = self.get_all_files(self._input_dir, self._req_type)
+        if targz_fd is not None:
+            raise ValueError("The input files in a tar.gz archive cannot be split in byte ranges")
+
+        manifest = Manifest(
+            join(self._output_dir, MANIFEST),
+            {"chunk_size": chunk_size, "interval": int(self._interval), "partitions": partitions},
+        )
+        try:
+            chunks = []
+            chunk_idx = 0
+            for file in sorted(all_files):
+                for start, end in byte_ranges(file, chunk_size):
+                    if "chunk %d" % chunk_idx not in manifest:
+                        chunks.append((chunk_idx, file, start, end))
+                    chunk_idx += 1
+            for chunk_idx in tqdm(
+                run_tasks(self._process_chunk, chunks, (partitions,), workers), total=len(chunks)
+            ):
+                manifest.add("chunk %d" % chunk_idx)
+
+            if self._proc_type == "index":
+                todo = [(p,) for p in range(partitions) if "partition %d" % p not in manifest]
+                for partition in run_tasks(self._dedup_partition, todo, workers=workers):
+                    manifest.add("partition %d" % partition)
+        finally:
+            manifest.close()
+
+    def _partition_dir(self, partition):
+        return join(self._output_dir_p, PARTITIONS_DIR, str(partition))
+
+    def _process_chunk(self, chunk_idx, file, start, end, partitions):
+        # The outputs have the same names if a chunk is processed again, thus they
+        # replace the ones written before an interruption
+        data = []
+        n_files = 0
+        citation_files = {}
+        try:
+            for line in iter_range_lines(file, start, end):
+                try:
+                    linedict = json.loads(line)
+                except ValueError:
+                    print(ValueError, line)
+                    continue
+                if not self._contains_citations(linedict):
+                    continue
+                data.append(linedict)
+                if len(data) == int(self._interval):
+                    n_files += 1
+                    self._chunk_to_file(chunk_idx, n_files, data)
+                    data = []
+                if self._proc_type == "index":
+                    for cit in self._get_citations(linedict):
+                        partition = zlib.crc32(",".join(cit).encode("utf-8")) % partitions
+                        if partition not in citation_files:
+                            makedirs(self._partition_dir(partition), exist_ok=True)
+                            cit_file = open(
+                                join(self._partition_dir(partition), "%d.csv" % chunk_idx),
+                                "w", encoding="utf8", newline=""
+                            )
+                            citation_files[partition] = (cit_file, csv.writer(cit_file))
+                        citation_files[partition][1].writerow(cit)
+        finally:
+            for cit_file, _ in citation_files.values():
+                cit_file.close()
+        if data:
+            self._chunk_to_file(chunk_idx, n_files + 1, data)
+        return chunk_idx
+
+    def _chunk_to_file(self, chunk_idx, file_idx, data):
+        filename = "jSonFile_%d_%d%s" % (chunk_idx, file_idx, self._req_type)
+        with open(os.path.join(self._output_dir, filename), "w", encoding="utf8") as json_file:
+            json.dump({"data": data}, json_file)
+
+    def _dedup_partition(self, partition):
+        citations = set()
+        partition_dir = self._partition_dir(partition)
+        if exists(partition_dir):
+            for file in listdir(partition_dir):
+                with open(join(partition_dir, file), encoding="utf8", newline="") as f:
+                    citations.update(tuple(row) for row in csv.reader(f))
+        citations = sorted(citations)
+        for file_idx, start in enumerate(range(0, len(citations), int(self._interval)), 1):
+            filename = "CSVFile_%d_%d.csv" % (partition, file_idx)
+            with open(os.path.join(self._output_dir_p, filename), "w", encoding="utf8", newline="") as f_out:
+                writer = csv.writer(f_out, delimiter=",")
+                writer.writerow(self._csv_col)
+                writer.writerows(citations[start:start + int(self._interval)])
+        if exists(partition_dir):
+            shutil.rmtree(partition_dir)
+        return partition
+
     def splitted_to_file(self, cur_n, data, type):
         if type == ".json":
             dict_to_json = dict()
@@ -216,7 +329,7 @@ if __name__ == '__main__':
                             help='Directory where the preprocessed json files will be stored (for glob)')
     arg_parser.add_argument('-n', '--number', dest='number', required=True, type=int,
                             help='Number of relevant entities which will be stored in each json file')
-    arg_parser.add_argument('-n', '--process_type', dest='process_type', required=True, choices=['meta', 'index'],
+    arg_parser.add_argument('-t', '--process_type', dest='process_type', required=True, choices=['meta', 'index'],
                             help='Type of process the preprocessing is meant for: "meta" to skip the extraction of a'
                                  'two-column csv with citations, "index" otherwise')
     arg_parser.add_argument('-f', '--filter', dest='filter', required=False,
@@ -228,6 +341,12 @@ if __name__ == '__main__':
     arg_parser.add_argument('-lm', '--low_memo', dest='low_memo', required=False, action='store_false',
                             help='Optional parameter, True by default. Set it to False in order to load all the input'
                                  'at once instead of loading in memory each entity individually')
+    arg_parser.add_argument('-w', '--workers', dest='workers', required=False, type=int, default=1,
+                            help='Optional parameter, 1 by default. If greater than 1, the input files are split in '
+                                 'byte ranges processed by this number of processes, and an interrupted process '
+                                 'restarts from the byte ranges not processed yet')
+    arg_parser.add_argument('-cs', '--chunk_size', dest='chunk_size', required=False, type=int, default=CHUNK_SIZE,
+                            help='Optional parameter, the size in bytes of the byte ranges processed in parallel')
 
     args = arg_parser.parse_args()
 
@@ -236,4 +355,7 @@ if __name__ == '__main__':
         filter = args.filter.split(";")
 
     dcpp = DatacitePreProcessing(input_dir=args.input, output_dir=args.output_g,  interval=args.number, process_type=args.process_type, filter=filter, low_memo=args.low_memo)
-    dcpp.split_input()
\ No newline at end of file
+    if args.workers > 1:
+        dcpp.split_input_parallel(args.workers, args.chunk_size)
+    else:
+        dcpp.split_input()
\ No newline at end of file
@@ -1,6 +1,7 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
@@ -14,6 +15,13 @@ from oc_index.preprocessing.base import Preprocessing
 from argparse import ArgumentParser
 from datetime import datetime
 from tqdm import tqdm
+import io
+from oc_index.utils.input_files import byte_ranges
+from oc_index.utils.key_set import KeySet, pair_keys, row_keys
+from oc_index.utils.tasks import run_tasks
+
+# The default size (in bytes) of the chunks of the input read in parallel
+CHUNK_SIZE = 64 * 1024 * 1024
 
 
 class NIHPreProcessing(Preprocessing):
@@ -56,56 +64,91 @@ class NIHPreProcessing(Preprocessing):
             return lines
 
 
-    def split_input(self):
+    def split_input(self, workers=1, chunk_size=CHUNK_SIZE):
+        """It splits the input in CSV files of 'interval' rows, discarding the iCite
+        Metadata entities without citations and the duplicate rows. The rows are
+        filtered by column operations on chunks of the input, read by 'workers'
+        processes if more than one (in byte ranges of 'chunk_size' bytes, thus only
+        for uncompressed CSV files with a record per line), and the duplicates are
+        found through the uint64 keys of the rows (the citing and referenced PMIDs
+        packed in a single integer, for NIH-OCC) kept in a KeySet."""
         # restart from the last processed line, in case of previous process interruption
         out_dir = listdir(self._output_dir)
-        processed_citations = set()
+        processed_citations = KeySet()
+        last_processed_pmid = 0
         # Checking if the list is empty or not
         if len(out_dir) != 0:
             list_of_files = glob.glob(join(self._output_dir, '*.csv'))
             latest_file = max(list_of_files, key=os.path.getctime)
-            df = pd.read_csv(latest_file, low_memory=True)
-            df.fillna("", inplace=True)
-            df_dict_list = df.to_dict("records")
             if self._input_type == "icmd":
-                last_processed_pmid = df_dict_list[-1]["pmid"]
+                last_processed_pmid = pd.read_csv(latest_file, usecols=["pmid"])["pmid"].iloc[-1]
             elif self._input_type == "occ":
                 for file in list_of_files:
-                    with open(file, 'r') as read_obj:
-                        csv_reader = csv.reader(read_obj)
-                        next(csv_reader)
-                        citations = [tuple(x) for x in csv_reader]
-                        processed_citations.update(citations)
-        else:
-            if self._input_type == "icmd":
-                last_processed_pmid = 0
+                    processed = pd.read_csv(file, usecols=self._filter)
+                    processed.fillna("", inplace=True)
+                    processed_citations.add_new(self._row_keys(processed))
 
-        all_files, targz_fd = self.get_all_files(self._input_dir, self._req_type)
         count = 0
         lines = []
-        for file_idx, file in enumerate(tqdm(all_files), 1):
-            chunksize = 100000
-            with pd.read_csv(file,  usecols=self._filter, chunksize=chunksize) as reader:
-                for chunk in reader:
-                    chunk.fillna("", inplace=True)
-                    df_dict_list = chunk.to_dict("records")
-                    if self._input_type == "icmd":
-                        filt_values = [d.values() for d in df_dict_list if d.get("pmid") > last_processed_pmid and (d.get("cited_by") or d.get("references"))]
-                    else:
-                        filt_values = [d.values() for d in df_dict_list]
-
-                    for line in filt_values:
-                        if tuple(line) not in processed_citations:
-                            count += 1
-                            lines.append(line)
-                            processed_citations.add(tuple(line))
-                            if int(count) != 0 and int(count) % int(self._interval) == 0:
-                                lines = self.splitted_to_file(count, lines)
+        for input_file in tqdm(self.iter_input_files(self._input_dir, self._req_type)):
+            for rows in self._iter_filtered_chunks(input_file, last_processed_pmid, workers, chunk_size):
+                rows = rows[processed_citations.add_new(self._row_keys(rows))]
+                values = rows.values.tolist()
+                while values:
+                    to_add = int(self._interval) - count % int(self._interval)
+                    lines.extend(values[:to_add])
+                    count += len(values[:to_add])
+                    values = values[to_add:]
+                    lines = self.splitted_to_file(count, lines)
 
         if len(lines) > 0:
             count = count + (self._interval - (int(count) % int(self._interval)))
             self.splitted_to_file(count, lines)
 
+    def _row_keys(self, rows):
+        if self._input_type == "occ":
+            return pair_keys(rows["citing"], rows["referenced"])
+        return row_keys(rows)
+
+    def _filter_chunk(self, chunk, last_processed_pmid):
+        chunk = chunk.fillna("")
+        if self._input_type == "icmd":
+            chunk = chunk[
+                (chunk["pmid"] > last_processed_pmid)
+                & (chunk["cited_by"].astype(bool) | chunk["references"].astype(bool))
+            ]
+        return chunk
+
+    def _read_range(self, idx, path, start, end, header, last_processed_pmid):
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        if start:
+            data = header + data
+        chunk = pd.read_csv(io.BytesIO(data), usecols=self._filter)
+        return idx, self._filter_chunk(chunk, last_processed_pmid)
+
+    def _iter_filtered_chunks(self, input_file, last_processed_pmid, workers, chunk_size):
+        # The chunks are yielded in the order of the input file
+        if workers > 1 and input_file.name.endswith(self._req_type) and os.path.isfile(input_file.name):
+            with open(input_file.name, "rb") as f:
+                header = f.readline()
+            ranges = [
+                (idx, input_file.name, start, end)
+                for idx, (start, end) in enumerate(byte_ranges(input_file.name, chunk_size))
+            ]
+            done = {}
+            next_idx = 0
+            for idx, chunk in run_tasks(self._read_range, ranges, (header, last_processed_pmid), workers):
+                done[idx] = chunk
+                while next_idx in done:
+                    yield done.pop(next_idx)
+                    next_idx += 1
+        else:
+            with input_file.open() as stream, pd.read_csv(stream, usecols=self._filter, chunksize=100000) as reader:
+                for chunk in reader:
+                    yield self._filter_chunk(chunk, last_processed_pmid)
+
 if __name__ == '__main__':
     arg_parser = ArgumentParser('nih_pp.py', description='This script preprocesses a NIH dump (either compressed or not,'
                                                          'either NIH-OCC or iCite Metadata) by discarding the entities '
@@ -121,10 +164,12 @@ if __name__ == '__main__':
     arg_parser.add_argument('-it', '--input_type', dest='input_type', required=True, choices=['icmd', 'occ'], type=str,
                             help='Type of dump to be preprocessed: choose icmd for iCiteMetadata and occ for NIH Open '
                                  'Citation collection')
+    arg_parser.add_argument('-w', '--workers', dest='workers', required=False, type=int, default=1,
+                            help='Optional parameter, 1 by default. The number of processes reading the input files')
 
     args = arg_parser.parse_args()
 
 
     nihpp = NIHPreProcessing(input_dir=args.input, output_dir=args.output, interval=args.number, input_type=args.input_type)
-    nihpp.split_input()
+    nihpp.split_input(args.workers)
 
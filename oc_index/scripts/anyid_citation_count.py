@@ -9,64 +9,233 @@
 
 import csv
 import argparse
-from collections import defaultdict
-from tqdm import tqdm
-import re
+from array import array
 import sys
-import requests
-from time import sleep
-import json
 import redis
 
+import numpy as np
+
 # from zipfile import ZipFile
 # import io
 
 from oc_index.utils.logging import get_logger
 from oc_index.utils.config import get_config
+from oc_index.utils.redis_scan import RedisScanner, prefix_shards, shard_digits
+from oc_index.utils.sketch import hash64
+from oc_index.utils.tasks import run_tasks
 
 csv.field_size_limit(sys.maxsize)
 
+BATCH_SIZE = 10000
+
 '''
-To create the omid map using the META BRs index (in CSV)
-The META BRs index should be previously generated using 'meta2redis' command
+It returns the integer value of a BR OMID, given in any of the forms used in the
+Redis/CSV indexes, e.g. "omid:br/0634096064", "coci:br/0634096064", "0634096064".
+All the OMIDs start with the "06" supplier prefix, thus the integer is never
+ambiguous. It returns -1 if the string is not a BR OMID.
 '''
-def read_omid_map(f_omidmap):
-    omid_map = defaultdict(set)
-    with open(f_omidmap, mode='r') as file:
-        csv_reader = csv.reader(file)
-        for row in csv_reader:
-            if len(row) == 2:  # Ensure there are exactly two columns
-                # ANY-ID:OMID 1:1
-                # E.G openalex:W4375948413,omid:br/0634096064
-                any_id, br_omid = row
+def omid_to_int(omid):
+    omid = omid.rpartition("/")[2].rpartition(":")[2]
+    return int(omid) if omid.isdigit() else -1
+
+
+class AnyIdMap(object):
+    '''
+    The map between BR OMIDs and ANY-IDs (e.g. DOIs, PMIDs), kept in NumPy arrays:
+        * omids: the sorted integer OMIDs
+        * anyids[indptr[i]:indptr[i+1]]: the 64-bit hashes of all the ANY-IDs of omids[i]
+    Only the ANY-IDs having one of the prefixes to count are stored as strings,
+    in ids, and linked to their OMIDs by (pair_omid, pair_id).
+    '''
+
+    def __init__(self, prefixes):
+        self.prefixes = tuple(prefixes)
+        self.omids = np.zeros(0, dtype=np.int64)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.anyids = np.zeros(0, dtype=np.uint64)
+        self.ids = []
+        self.pair_omid = np.zeros(0, dtype=np.int64)
+        self.pair_id = np.zeros(0, dtype=np.int64)
+
+    '''
+    To create the omid map using the META BRs index (in CSV)
+    The META BRs index should be previously generated using 'meta2redis' command,
+    each row is <ANY-ID>,<OMID>[; <OMID> ...], e.g. openalex:W4375948413,omid:br/0634096064
+    '''
+    def load(self, f_omidmap):
+        row_omids = array("q")
+        row_anyids = array("Q")
+        ids_index = {}
+        id_omids = array("q")
+        id_ids = array("q")
+        with open(f_omidmap, mode="r") as file:
+            for row in csv.reader(file):
+                if len(row) != 2:  # Ensure there are exactly two columns
+                    continue
+                any_id, br_omids = row
+                h = hash64(any_id)
+                to_count = any_id.split(":", 1)[0] in self.prefixes
+                for br_omid in br_omids.split("; "):
+                    omid = omid_to_int(br_omid)
+                    if omid < 0:
+                        continue
+                    row_omids.append(omid)
+                    row_anyids.append(h)
+                    if to_count:
+                        id_omids.append(omid)
+                        id_ids.append(ids_index.setdefault(any_id, len(ids_index)))
+        self.ids = list(ids_index)
+        del ids_index
+
+        row_omids = np.frombuffer(row_omids, dtype=np.int64)
+        row_anyids = np.frombuffer(row_anyids, dtype=np.uint64)
+        # Sort by OMID and drop the duplicated (OMID, ANY-ID) pairs
+        order = np.lexsort((row_anyids, row_omids))
+        row_omids = row_omids[order]
+        row_anyids = row_anyids[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (row_omids[1:] != row_omids[:-1]) | (row_anyids[1:] != row_anyids[:-1])
+        row_omids = row_omids[keep]
+        self.anyids = row_anyids[keep]
+        self.omids, starts = np.unique(row_omids, return_index=True)
+        self.indptr = np.append(starts, len(row_omids)).astype(np.int64)
+
+        self.pair_omid = self.positions(np.frombuffer(id_omids, dtype=np.int64))
+        self.pair_id = np.frombuffer(id_ids, dtype=np.int64).copy()
+        return self
+
+    def __len__(self):
+        return len(self.omids)
+
+    '''
+    It returns the position of each integer OMID in self.omids, or -1 if missing.
+    '''
+    def positions(self, omids):
+        pos = np.searchsorted(self.omids, omids)
+        pos[pos == len(self.omids)] = 0
+        if len(self.omids):
+            pos[self.omids[pos] != omids] = -1
+        else:
+            pos[:] = -1
+        return pos
+
+    '''
+    It counts the citations of a batch of cited OMIDs, where values[i] are the citing
+    OMIDs of keys[i]. Only the citing OMIDs having an ANY-ID are counted, and two
+    citing OMIDs sharing an ANY-ID are counted once (i.e. a citing OMID is counted
+    if none of its ANY-IDs belongs to the ones already counted).
+    RETURNS: the positions of the cited OMIDs in the map and their counts
+    '''
+    def count(self, keys, values):
+        values = [v or () for v in values]
+        cited = self.positions(np.array([omid_to_int(k) for k in keys], dtype=np.int64))
+        lengths = np.array([len(v) for v in values], dtype=np.int64)
+        citing = self.positions(
+            np.fromiter(
+                (omid_to_int(c) for v in values for c in v),
+                dtype=np.int64,
+                count=int(lengths.sum()),
+            )
+        )
+        owner = np.repeat(np.arange(len(keys)), lengths)
+
+        n_anyids = np.where(
+            citing >= 0, self.indptr[citing + 1] - self.indptr[citing], 0
+        )
+        valid = n_anyids > 0
+        owner, citing, n_anyids = owner[valid], citing[valid], n_anyids[valid]
+        counts = np.bincount(owner, minlength=len(keys))
+
+        # The ANY-IDs of each valid citing OMID, i.e. the ranges of self.anyids
+        # starting at self.indptr[citing], with the citing OMID they belong to
+        total = int(n_anyids.sum())
+        starts = np.cumsum(n_anyids) - n_anyids
+        idx = np.repeat(self.indptr[citing] - starts, n_anyids) + np.arange(total)
+        hashes = self.anyids[idx]
+        hash_owner = np.repeat(owner, n_anyids)
+
+        # Only the cited OMIDs having two citing OMIDs with the same ANY-ID
+        # need the exact (sequential) count
+        order = np.lexsort((hashes, hash_owner))
+        same = (hash_owner[order][1:] == hash_owner[order][:-1]) & (
+            hashes[order][1:] == hashes[order][:-1]
+        )
+        for key_idx in np.unique(hash_owner[order][1:][same]):
+            seen = set()
+            n = 0
+            for c in np.flatnonzero(owner == key_idx):
+                c_hashes = set(hashes[starts[c] : starts[c] + n_anyids[c]].tolist())
+                if seen.isdisjoint(c_hashes):
+                    n += 1
+                seen.update(c_hashes)
+            counts[key_idx] = n
+
+        found = cited >= 0
+        return cited[found], counts[found]
 
-                # also normalize omid val
-                br_omid = br_omid.replace("omid:br/","")
-                omid_map[br_omid].add(any_id)
 
-    return omid_map
+'''
+It yields the (cited OMIDs, citing OMIDs) batches of the omid citations index CSV file
+The omid citations index CSV file should be previously generated using 'cits2redis' command,
+each row is <CITED_OMID>,<CITING_OMID_1>; <CITING_OMID_2>; ... <CITING_OMID_N>
+'''
+def iter_csv_citations(f_omid_citations_index, batch_size=BATCH_SIZE):
+    keys, values = [], []
+    with open(f_omid_citations_index, mode="r") as file:
+        for row in csv.reader(file):
+            if len(row) == 2:  # Ensure there are exactly two columns
+                cited_omid, str_citing_omids = row
+                keys.append(cited_omid)
+                values.append(set(str_citing_omids.split("; ")))
+                if len(keys) >= batch_size:
+                    yield keys, values
+                    keys, values = [], []
+    if keys:
+        yield keys, values
+
 
 '''
-Create the omid citations index using the omid citations index CSV file
-The omid citations index CSV file should be previously generated using 'cits2redis' command
-RETURNS:
-    * omid_citations_index: {<CITED_OMID>: [<CITING_OMID_1>, <CITING_OMID_2>, ... <CITING_OMID_N>]}
+It yields the counts of the batches of the CSV citations index, computed in parallel
 '''
-def read_omid_citations_index(f_omid_citations_index):
+def count_csv_citations(anyid_map, f_omid_citations_index, workers=1):
+    # The map is shared with the workers by forking
+    yield from run_tasks(
+        anyid_map.count,
+        iter_csv_citations(f_omid_citations_index),
+        workers=workers,
+        queue_size=workers * 2,
+    )
 
-    omid_citations_index = defaultdict(list)
-    with open(f_omid_citations_index, mode='r') as file:
-        csv_reader = csv.reader(file)
 
-        #TEST
-        # csv_reader = csv_reader[:45000]
+'''
+It returns the SCAN MATCH patterns splitting the keys of the Redis citations DB
+according to the 'digits' digits following the "06" prefix of their OMID (a single
+'*' pattern with 0 digits). The keys are BR OMIDs in any of the forms accepted by
+omid_to_int, i.e. "<OMID>", "br/<OMID>" or "<COLLECTION>:br/<OMID>" (e.g.
+"coci:br/0634096064"), each matched by exactly one pattern.
+'''
+def citation_shards(digits):
+    if not digits:
+        return ["*"]
+    return (
+        prefix_shards("06", digits)
+        + prefix_shards("br/06", digits)
+        + ["*:" + pattern for pattern in prefix_shards("br/06", digits)]
+    )
 
-        for row in csv_reader:
-            if len(row) == 2:  # Ensure there are exactly two columns
-                cited_omid, str_citing_omids = row
-                omid_citations_index[cited_omid] = str_citing_omids.split("; ")
 
-    return omid_citations_index
+'''
+It returns the citation count of each ANY-ID to count (i.e. anyid_map.ids), given the
+(positions, counts) results of the batches of citations. An ANY-ID linked to more than
+one OMID gets the highest count.
+'''
+def anyid_counts(anyid_map, results):
+    omid_counts = np.zeros(len(anyid_map), dtype=np.int64)
+    for cited, counts in results:
+        np.maximum.at(omid_counts, cited, counts)
+    counts = np.zeros(len(anyid_map.ids), dtype=np.int64)
+    np.maximum.at(counts, anyid_map.pair_id, omid_counts[anyid_map.pair_omid])
+    return counts
 
 
 def main():
@@ -77,78 +246,62 @@ def main():
     # Data source in the format: <TYPE>:<VALUE>
     # E.G. REDIS:8 | CSV:/PATH/TO/OMID_CITAIONS_INDEX.csv
     parser.add_argument('--citations', default='redis:8', help='Either the Redis DB or CSV file storing all the citations of opencitations (*Note: populated by cits2redis). Specified in the form: <TYPE>:<VALUE>. E.G. REDIS:8 | CSV:/PATH/TO/OMID_CITAIONS_INDEX.csv')
-    parser.add_argument('--id',  default='doi', help='Convert OMID(s) to a given ID')
+    parser.add_argument('--id',  default='doi', help='Convert OMID(s) to the given IDs, separated by commas (e.g. doi,pmid,openalex), one output file each')
     parser.add_argument('--out', default='./', help='Path to the output destination dir')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes counting the citations in parallel')
+    parser.add_argument('--shard-digits', type=int, default=None, help='The Redis citations DB is read in 10^N shards according to the N digits following the OMID prefix (default: the fewest digits giving a shard per worker, no sharding with one worker)')
     args = parser.parse_args()
-    get_config(args.config)
+    _config = get_config(args.config)
     logger = get_logger()
 
-    # get ANYID Prefix. E:G. "doi"
-    anyid_pref = args.id
+    # get ANYID Prefixes. E:G. "doi"
+    anyid_prefs = [p.strip() for p in args.id.split(",") if p.strip()]
 
-    logger.info("Build a citation count for ANYID starting with the prefix: "+str(anyid_pref))
+    logger.info("Build a citation count for ANYID starting with the prefixes: "+", ".join(anyid_prefs))
 
     # Build OMID map
-    # FORMAT:
-    #   <OMID>: SET(<anyid_pref>:<anyid_val>)
-    # EXAMPLE:
-    #   06804319241: {"doi:10.17615/3my7-0q76","pmid:18650518","pmid:18650512","doi:10.1056/nejme0804289","doi:10.1056/nejmoa0708975"}
     logger.info("Build OMID BR map ...")
-    omid_map = read_omid_map(args.omidmap)
-    logger.info("OMID MAP = "+str(len(omid_map.keys())))
+    anyid_map = AnyIdMap(anyid_prefs).load(args.omidmap)
+    logger.info("OMID MAP = "+str(len(anyid_map)))
 
-    ds_cits_type, ds_cits_source = args.citations.lower().split(":")
-    logger.info("Build OMID Cits map via "+ds_cits_type+" ...")
+    ds_cits_type, ds_cits_source = args.citations.lower().split(":", 1)
+    logger.info("Count the citations via "+ds_cits_type+" ...")
     if ds_cits_type == "redis":
-        ds_cits_data = redis.Redis(host='localhost', port=6379, db=ds_cits_source)
+        ds_cits_data = redis.Redis(
+            host=_config.get("redis", "host", fallback="localhost"),
+            port=int(_config.get("redis", "port", fallback="6379")),
+            db=int(ds_cits_source),
+            decode_responses=True,
+        )
+        results = RedisScanner(
+            ds_cits_data,
+            citation_shards(shard_digits(args.workers, args.shard_digits)),
+            fetch="smembers",
+            count=BATCH_SIZE,
+            batch_size=BATCH_SIZE,
+            workers=args.workers,
+            log_every=BATCH_SIZE * 1000,
+            logger=logger,
+            process=anyid_map.count,
+        )
     elif ds_cits_type == "csv":
-        ds_cits_data = read_omid_citations_index(ds_cits_source)
+        results = count_csv_citations(anyid_map, ds_cits_source, args.workers)
     else:
         raise ValueError(f"Unsupported citations type: {ds_cits_type}")
 
-    # Results to dump at the end
-    anyid_citation_count = dict()
-    anyid_map = defaultdict(set)
-
-    # PARAMS
-    CHUNCK_SIZE = 10000
-
-    # (1) Walk through all OMIDS in the OMID map (i.e. omid_map)
-    logger.info("Walk through all OMIDS in the OMID map (i.e. omid_map) ...")
-
-
-    count_cits = {}
-    for cited_omid, any_ids in tqdm(omid_map.items()):
-
-        count_unique_cits = 0
-
-        # calc cits count of the unique ANYIDS of each elem
-        s_citing_omids = ds_cits_data.smembers(cited_omid)
-
-        s_citing_unique_anyids = set()
-        for citing_omid in s_citing_omids:
-
-            citing_anyid = omid_map.get(citing_omid)
-            if not citing_anyid:
-                continue
-
-            if citing_anyid.isdisjoint(s_citing_unique_anyids):
-                count_unique_cits += 1
-            s_citing_unique_anyids.update(citing_anyid)
-
-        # assign the count to each corresponding ANYID
-        for __any_id in any_ids:
-            count_cits[__any_id] = count_unique_cits
+    counts = anyid_counts(anyid_map, results)
 
     # dump anyid - citation count
-    logger.info('Saving the citation counts of '+anyid_pref+' BRs ...')
-    with open(args.out+anyid_pref+"_citation_count.csv", mode='w', newline='') as output_csvfile:
-        writer = csv.writer(output_csvfile)
-        writer.writerow([anyid_pref, 'citation_count'])
-
-        for cited_anyid, cit_count in count_cits.items():
-            if cited_anyid.startswith(anyid_pref):
-                writer.writerow([cited_anyid.replace(anyid_pref+":",""),str(cit_count)])
+    for anyid_pref in anyid_prefs:
+        logger.info('Saving the citation counts of '+anyid_pref+' BRs ...')
+        with open(args.out+anyid_pref+"_citation_count.csv", mode='w', newline='') as output_csvfile:
+            writer = csv.writer(output_csvfile)
+            writer.writerow([anyid_pref, 'citation_count'])
+
+            anyid_pref += ":"
+            for cited_anyid, cit_count in zip(anyid_map.ids, counts.tolist()):
+                if cited_anyid.startswith(anyid_pref):
+                    writer.writerow([cited_anyid[len(anyid_pref):], str(cit_count)])
 
     logger.info("Done!")
 
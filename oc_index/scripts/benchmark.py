@@ -0,0 +1,130 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import json
+import sys
+from argparse import ArgumentParser
+
+from oc_index.benchmark import suite
+from oc_index.benchmark.suite import (
+    BENCHMARKS,
+    compare,
+    format_report,
+    load_report,
+    run_suite,
+    save_report,
+)
+
+
+def main():
+    arg_parser = ArgumentParser(
+        description="Measure the throughput (rows/s) and the peak memory of the main stages "
+        "of the creation of the index (cnc, the storage of the citations, meta2redis, "
+        "cits2redis, dump_index) on deterministic synthetic data. Each benchmark runs in its "
+        "own process against fakeredis or, if specified, a Redis server"
+    )
+    arg_parser.add_argument(
+        "-b",
+        "--benchmark",
+        action="append",
+        choices=list(BENCHMARKS),
+        help="The benchmark to run, can be repeated (default: all)",
+    )
+    arg_parser.add_argument(
+        "--brs",
+        type=int,
+        default=10000,
+        help="The number of bibliographic resources in the synthetic Meta dump (default: 10000)",
+    )
+    arg_parser.add_argument(
+        "--degree",
+        type=float,
+        default=10,
+        help="The average number of references of each bibliographic resource (default: 10)",
+    )
+    arg_parser.add_argument(
+        "--skew",
+        type=float,
+        default=1.0,
+        help="How much the citations concentrate on few bibliographic resources, 0 means uniform (default: 1.0)",
+    )
+    arg_parser.add_argument(
+        "--seed", type=int, default=42, help="The seed of the synthetic data (default: 42)"
+    )
+    arg_parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="The number of runs of each benchmark, the best one is reported (default: 3)",
+    )
+    arg_parser.add_argument(
+        "--redis",
+        help="HOST:PORT of the Redis server to use instead of fakeredis (installed with the "
+        "'benchmark' extra of oc-index), required without fakeredis. **Its DBs from "
+        "--redis-db on are flushed**",
+    )
+    arg_parser.add_argument(
+        "--redis-db",
+        type=int,
+        default=0,
+        help="The first of the Redis DBs used by the benchmarks, which use 5 DBs (default: 0)",
+    )
+    arg_parser.add_argument(
+        "-o", "--output", help="The JSON file where the report is stored"
+    )
+    arg_parser.add_argument(
+        "-c",
+        "--compare",
+        help="A JSON report of a previous run: the process fails if any benchmark is slower than in it",
+    )
+    arg_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="The slowdown allowed with respect to the compared report, as a fraction (default: 0.1)",
+    )
+    args = arg_parser.parse_args()
+    if not args.redis and suite.fakeredis is None:
+        arg_parser.error(
+            "--redis is required since fakeredis is not installed "
+            "(it is installed with: pip install 'oc-index[benchmark]')"
+        )
+
+    redis_host, redis_port = None, 6379
+    if args.redis:
+        redis_host, _, port = args.redis.rpartition(":")
+        if not redis_host:
+            redis_host, port = port, redis_port
+        redis_port = int(port)
+
+    report = run_suite(
+        args.benchmark,
+        brs=args.brs,
+        degree=args.degree,
+        skew=args.skew,
+        seed=args.seed,
+        repeat=args.repeat,
+        redis_host=redis_host,
+        redis_port=redis_port,
+        redis_db=args.redis_db,
+    )
+    print(format_report(report))
+    if args.output:
+        save_report(report, args.output)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        regressions = compare(report, load_report(args.compare), args.tolerance)
+        for name, ratio in regressions:
+            print("Regression: %s runs at %.0f%% of the compared throughput" % (name, ratio * 100))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+"""
+Bulk update of a triplestore (Blazegraph, QLever, Virtuoso, ...) through its SPARQL
+Update endpoint, as an alternative to oc_index.oci.update.
+
+The N-Triples files are streamed line by line, without parsing them with rdflib:
+each line is already a valid SPARQL triple pattern (the terms, literals included,
+are escaped in the same way), and it is sent as it is. The triples of each file are
+grouped in chunks bounded in number of triples and in bytes, sent as INSERT DATA or
+DELETE DATA requests by a pool of threads sharing a pooled HTTP session, retrying
+with exponential backoff when the endpoint fails or is busy. Each chunk done is
+recorded in a manifest, so that an interrupted update can be resumed (with the same
+chunk sizes) without sending the chunks already done again.
+
+The TTL files must contain one triple per line with full IRIs (as the ones produced
+by CNC), i.e. be N-Triples files as well.
+"""
+
+import gzip
+import os
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from zipfile import ZipFile
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from oc_index.utils.tasks import Manifest
+
+INSERT = "INSERT"
+DELETE = "DELETE"
+INPUT_EXTENSIONS = (".nt", ".ttl", ".nt.gz", ".ttl.gz", ".zip")
+# The status codes of the responses worth retrying
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def iter_input_files(input_path):
+    """It returns, sorted, the N-Triples files (also compressed with gzip, or in ZIP
+    files) in the input path, either a file or a directory explored recursively."""
+    if not os.path.isdir(input_path):
+        return [input_path]
+    files = []
+    for cur_dir, _, cur_files in os.walk(input_path):
+        for cur_file in cur_files:
+            if cur_file.endswith(INPUT_EXTENSIONS):
+                files.append(os.path.join(cur_dir, cur_file))
+    return sorted(files)
+
+
+def _iter_lines(path):
+    if path.endswith(".zip"):
+        with ZipFile(path) as archive:
+            for member in sorted(archive.namelist()):
+                if member.endswith(INPUT_EXTENSIONS):
+                    with archive.open(member) as f:
+                        yield from f
+    elif path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            yield from f
+    else:
+        with open(path, "rb") as f:
+            yield from f
+
+
+def iter_triples(path):
+    """It yields the triples (as bytes, without the final newline) in an N-Triples
+    file, skipping the empty lines and the comments."""
+    for line in _iter_lines(path):
+        line = line.strip()
+        if not line or line.startswith(b"#"):
+            continue
+        if line.startswith((b"@prefix", b"@base", b"PREFIX", b"BASE")):
+            raise ValueError(
+                "The file '%s' is not an N-Triples file (it declares prefixes)" % path
+            )
+        yield line
+
+
+def iter_chunks(triples, max_triples=10000, max_bytes=4000000):
+    """It groups the triples in chunks with at most 'max_triples' triples and (if
+    there is more than one triple) 'max_bytes' bytes."""
+    chunk = []
+    size = 0
+    for triple in triples:
+        if chunk and (len(chunk) == max_triples or size + len(triple) + 1 > max_bytes):
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append(triple)
+        size += len(triple) + 1
+    if chunk:
+        yield chunk
+
+
+def build_update(operation, triples, graph=None):
+    """It returns the SPARQL Update request (as bytes) adding (INSERT) or removing
+    (DELETE) the triples, in the graph if specified."""
+    if operation not in (INSERT, DELETE):
+        raise ValueError("Unknown update operation: %s" % operation)
+    body = b"\n".join(triples)
+    if graph:
+        body = b"GRAPH <" + graph.encode("utf-8") + b"> {\n" + body + b"\n}"
+    return operation.encode("utf-8") + b" DATA {\n" + body + b"\n}"
+
+
+def chunk_key(operation, path, chunk):
+    """It returns the key of a chunk of a file in the manifest."""
+    return "%s\t%s\t%d" % (operation, os.path.abspath(path), chunk)
+
+
+class SparqlUpdater(object):
+    """It sends SPARQL Update requests to an endpoint through a pooled HTTP session,
+    retrying them with exponential backoff when the endpoint is not reachable or
+    answers with one of RETRY_STATUS."""
+
+    def __init__(self, endpoint, retries=5, backoff=1.0, timeout=600, pool_size=10):
+        self.endpoint = endpoint
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def update(self, query):
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(
+                    self.endpoint,
+                    data=query,
+                    headers={"Content-Type": "application/sparql-update; charset=UTF-8"},
+                    timeout=self.timeout,
+                )
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response
+                error = requests.HTTPError(
+                    "%d response from %s" % (response.status_code, self.endpoint),
+                    response=response,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if attempt < self.retries:
+                time.sleep(self.backoff * 2**attempt)
+        raise error
+
+    def close(self):
+        self.session.close()
+
+
+def bulk_update(
+    updater,
+    operation,
+    files,
+    graph=None,
+    manifest=None,
+    workers=4,
+    max_triples=10000,
+    max_bytes=4000000,
+    verbose=False,
+):
+    """It adds (INSERT) or removes (DELETE) the triples in the files, sending up to
+    'workers' requests at the same time and skipping the chunks in the manifest. It
+    returns the number of chunks and of triples sent."""
+    n_chunks = n_triples = 0
+    pending = set()
+
+    def send(key, chunk):
+        updater.update(build_update(operation, chunk, graph))
+        if manifest is not None:
+            manifest.add(key)
+        return len(chunk)
+
+    def collect(return_when):
+        nonlocal n_chunks, n_triples
+        done, not_done = wait(pending, return_when=return_when)
+        for future in done:
+            n_triples += future.result()
+            n_chunks += 1
+        return not_done
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path in files:
+            if verbose:
+                print("%s DATA: '%s'" % (operation, path))
+            for idx, chunk in enumerate(
+                iter_chunks(iter_triples(path), max_triples, max_bytes)
+            ):
+                key = chunk_key(operation, path, idx)
+                if manifest is not None and key in manifest:
+                    continue
+                # The chunks in memory are at most twice the requests in flight
+                if len(pending) >= 2 * workers:
+                    pending = collect(FIRST_COMPLETED)
+                pending.add(executor.submit(send, key, chunk))
+        collect(ALL_COMPLETED)
+    return n_chunks, n_triples
+
+
+def main():
+    arg_parser = ArgumentParser(
+        description="Add and/or remove the triples in N-Triples files to/from a "
+        "triplestore, with parallel SPARQL Update requests of bounded size. The chunks "
+        "done are recorded in a manifest file, so that the update can be resumed."
+    )
+    arg_parser.add_argument(
+        "-s", "--sparql_endpoint", required=True, help="The URL of the SPARQL Update endpoint"
+    )
+    arg_parser.add_argument(
+        "-i", "--input", help="The N-Triples file (or directory of files) of the triples to add"
+    )
+    arg_parser.add_argument(
+        "-i_r", "--input_r", help="The N-Triples file (or directory of files) of the triples to remove"
+    )
+    arg_parser.add_argument("-g", "--graph", default=None, help="The graph of the triples")
+    arg_parser.add_argument(
+        "-m",
+        "--manifest",
+        default="bulk_update_manifest.txt",
+        help="The file recording the chunks done",
+    )
+    arg_parser.add_argument(
+        "-w", "--workers", type=int, default=4, help="Number of requests sent at the same time"
+    )
+    arg_parser.add_argument(
+        "-n", "--number", type=int, default=10000, help="Maximum number of triples per request"
+    )
+    arg_parser.add_argument(
+        "-b", "--bytes", type=int, default=4000000, help="Maximum size of the triples per request"
+    )
+    arg_parser.add_argument(
+        "-r", "--retries", type=int, default=5, help="Number of times a failed request is retried"
+    )
+    args = arg_parser.parse_args()
+
+    if not args.input and not args.input_r:
+        arg_parser.error("at least one of --input and --input_r is required")
+
+    manifest = Manifest(args.manifest, {"max_triples": args.number, "max_bytes": args.bytes})
+    updater = SparqlUpdater(args.sparql_endpoint, args.retries, pool_size=args.workers)
+    try:
+        for operation, input_path in ((INSERT, args.input), (DELETE, args.input_r)):
+            if input_path:
+                n_chunks, n_triples = bulk_update(
+                    updater,
+                    operation,
+                    iter_input_files(input_path),
+                    args.graph,
+                    manifest,
+                    args.workers,
+                    args.number,
+                    args.bytes,
+                    True,
+                )
+                print("%s DATA: %d triples sent in %d requests" % (operation, n_triples, n_chunks))
+    finally:
+        updater.close()
+        manifest.close()
+
+
+if __name__ == "__main__":
+    main()
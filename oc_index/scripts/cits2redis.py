@@ -19,6 +19,7 @@ import sys
 from tqdm import tqdm
 from oc_index.utils.logging import get_logger
 from oc_index.utils.config import get_config
+from oc_index.utils.citation_count import CitationCounts
 
 csv.field_size_limit(sys.maxsize)
 
@@ -81,18 +82,36 @@ def extract_oci_from_line(line):
     return line[start:end]
 
 
-def upload2redis(rconn, logger, dump_path="", intype="", config=None):
+def upload2redis(rconn, logger, dump_path="", intype="", config=None, counts=None):
     intype = intype.upper()
     pipe = rconn.pipeline()
     counter = 0
     total = 0
+    # with the citation counts, the citations are added (and counted) by them
+    to_count = []
 
     def flush_pipeline():
         nonlocal counter
         if counter > 0:
-            pipe.execute()
+            if counts is None:
+                pipe.execute()
+            else:
+                counts.add(to_count)
+                to_count.clear()
             counter = 0
 
+    def add_citation(cited, citing):
+        nonlocal counter, total
+        if counts is None:
+            pipe.sadd(cited, citing)
+        else:
+            to_count.append((cited, citing))
+        counter += 1
+        total += 1
+
+        if counter >= BATCH_SIZE:
+            flush_pipeline()
+
     logger.info("Starting streaming upload to Redis...")
 
     if intype == "RDF_ZIP":
@@ -118,12 +137,7 @@ def upload2redis(rconn, logger, dump_path="", intype="", config=None):
                                     except ValueError:
                                         continue
 
-                                    pipe.sadd(cited, citing)
-                                    counter += 1
-                                    total += 1
-
-                                    if counter >= BATCH_SIZE:
-                                        flush_pipeline()
+                                    add_citation(cited, citing)
 
     elif intype == "TTL":
         for filename in os.listdir(dump_path):
@@ -144,12 +158,7 @@ def upload2redis(rconn, logger, dump_path="", intype="", config=None):
                         except ValueError:
                             continue
 
-                        pipe.sadd(cited, citing)
-                        counter += 1
-                        total += 1
-
-                        if counter >= BATCH_SIZE:
-                            flush_pipeline()
+                        add_citation(cited, citing)
 
     elif intype == "CSV_ZIP":
         for filename in os.listdir(dump_path):
@@ -179,12 +188,7 @@ def upload2redis(rconn, logger, dump_path="", intype="", config=None):
                                     if not citing or not cited:
                                         continue
 
-                                    pipe.sadd(cited, citing)
-                                    counter += 1
-                                    total += 1
-
-                                    if counter >= BATCH_SIZE:
-                                        flush_pipeline()
+                                    add_citation(cited, citing)
 
     else:
         raise ValueError("intype must be one of 'TTL', 'RDF_ZIP', or 'CSV_ZIP'")
@@ -241,8 +245,21 @@ def main():
         db=int(_config.get("cnc", "db_cits"))
     )
 
+    # Citation counts of each BR, updated while the citations are added
+    counts = None
+    db_counts = _config.get("cnc", "db_counts", fallback="")
+    if db_counts:
+        counts = CitationCounts(
+            Redis(
+                host=_config.get("redis", "host"),
+                port=int(_config.get("redis", "port")),
+                db=int(db_counts),
+            ),
+            rconn,
+        )
+
     _logger.info("Uploading citations in RDF format to Redis ...")
-    upload2redis(rconn, _logger, args.dump, args.intype, _config)
+    upload2redis(rconn, _logger, args.dump, args.intype, _config, counts)
     _logger.info("Done!")
 
 
@@ -30,6 +30,7 @@ from oc_index.utils.config import get_config
 from oc_index.oci.citation import Citation
 from oc_index.oci.storer import CitationStorer
 from oc_index.glob.redis import RedisDataSource
+from oc_index.utils.citation_count import CitationCounts
 
 import logging
 
@@ -48,6 +49,7 @@ source: str
 redis_br: redis.Redis  # type: ignore[type-arg]
 redis_cits_cache: redis.Redis  # type: ignore[type-arg]
 redis_cits: redis.Redis
+cits_counts: CitationCounts | None = None
 
 
 def save_data(output_dir, cits_obj, pid = 0, force = False):
@@ -190,6 +192,23 @@ def set_cits(collection, checkindex, l_cits, pid=0):
     return res_cits
 
 
+def update_counts(collection, cits):
+    """
+    Add the citations to OC INDEX (the citations DB) and update the citation counts of their BRs,
+    only the citations not already in the index are counted
+    Args:
+        collection (string, mandatory): name if the source collection in OpenCitations: "COCI","DOCI", etc.
+        cits (dict, mandatory): <oci>:(<citing>,<cited>)
+    """
+    if cits_counts is None or not cits:
+        return
+    n_counted = cits_counts.add(
+        (cited_omid.replace("omid:", ""), collection.lower() + ":" + citing_omid.replace("omid:", ""))
+        for citing_omid, cited_omid in cits.values()
+    )
+    _logger.info("[STATS] #Citations added to OC INDEX= "+str(n_counted))
+
+
 def cnc(collection, input_files, intype, output_dir, pid = 0, checkindex = False):
     """
     Creates RDF data for the new citations ready to be ingested in OpenCitations Index – OMID to OMID citations
@@ -241,10 +260,12 @@ def cnc(collection, input_files, intype, output_dir, pid = 0, checkindex = False
                             cits_in_file = [(row[citing_col],row[cited_col]) for row in list(csv.DictReader(io.TextIOWrapper(csv_file)))]
                             ocindex_cits = set_cits(
                                 collection,
+                                checkindex,
                                 cits_in_file,
                                 pid
                             )
                             cits_objs = cits_objs + gen_cits(ocindex_cits, pid)
+                            update_counts(collection, ocindex_cits)
                             if save_data(output_dir, cits_objs, pid):
                                 cits_objs = []
 
@@ -263,10 +284,12 @@ def cnc(collection, input_files, intype, output_dir, pid = 0, checkindex = False
                             cits_in_file = [(row[citing_col],row[cited_col]) for row in list(csv.DictReader(io.TextIOWrapper(csv_file)))]
                             ocindex_cits = set_cits(
                                 collection,
+                                checkindex,
                                 cits_in_file,
                                 pid
                             )
                             cits_objs = cits_objs + gen_cits(ocindex_cits, pid)
+                            update_counts(collection, ocindex_cits)
                             if save_data(output_dir, cits_objs, pid):
                                 cits_objs = []
 
@@ -287,6 +310,7 @@ def cnc(collection, input_files, intype, output_dir, pid = 0, checkindex = False
 
                 ocindex_cits = set_cits(collection, checkindex, cits_in_file, pid)
                 cits_objs = cits_objs + gen_cits(ocindex_cits, pid)
+                update_counts(collection, ocindex_cits)
                 if save_data(output_dir, cits_objs, pid):
                     cits_objs = []
 
@@ -364,10 +388,18 @@ def main():
         help="Check in case the new citations to generate are already in oc-index (a proper REDIS DB)",
     )
 
+    arg_parser.add_argument(
+        "-u",
+        "--updateindex",
+        action="store_true",
+        default=False,
+        help="Add the new citations to oc-index (a proper REDIS DB) and update the citation counts of their BRs (the REDIS DB db_counts in the CONFIG file)",
+    )
+
     args = arg_parser.parse_args()
 
     global _logger, idbase_url, index_identifier, source_identifier, agent, service_name, baseurl, source
-    global redis_br, redis_cits_cache, redis_cits
+    global redis_br, redis_cits_cache, redis_cits, cits_counts
 
     _config = get_config(args.config)
     _logger = get_logger()
@@ -413,6 +445,15 @@ def main():
         decode_responses=True,
     )
 
+    if args.updateindex:
+        db_counts = _config.get("cnc", "db_counts", fallback="")
+        if not db_counts:
+            raise ValueError("The REDIS DB db_counts must be specified in the CONFIG file to update the index")
+        cits_counts = CitationCounts(
+            redis.Redis(host="127.0.0.1", port=6379, db=int(db_counts), decode_responses=True),
+            redis_cits,
+        )
+
     # input directory/file
     input_files = []
     if os.path.isdir(args.input):
@@ -448,7 +489,7 @@ def main():
             p.join()
     else:
         # fallback: single process
-        cnc(collection, input_files, intype, output_dir, 0)
+        cnc(collection, input_files, intype, output_dir, 0, args.checkindex)
 
     _logger.info("All Done!")
     # 4. Continue with the rest of your code **after all files are done**
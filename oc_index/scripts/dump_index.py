@@ -23,12 +23,16 @@ from oc_index.oci.citation import Citation, OCIManager
 from oc_index.utils.config import get_config
 from oc_index.utils.logging import get_logger
 from oc_index.oci.storer import CitationStorer
+from oc_index.utils.redis_scan import RedisScanner, prefix_shards, shard_digits
 
 import logging
 
 data_to_dump = defaultdict(list)
 
 CITED_BATCH_SIZE = 1500
+# SCAN shards: 10^SHARD_DIGITS MATCH patterns on the digits after the OMID prefix
+OMID_PREFIX = "06"
+SHARD_DIGITS = 0
 CITED_PER_FILE = 10000
 FILES_PER_ZIP = 1000
 FILE_OUTPUT_DIR = "_out_"
@@ -102,7 +106,7 @@ def chunk_list(lst, n):
 def main():
 
     global _logger, idbase_url, baseurl, agent, source, service_name, index_identifier
-    global FILE_OUTPUT_DIR
+    global FILE_OUTPUT_DIR, SHARD_DIGITS
 
     arg_parser = ArgumentParser(description="Dump OpenCitations Index data. This process reads all the data in Redis and creates a new data dump for the OpenCitations Index. The outputs are compressed, to all dump formats: CSV, RDF, SCHOLIX. **Make sure the Redis datasets are populated before running this script**")
     arg_parser.add_argument(
@@ -124,6 +128,14 @@ def main():
         help="Maximum number of workers for parallel execution (default is set to 1, Recommended not higher than between 3 and 6)",
     )
 
+    arg_parser.add_argument(
+        "--shard-digits",
+        required=False,
+        type=int,
+        default=None,
+        help="The SCAN of the citations DB is split in 10^N shards according to the N digits following the OMID prefix, read in parallel by the workers (default is the fewest digits giving a shard per worker, 0 disables the sharding, there is no sharding with 1 worker)",
+    )
+
     args = arg_parser.parse_args()
     _config = get_config(args.config)
     _logger = get_logger()
@@ -155,6 +167,7 @@ def main():
     # CITED_PER_FILE = 50000
     # FILES_PER_ZIP = 100
     WORKERS = int(args.workers)
+    SHARD_DIGITS = shard_digits(WORKERS, args.shard_digits)
 
     _logger.info(
         "--------- Process ----------\n"
@@ -162,6 +175,7 @@ def main():
         f"CITED_PER_FILE: {CITED_PER_FILE}\n"
         f"FILES_PER_ZIP: {FILES_PER_ZIP}\n"
         f"WORKERS: {WORKERS}\n"
+        f"SHARD_DIGITS: {SHARD_DIGITS}\n"
     )
 
     # === REDIS ===
@@ -188,36 +202,31 @@ def main():
     _logger.info("Data will be stored in: "+FILE_OUTPUT_DIR)
 
 
-    cursor = 0
-
-    # iterate over all the citing entities
-    while True:
-
-        # index of entites to process
-        # <citing_omid>: [<cited_omid_1>, <cited_omid_2>, <cited_omid_3> ... ]
-        cits_pairs_to_process = []
-        br_meta = {}
-
-        # get from redis first CITED_BATCH_SIZE citing entites
-        cursor, cited_keys = redis_cits.scan(cursor=cursor, count=CITED_BATCH_SIZE)
-        if cited_keys:  # only fetch if we got keys
-
-            pipe = redis_cits.pipeline()
-            for key in cited_keys:
-                pipe.smembers(key)
-
-            citing_values = pipe.execute()
-
-            for _a_cited, _val_citing in zip(cited_keys, citing_values):
-                # to_process
-                _a_cited = "omid:br/"+_a_cited
-                _l_citing = ["omid:br/"+_a for _a in _val_citing]
-
-                cits_pairs_to_process += [(_a_citing, _a_cited) for _a_citing in _l_citing]
-                # get also the metadata of the BRs involved
-                br_keys = _l_citing + [_a_cited]
-                metadata_values = redis_metadata.mget(br_keys)
-                br_meta.update( dict(zip(br_keys, metadata_values)) )
+    # iterate over all the cited entities, the SCAN is split in shards
+    # (by the digits following the OMID supplier prefix) read in parallel
+    shards = ["*"]
+    if SHARD_DIGITS:
+        shards = prefix_shards(OMID_PREFIX, SHARD_DIGITS, complete=True)
+    scanner = RedisScanner(
+        redis_cits,
+        shards,
+        fetch="smembers",
+        count=CITED_BATCH_SIZE,
+        batch_size=CITED_BATCH_SIZE,
+        workers=WORKERS,
+        log_every=CITED_PER_FILE * 10,
+        logger=_logger,
+    )
+    batches = iter(scanner)
+    batch = next(batches, None)
+    while batch is not None:
+        cited_keys, citing_values = batch
+        # look ahead to know whether this is the last batch
+        batch = next(batches, None)
+
+        cits_pairs_to_process, br_meta = collect_pairs(
+            cited_keys, citing_values, redis_metadata
+        )
 
         # in case there are some entities to process iterate over all citation pairs
         if cits_pairs_to_process:
@@ -226,7 +235,7 @@ def main():
 
             processes = []
             for idx,chunk in enumerate(chunks):
-                p = Process(target=process_pair, args=(chunk, idx, br_meta, cursor == 0))
+                p = Process(target=process_pair, args=(chunk, idx, br_meta, batch is None))
                 p.start()
                 processes.append(p)
 
@@ -234,29 +243,29 @@ def main():
             for p in processes:
                 p.join()
 
-        # in case there are some entities to process iterate over all citation pairs
-        # if cits_pairs_to_process:
-        #
-        #     chunks = chunk_list(cits_pairs_to_process, WORKERS)
-        #
-        #     results = []
-        #     with ThreadPoolExecutor(max_workers=WORKERS) as executor:
-        #         futures = [
-        #             executor.submit(process_pair, chunk, idx, br_meta, cursor == 0)
-        #             for idx, chunk in enumerate(chunks)
-        #         ]
-        #
-        #         # Option 1: process results as they complete
-        #         # for f in as_completed(futures):
-        #         #     results.append(f.result())
-        #
-        #         # Option 2: just wait and collect all at once
-        #         results = [f.result() for f in futures]
-
-
-        # when <cursor> is 0 then break, scan completed
-        if cursor == 0:
-            break
+
+def collect_pairs(cited_keys, citing_values, redis_metadata):
+    """It returns the (citing, cited) OMID pairs of a batch of the citations DB
+    (the cited keys and the sets of their citing entities) and the metadata of
+    all the BRs involved, taken from the metadata DB in a single round trip."""
+    # index of entites to process
+    # <citing_omid>: [<cited_omid_1>, <cited_omid_2>, <cited_omid_3> ... ]
+    cits_pairs_to_process = []
+    br_keys = set()
+    for _a_cited, _val_citing in zip(cited_keys, citing_values):
+        if not _val_citing:
+            continue
+        # to_process
+        _a_cited = "omid:br/"+_a_cited
+        _l_citing = ["omid:br/"+_a for _a in _val_citing]
+
+        cits_pairs_to_process += [(_a_citing, _a_cited) for _a_citing in _l_citing]
+        br_keys.update(_l_citing)
+        br_keys.add(_a_cited)
+
+    br_keys = list(br_keys)
+    br_meta = dict(zip(br_keys, redis_metadata.mget(br_keys))) if br_keys else {}
+    return cits_pairs_to_process, br_meta
 
 
 def process_pair(pairs, pnum, br_meta, end_cursor = False):
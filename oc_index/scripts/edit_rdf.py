@@ -1,31 +1,107 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
 import os
+import re
 from argparse import ArgumentParser
+from zipfile import ZIP_DEFLATED, ZipFile
 from tqdm import tqdm
 
-def edit_files(input_file, output_file, strings_to_remove, strings_to_replace):
-    with open(input_file, 'r') as file:
-        lines = file.readlines()
+from oc_index.utils.tasks import run_tasks
+
+
+def _alternation(strings):
+    # The longest strings first, so that a string is preferred to its prefixes
+    return re.compile(
+        b"|".join(re.escape(s) for s in sorted(strings, key=len, reverse=True))
+    )
+
 
-    filtered_lines = []
+def compile_edits(strings_to_remove, strings_to_replace):
+    """
+    Compile the strings that make a line to be removed and the (old, new) replacements
+    into a single pattern each, matched on the bytes of the lines. The replacements
+    are applied in one pass, so the new strings are never replaced again.
+    """
+    strings_to_remove = [s.encode("utf-8") for s in strings_to_remove]
+    replacements = {old.encode("utf-8"): new.encode("utf-8") for old, new in strings_to_replace}
+    remove_pattern = _alternation(strings_to_remove) if strings_to_remove else None
+    replace_pattern = _alternation(replacements) if replacements else None
+    return remove_pattern, replace_pattern, replacements
+
+
+def edit_lines(lines, edits):
+    """
+    Yield the lines (as bytes) that do not contain any of the strings to remove,
+    after applying the replacements.
+    """
+    remove_pattern, replace_pattern, replacements = edits
+    replace = lambda match: replacements[match.group(0)]
     for line in lines:
-        remove_it = False
-        for s in strings_to_remove:
-            remove_it = remove_it or (s in line)
+        if remove_pattern is not None and remove_pattern.search(line):
+            continue
+        if replace_pattern is not None:
+            line = replace_pattern.sub(replace, line)
+        yield line
+
+
+def edit_files(input_file, output_file, strings_to_remove, strings_to_replace):
+    with open(input_file, 'rb') as i_file, open(output_file, 'wb') as o_file:
+        o_file.writelines(
+            edit_lines(i_file, compile_edits(strings_to_remove, strings_to_replace))
+        )
+
 
-        if not remove_it:
-            for s in strings_to_replace:
-                line = line.replace(s[0],s[1])
+def edit_input(input_file, out_dir, strings_to_remove, strings_to_replace, to_zip=False):
+    """
+    Edit a TTL file, or all the TTL files in a ZIP file, storing the result in the
+    output directory with the same name. The ZIP files are written as ZIP files, as
+    the TTL files if 'to_zip' is True (e.g. 'a.ttl' is stored as 'a.ttl' in 'a.zip').
+    """
+    filename = os.path.basename(input_file)
+    edits = compile_edits(strings_to_remove, strings_to_replace)
+    if filename.endswith(".zip"):
+        with ZipFile(input_file) as i_zip, ZipFile(
+            os.path.join(out_dir, filename), "w", ZIP_DEFLATED
+        ) as o_zip:
+            for member in i_zip.namelist():
+                if member.endswith(".ttl"):
+                    with i_zip.open(member) as i_file, o_zip.open(member, "w") as o_file:
+                        o_file.writelines(edit_lines(i_file, edits))
+    elif to_zip:
+        zip_name = os.path.splitext(filename)[0] + ".zip"
+        with open(input_file, "rb") as i_file, ZipFile(
+            os.path.join(out_dir, zip_name), "w", ZIP_DEFLATED
+        ) as o_zip, o_zip.open(filename, "w") as o_file:
+            o_file.writelines(edit_lines(i_file, edits))
+    else:
+        edit_files(input_file, os.path.join(out_dir, filename), strings_to_remove, strings_to_replace)
+    return filename
 
-            filtered_lines.append(line)
 
-    with open(output_file, 'w') as file:
-        file.writelines(filtered_lines)
+def edit_directory(directory, out_dir, strings_to_remove, strings_to_replace, workers=1, to_zip=False):
+    """
+    Edit all the TTL and ZIP files in the directory, in parallel if more than one worker.
+    It yields the names of the files as they are done.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    inputs = [
+        (os.path.join(directory, filename),)
+        for filename in sorted(os.listdir(directory))
+        if filename.endswith((".ttl", ".zip"))
+        and os.path.isfile(os.path.join(directory, filename))
+    ]
+    yield from run_tasks(
+        edit_input,
+        inputs,
+        (out_dir, strings_to_remove, strings_to_replace, to_zip),
+        workers,
+    )
+
 
 def main():
     arg_parser = ArgumentParser(description="Convert RDF files")
@@ -33,7 +109,7 @@ def main():
         "-i",
         "--input",
         required=True,
-        help="The directory storing the TTL files",
+        help="The directory storing the TTL files (and/or ZIP files of TTL files)",
     )
     arg_parser.add_argument(
         "-o",
@@ -48,6 +124,20 @@ def main():
         default= "index",
         help="Convert RDF data produced by CNC into: (1) RDF data for the unified citations INDEX => 'index'; (2) RDF data for a specific the citaion [[DATA SOURCE]]s => 'coci' | 'doci' | etc ",
     )
+    arg_parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes converting the files in parallel",
+    )
+    arg_parser.add_argument(
+        "-z",
+        "--zip",
+        action="store_true",
+        default=False,
+        help="Store each converted TTL file in a ZIP file (ZIP inputs are always stored as ZIP files)",
+    )
     args = arg_parser.parse_args()
 
     directory = args.input if args.input[-1] != "/" else args.input[0:-1]
@@ -65,11 +155,9 @@ def main():
             )
         )
 
-    for filename in tqdm(os.listdir(directory)):
-        file_path = os.path.join(directory, filename)
-        if os.path.isfile(file_path):
-            if filename.endswith(".ttl"):
-                print("Processing file: "+filename)
-                edit_files(file_path, out_dir+"/"+filename, triples_to_remove, triples_to_replace)
+    for filename in tqdm(
+        edit_directory(directory, out_dir, triples_to_remove, triples_to_replace, args.workers, args.zip)
+    ):
+        print("Processed file: "+filename)
 
     print("Done!")
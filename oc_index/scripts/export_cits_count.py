@@ -0,0 +1,70 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+from argparse import ArgumentParser
+
+from redis import Redis
+
+from oc_index.utils.citation_count import CitationCounts
+from oc_index.utils.config import get_config
+from oc_index.utils.logging import get_logger
+
+
+def main():
+    arg_parser = ArgumentParser(
+        description="Export the citation counts of the BRs in OpenCitations Index "
+        "(kept in the REDIS DB db_counts by cits2redis and CNC) sorted by OMID, either "
+        "as a binary file of int64 records (plus a JSON file describing its columns) "
+        "or as a Parquet file"
+    )
+    arg_parser.add_argument(
+        "--config",
+        required=True,
+        help="Path to the configuration file (config.ini)",
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        help="The path of the file to create",
+    )
+    arg_parser.add_argument(
+        "-f",
+        "--format",
+        default="bin",
+        choices=["bin", "parquet"],
+        help="The format of the output file (default is bin, parquet requires pyarrow)",
+    )
+    arg_parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes reading the counts from Redis in parallel",
+    )
+    args = arg_parser.parse_args()
+
+    _config = get_config(args.config)
+    _logger = get_logger()
+
+    db_counts = _config.get("cnc", "db_counts", fallback="")
+    if not db_counts:
+        raise ValueError("The REDIS DB db_counts is not specified in the CONFIG file")
+
+    counts = CitationCounts(
+        Redis(
+            host=_config.get("redis", "host"),
+            port=int(_config.get("redis", "port")),
+            db=int(db_counts),
+        )
+    )
+    _logger.info("Exporting the citation counts ...")
+    n_brs = counts.export(args.output, args.format, args.workers)
+    _logger.info(f"Exported the citation counts of {n_brs} BRs in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
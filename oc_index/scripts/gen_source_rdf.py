@@ -1,13 +1,18 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
 import argparse
+import gzip
 import os
 import re
 import csv
+from zipfile import ZipFile
+
+from oc_index.utils.tasks import run_tasks
 
 RDF_TYPE = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
 CITATION = "<http://purl.org/spar/cito/Citation>"
@@ -15,23 +20,36 @@ PROV_AT_LOCATION = "<http://www.w3.org/ns/prov#atLocation>"
 
 CI_URI_PATTERN = re.compile(r"<https://w3id.org/oc/index/ci/([^>]+)>")
 
+# The lines are matched as bytes, without decoding them
+SUBJECT_PATTERN = re.compile(
+    rb"^\s*(<[^>]+>)\s+"
+    + re.escape(RDF_TYPE.encode())
+    + rb"\s+"
+    + re.escape(CITATION.encode())
+)
+
 
 def extract_citation_subjects(ttl_path):
     """
     Extract subjects of rdf:type cito:Citation triples.
     """
-    subjects = set()
-    pattern = re.compile(
-        r'^(<[^>]+>)\s+' + re.escape(RDF_TYPE) + r'\s+' + re.escape(CITATION)
-    )
+    with open(ttl_path, "rb") as f:
+        return {subj.decode("utf-8") for subj in iter_citation_subjects(f)}
 
-    with open(ttl_path, encoding="utf-8") as f:
-        for line in f:
-            match = pattern.match(line.strip())
-            if match:
-                subjects.add(match.group(1))
 
-    return subjects
+def iter_citation_subjects(lines):
+    """
+    Yield (as bytes) the subjects of the rdf:type cito:Citation triples in the lines,
+    in order of appearance and once each.
+    """
+    seen = set()
+    for line in lines:
+        match = SUBJECT_PATTERN.match(line)
+        if match:
+            subj = match.group(1)
+            if subj not in seen:
+                seen.add(subj)
+                yield subj
 
 
 def extract_ci_id(subject_uri):
@@ -42,41 +60,100 @@ def extract_ci_id(subject_uri):
     return match.group(1) if match else None
 
 
-def process_directory(input_dir, param):
-    param = param.lower()
-    location_uri = f"<https://w3id.org/oc/index/{param}/>"
-    output_dir = os.getcwd()
-
-    for filename in os.listdir(input_dir):
-        if not filename.lower().endswith(".ttl"):
-            continue
-
-        input_path = os.path.join(input_dir, filename)
-        base, _ = os.path.splitext(filename)
-
-        ttl_out = os.path.join(output_dir, f"{base}-{param}.ttl")
-        csv_out = os.path.join(output_dir, f"{base}-{param}.csv")
+def iter_ttl_inputs(input_path):
+    """
+    Yield the TTL inputs found in the input path (a directory, a ZIP file or a TTL file)
+    as (path, ZIP member or None, base name of the outputs). The directories may
+    contain both TTL and ZIP files.
+    """
+    if os.path.isdir(input_path):
+        for filename in sorted(os.listdir(input_path)):
+            file_path = os.path.join(input_path, filename)
+            if os.path.isfile(file_path) and filename.lower().endswith((".ttl", ".zip")):
+                yield from iter_ttl_inputs(file_path)
+    elif input_path.lower().endswith(".zip"):
+        zip_base = os.path.splitext(os.path.basename(input_path))[0]
+        with ZipFile(input_path) as archive:
+            for member in archive.namelist():
+                if member.lower().endswith(".ttl"):
+                    member_base = os.path.splitext(os.path.basename(member))[0]
+                    yield input_path, member, f"{zip_base}_{member_base}"
+    elif input_path.lower().endswith(".ttl"):
+        yield input_path, None, os.path.splitext(os.path.basename(input_path))[0]
+
+
+def iter_input_lines(path, member=None):
+    """
+    Yield the lines (as bytes) of a TTL file, or of a member of a ZIP file.
+    """
+    if member is None:
+        with open(path, "rb") as f:
+            yield from f
+    else:
+        with ZipFile(path) as archive, archive.open(member) as f:
+            yield from f
 
-        subjects = extract_citation_subjects(input_path)
-        if not subjects:
-            continue
 
-        # ---- Write TTL ----
-        with open(ttl_out, "w", encoding="utf-8") as ttl_file:
-            for subj in sorted(subjects):
-                ttl_file.write(
-                    f"{subj} {PROV_AT_LOCATION} {location_uri} .\n"
-                )
+def open_output(path, compress=False):
+    """
+    Open a text output file, compressed with gzip (adding '.gz' to its name) if required.
+    """
+    if compress:
+        return gzip.open(path + ".gz", "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
 
-        # ---- Write CSV ----
-        with open(csv_out, "w", newline="", encoding="utf-8") as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerow(["citation", "source"])
 
-            for subj in sorted(subjects):
-                ci_id = extract_ci_id(subj)
-                if ci_id:
-                    writer.writerow([ci_id, param])
+def process_input(path, member, base, param, output_dir, compress=False):
+    """
+    Create the TTL and CSV files with the prov:atLocation data of the Citation entities
+    in a TTL input, streaming them while the input is read. It returns the number of
+    citations found, the files are not created if there are none.
+    """
+    location = f" {PROV_AT_LOCATION} <https://w3id.org/oc/index/{param}/> .\n"
+    ttl_out = os.path.join(output_dir, f"{base}-{param}.ttl")
+    csv_out = os.path.join(output_dir, f"{base}-{param}.csv")
+
+    n_citations = 0
+    ttl_file = csv_file = None
+    try:
+        for subj in iter_citation_subjects(iter_input_lines(path, member)):
+            if ttl_file is None:
+                ttl_file = open_output(ttl_out, compress)
+                csv_file = open_output(csv_out, compress)
+                writer = csv.writer(csv_file)
+                writer.writerow(["citation", "source"])
+            subj = subj.decode("utf-8")
+            ttl_file.write(subj + location)
+            ci_id = extract_ci_id(subj)
+            if ci_id:
+                writer.writerow([ci_id, param])
+            n_citations += 1
+    finally:
+        if ttl_file is not None:
+            ttl_file.close()
+            csv_file.close()
+    return n_citations
+
+
+def process_directory(input_dir, param, output_dir=None, workers=1, compress=False):
+    """
+    Create, for each TTL input (a TTL file or a TTL member of a ZIP file) in the input,
+    the TTL and CSV files with the prov:atLocation data of its Citation entities.
+    It returns the total number of citations found.
+    """
+    param = param.lower()
+    if output_dir is None:
+        output_dir = os.getcwd()
+    os.makedirs(output_dir, exist_ok=True)
+
+    return sum(
+        run_tasks(
+            process_input,
+            iter_ttl_inputs(input_dir),
+            (param, output_dir, compress),
+            workers,
+        )
+    )
 
 
 def main():
@@ -86,16 +163,33 @@ def main():
     parser.add_argument(
         "-d", "--dir",
         required=True,
-        help="Directory containing input .ttl files"
+        help="Directory containing input .ttl files and/or .zip files of .ttl files (or a single .ttl/.zip file)"
     )
     parser.add_argument(
         "-p", "--param",
         required=True,
         help="Parameter used in output filenames and URIs (lowercased automatically)"
     )
+    parser.add_argument(
+        "-o", "--output",
+        default=None,
+        help="Directory where to store the output files (default: the current directory)"
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=1,
+        help="Number of processes handling the input files in parallel"
+    )
+    parser.add_argument(
+        "-c", "--compress",
+        action="store_true",
+        default=False,
+        help="Compress the output files with gzip"
+    )
 
     args = parser.parse_args()
-    process_directory(args.dir, args.param)
+    process_directory(args.dir, args.param, args.output, args.workers, args.compress)
 
 
 if __name__ == "__main__":
@@ -13,6 +13,7 @@ from tqdm import tqdm
 from collections import defaultdict
 from oc_index.utils.logging import get_logger
 from oc_index.utils.config import get_config
+from oc_index.utils.redis_scan import RedisScanner, prefix_shards, shard_digits
 
 
 
@@ -24,6 +25,20 @@ def main():
         required=True,
         help="Path to the configuration file (config.ini)",
     )
+    arg_parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes scanning the citations DB in parallel",
+    )
+    arg_parser.add_argument(
+        "--shard-digits",
+        type=int,
+        default=None,
+        help="The SCAN is split in 10^N shards according to the N digits following the OMID prefix "
+        "(default: the fewest digits giving a shard per worker, no sharding with one worker)",
+    )
     args = arg_parser.parse_args()
 
     _config = get_config(args.config)
@@ -36,17 +51,33 @@ def main():
     )
 
     CITED_BATCH_SIZE = 1500
-    cursor = 0
+    n_cited = 0
+    n_citations = 0
 
-    # iterate over all the citing entities
-    while True:
-
-        # index of entites to process
-        # <citing_omid>: [<cited_omid_1>, <cited_omid_2>, <cited_omid_3> ... ]
-        cits_pairs_to_process = []
-        br_meta = {}
+    # iterate over all the cited entities, reading the shards of the SCAN
+    # in parallel: each value is the SET of the citing entities
+    shards = ["*"]
+    digits = shard_digits(args.workers, args.shard_digits)
+    if digits:
+        shards = prefix_shards("06", digits, complete=True)
+    scanner = RedisScanner(
+        r_dbcits,
+        shards,
+        fetch="smembers",
+        count=CITED_BATCH_SIZE,
+        batch_size=CITED_BATCH_SIZE,
+        workers=args.workers,
+        log_every=CITED_BATCH_SIZE * 1000,
+        logger=_logger,
+    )
+    for cited_keys, citing_values in scanner:
+        for citing in citing_values:
+            if citing:
+                n_cited += 1
+                n_citations += len(citing)
 
-        # get from redis first CITED_BATCH_SIZE citing entites
-        cursor, cited_keys = r_dbcits.scan(cursor=cursor, count=CITED_BATCH_SIZE)
-        if cited_keys:  # only fetch if we got keys
-            citing_values = r_dbcits.mget(cited_keys)
+    _logger.info(
+        "--------- Index stats ----------\n"
+        f"Cited entities: {n_cited}\n"
+        f"Citations: {n_citations}\n"
+    )
@@ -38,6 +38,7 @@ from rich_argparse import RichHelpFormatter
 from scandir_rs import Walk  # type: ignore[import-untyped]
 
 from oc_index.utils.config import get_config
+from oc_index.utils.redis_scan import RedisScanner, prefix_shards, shard_digits
 
 console = Console()
 csv.field_size_limit(sys.maxsize)
@@ -46,6 +47,7 @@ BASE_IRI = "https://w3id.org/oc/meta/"
 DIR_SPLIT = 10000
 ITEMS_PER_FILE = 1000
 RDF_FILE_CACHE_SIZE = 512
+EXPORT_SHARD_PREFIX = "doi:10."
 RDF_CONTAINER_TYPES = {
     GraphEntity.iri_journal,
     GraphEntity.iri_journal_issue,
@@ -79,12 +81,29 @@ class RedisDB:
     def key_count(self):
         return self.rconn.dbsize()
 
-    def export_to_csv(self, filepath):
+    def export_to_csv(self, filepath, workers=1):
+        # Most of the keys are DOIs, thus the SCAN is split according to the
+        # first digits of their prefix and the shards are read in parallel
+        shards = ["*"]
+        digits = shard_digits(workers)
+        if digits:
+            shards = prefix_shards(EXPORT_SHARD_PREFIX, digits, complete=True)
         with open(filepath, "w", newline="") as f:
             writer = csv.writer(f)
-            for key in self.rconn.scan_iter():
-                members: set[str] = self.rconn.smembers(key)  # type: ignore[assignment]
-                writer.writerow([key, "; ".join(members)])
+            scanner = RedisScanner(
+                self.rconn,
+                shards,
+                fetch="smembers",
+                count=10000,
+                batch_size=10000,
+                workers=workers,
+            )
+            for keys, values in scanner:
+                writer.writerows(
+                    [key, "; ".join(members)]
+                    for key, members in zip(keys, values)
+                    if members is not None
+                )
 
 
 def get_key_ids(text):
@@ -527,8 +546,8 @@ def upload2redis(
 
         if not redis_only:
             console.print("Saving indexes to CSV...")
-            rconn_db_br.export_to_csv("meta_br.csv")
-            rconn_db_ra.export_to_csv("meta_ra.csv")
+            rconn_db_br.export_to_csv("meta_br.csv", num_workers)
+            rconn_db_ra.export_to_csv("meta_ra.csv", num_workers)
 
         return (str(rconn_db_br.key_count()), str(rconn_db_ra.key_count()))
     finally:
@@ -601,8 +620,8 @@ def upload_rdf2redis(
     try:
         if not redis_only:
             console.print("Saving indexes to CSV...")
-            rconn_db_br.export_to_csv("meta_br.csv")
-            rconn_db_ra.export_to_csv("meta_ra.csv")
+            rconn_db_br.export_to_csv("meta_br.csv", num_workers)
+            rconn_db_ra.export_to_csv("meta_ra.csv", num_workers)
 
         return (str(rconn_db_br.key_count()), str(rconn_db_ra.key_count()))
     finally:
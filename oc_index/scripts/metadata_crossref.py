@@ -3,93 +3,168 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
 from argparse import ArgumentParser
-from os import sep, walk
-from os.path import isdir, basename
-from json import load, loads
-from collections import deque
-import tarfile
+from json import dump
+from collections import Counter
+
+from oc_index.scripts.trim_crossref import iter_json_members, json_loads
+from oc_index.utils.tasks import run_tasks
+
+
+def _sort_key(value):
+    # The values of a field may have different types (e.g. numbers and strings),
+    # which are compared by type first
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return "number", value
+    return type(value).__name__, value
+
+
+class MetadataProfile(object):
+    """It collects, for each metadata field path (e.g. ['deposited', 'date-time']),
+    the number of items having it, its minimum and maximum values and a
+    histogram of its values. String values are counted by their first
+    'histogram_prefix' characters (e.g. 7 characters of a date-time give its
+    month), all the other values are counted as they are."""
+
+    def __init__(self, metadata_fields, histogram_prefix=7):
+        self.metadata_fields = metadata_fields
+        self.histogram_prefix = histogram_prefix
+        self.items = 0
+        self.items_with_references = 0
+        self.fields = {
+            "=>".join(field): {
+                "count": 0,
+                "min": None,
+                "max": None,
+                "histogram": Counter(),
+            }
+            for field in metadata_fields
+        }
+
+    @staticmethod
+    def get_value(item, field):
+        value = item
+        for key in field:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    def add_json(self, json_bytes):
+        json_doc = json_loads(json_bytes)
+        if "items" not in json_doc and "message" in json_doc:
+            json_doc = json_doc["message"]
+
+        for item in json_doc.get("items", []):
+            self.items += 1
+            if item.get("reference"):
+                self.items_with_references += 1
+            for field in self.metadata_fields:
+                value = MetadataProfile.get_value(item, field)
+                if value is None or isinstance(value, (dict, list)):
+                    continue
+                stats = self.fields["=>".join(field)]
+                stats["count"] += 1
+                if stats["min"] is None or _sort_key(value) < _sort_key(stats["min"]):
+                    stats["min"] = value
+                if stats["max"] is None or _sort_key(value) > _sort_key(stats["max"]):
+                    stats["max"] = value
+                if isinstance(value, str):
+                    value = value[: self.histogram_prefix]
+                stats["histogram"][value] += 1
+
+    def merge(self, other):
+        self.items += other.items
+        self.items_with_references += other.items_with_references
+        for name, other_stats in other.fields.items():
+            stats = self.fields[name]
+            if other_stats["count"]:
+                stats["count"] += other_stats["count"]
+                if stats["min"] is None or _sort_key(other_stats["min"]) < _sort_key(
+                    stats["min"]
+                ):
+                    stats["min"] = other_stats["min"]
+                if stats["max"] is None or _sort_key(other_stats["max"]) > _sort_key(
+                    stats["max"]
+                ):
+                    stats["max"] = other_stats["max"]
+                stats["histogram"].update(other_stats["histogram"])
+
+    def to_dict(self):
+        return {
+            "items": self.items,
+            "items_with_references": self.items_with_references,
+            "fields": {
+                name: {
+                    "count": stats["count"],
+                    "min": stats["min"],
+                    "max": stats["max"],
+                    "histogram": {
+                        str(key): value
+                        for key, value in sorted(
+                            stats["histogram"].items(), key=lambda kv: str(kv[0])
+                        )
+                    },
+                }
+                for name, stats in self.fields.items()
+            },
+        }
+
+
+def _profile_json(json_bytes, metadata_fields, histogram_prefix):
+    profile = MetadataProfile(metadata_fields, histogram_prefix)
+    profile.add_json(json_bytes)
+    return profile
+
+
+def _iter_documents(input_dir_or_targz_file):
+    for file_idx, json_bytes in enumerate(
+        iter_json_members(input_dir_or_targz_file), 1
+    ):
+        if file_idx % 1000 == 0:
+            print("Read %s files" % file_idx)
+        yield (json_bytes,)
+
+
+def profile(input_dir_or_targz_file, metadata_fields, workers=1, histogram_prefix=7):
+    """It profiles, in a single pass over the Crossref dump, all the metadata
+    field paths specified, and returns the resulting MetadataProfile."""
+    result = MetadataProfile(metadata_fields, histogram_prefix)
+    if workers <= 1:
+        for json_bytes in iter_json_members(input_dir_or_targz_file):
+            result.add_json(json_bytes)
+        return result
+
+    # The dump is read by this process, while the workers parse the JSON documents
+    # and return the profile of each of them. The queue is bounded to keep in
+    # memory only a few documents at a time.
+    for document_profile in run_tasks(
+        _profile_json,
+        _iter_documents(input_dir_or_targz_file),
+        (metadata_fields, histogram_prefix),
+        workers,
+        queue_size=workers * 2,
+    ):
+        result.merge(document_profile)
+    return result
 
 
 def process(input_dir_or_targz_file, metadata_field):
-    result = None
-    list_of_files = []
-    is_targz = False
-
-    if isdir(input_dir_or_targz_file):
-        for cur_dir, cur_subdir, cur_files in walk(input_dir_or_targz_file):
-            for cur_file in cur_files:
-                if cur_file.endswith(".json") and not basename(cur_file).startswith(
-                    "."
-                ):
-                    list_of_files.append(cur_dir + sep + cur_file)
-    elif input_dir_or_targz_file.endswith("tar.gz"):
-        is_targz = True
-        targz_fd = tarfile.open(input_dir_or_targz_file, "r:gz", encoding="utf-8")
-        for cur_file in targz_fd:
-            if cur_file.name.endswith(".json") and not basename(
-                cur_file.name
-            ).startswith("."):
-                list_of_files.append(cur_file)
-    else:
-        print("It is not possible to process the input path.")
-        return
-
-    for file_idx, cur_file in enumerate(list_of_files):
-        json_file = None
-        len_all_files = len(list_of_files)
-
-        if targz_fd is None:
-            print("Open file %s of %s" % (file_idx, len_all_files))
-            with open(cur_file, encoding="utf8") as f:
-                json_file = load(f)
-        else:
-            print("Open file %s of %s (in tar.gz archive)" % (file_idx, len_all_files))
-            cur_tar_file = targz_fd.extractfile(cur_file)
-            json_str = cur_tar_file.read()
-
-            # In Python 3.5 it seems that, for some reason, the extractfile method returns an
-            # object 'bytes' that cannot be managed by the function 'load' in the json package.
-            # Thus, to avoid issues, in case an object having type 'bytes' is return, it is
-            # transformed as a string before passing it to the function 'loads'. Please note
-            # that Python 3.9 does not show this behaviour, and it works correctly without
-            # any transformation.
-            if type(json_str) is bytes:
-                json_str = json_str.decode("utf-8")
-
-            json_file = loads(json_str)
-
-        if "items" not in json_file and "message" in json_file:
-            json_file = json_file["message"]
-
-        for item in json_file.get("items", []):
-            to_get = deque(metadata_field)
-            value = None
-
-            while to_get:
-                if value is None:
-                    value = item.get(to_get.popleft())
-                else:
-                    value = value.get(to_get.popleft())
-
-            if value is not None and (result is None or value > result):
-                result = value
-                print("New better result:", result)
-
-    if is_targz:
-        targz_fd.close()
-
-    return result
+    """It returns the biggest value of the metadata field path specified."""
+    return profile(input_dir_or_targz_file, [metadata_field]).fields[
+        "=>".join(metadata_field)
+    ]["max"]
 
 
 def main():
     arg_parser = ArgumentParser(
         "Check metadata in Crossref documents",
-        description="Process Crossref JSON files and check for the biggest value "
-        "in its metadata",
+        description="Process Crossref JSON files and profile their metadata, i.e. "
+        "minimum, maximum and histogram of the values of each metadata specified",
     )
     arg_parser.add_argument(
         "-i",
@@ -103,12 +178,47 @@ def main():
         "--metadata",
         dest="metadata",
         required=True,
-        help="The name of the metadata to look for.",
+        help="The name of the metadata to look for, separated by spaces.",
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        default=None,
+        help="The JSON file where to store the report.",
+    )
+    arg_parser.add_argument(
+        "-w",
+        "--workers",
+        dest="workers",
+        type=int,
+        default=1,
+        help="The number of processes parsing the JSON files.",
+    )
+    arg_parser.add_argument(
+        "-p",
+        "--histogram-prefix",
+        dest="histogram_prefix",
+        type=int,
+        default=7,
+        help="The number of characters of the string values used to build the "
+        "histograms, e.g. 7 counts the date-times by month.",
     )
 
     args = arg_parser.parse_args()
-    print("\nFinal result:", process(args.input, args.metadata.split("=>")))
+    metadata_fields = [item.split("=>") for item in args.metadata.split(" ")]
+    report = profile(
+        args.input, metadata_fields, args.workers, args.histogram_prefix
+    ).to_dict()
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf8") as f:
+            dump(report, f, ensure_ascii=False, indent=4)
+    print("\nItems:", report["items"])
+    print("Items with references:", report["items_with_references"])
+    for name, stats in report["fields"].items():
+        print("%s: min %s, max %s" % (name, stats["min"], stats["max"]))
 
 
 # Example of call
-# python -m index.coci.checkmetadata -i /input/dir -m "deposited=>date-time"
+# python -m index.coci.checkmetadata -i /input/dir -m "deposited=>date-time indexed=>date-time member" -o report.json -w 8
@@ -1,66 +1,87 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
+import argparse
 import os
 import csv
 import re
-import zipfile
 import sys
+import zipfile
+
+from oc_index.scripts.gen_source_rdf import open_output
+from oc_index.utils.tasks import run_tasks
+
+# Regex pattern to extract citation ID and source (matched on the bytes of each line)
+TTL_PATTERN = re.compile(rb"<https://w3id.org/oc/index/ci/([^>]+)>.*?<https://w3id.org/oc/index/([^/]+)/>")
 
-# Regex pattern to extract citation ID and source
-TTL_PATTERN = re.compile(r"<https://w3id.org/oc/index/ci/([^>]+)>.*?<https://w3id.org/oc/index/([^/]+)/>")
+def iter_ttl_rows(lines):
+    """ Yield (citation ID, source) for each match in the lines (as bytes) of TTL content """
+    for line in lines:
+        for match in TTL_PATTERN.finditer(line):
+            citation_id, source = match.groups()
+            yield citation_id.decode("utf-8"), source.decode("utf-8")
 
 def process_ttl_file(file_content):
     """ Extract citation ID and source from TTL content """
-    data = []
-    for match in TTL_PATTERN.finditer(file_content):
-        citation_id, source = match.groups()
-        data.append((citation_id, source))
-    return data
+    if isinstance(file_content, str):
+        file_content = file_content.encode("utf-8")
+    return list(iter_ttl_rows(file_content.splitlines()))
 
-def process_zip(zip_path, output_dir):
-    """ Extract TTL files from a ZIP, parse them, and save as CSV """
+def process_zip(zip_path, output_dir, compress=False):
+    """ Extract TTL files from a ZIP, parse them, and save as CSV (streaming the rows).
+    It returns the number of rows written """
     zip_name = os.path.splitext(os.path.basename(zip_path))[0]  # Get ZIP file name without extension
     csv_file_path = os.path.join(output_dir, f"{zip_name}.csv")
 
-    extracted_data = []
-
-    with zipfile.ZipFile(zip_path, 'r') as z:
+    n_rows = 0
+    with zipfile.ZipFile(zip_path, 'r') as z, open_output(csv_file_path, compress) as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["citation", "source"])  # Write header
         for file_name in z.namelist():
             if file_name.endswith(".ttl"):  # Process only TTL files
                 with z.open(file_name) as file:
-                    content = file.read().decode("utf-8")
-                    extracted_data.extend(process_ttl_file(content))
+                    for row in iter_ttl_rows(file):
+                        writer.writerow(row)
+                        n_rows += 1
+    return n_rows
 
-    # Write to CSV
-    with open(csv_file_path, mode="w", newline="", encoding="utf-8") as csv_file:
-        writer = csv.writer(csv_file)
-        writer.writerow(["citation", "source"])  # Write header
-        writer.writerows(extracted_data)
+def process_directory(input_dir, output_dir, workers=1, compress=False):
+    """ Process all ZIP files in the input directory, in parallel if more than one worker.
+    It returns the total number of rows written """
+    os.makedirs(output_dir, exist_ok=True)
+    zip_paths = [
+        (os.path.join(input_dir, zip_file),)
+        for zip_file in sorted(os.listdir(input_dir))
+        if zip_file.endswith(".zip")
+    ]
+    return sum(run_tasks(process_zip, zip_paths, (output_dir, compress), workers))
 
 def main():
     """ Process all ZIP files in the given input directory and save CSVs to the output directory """
-    if len(sys.argv) != 3:
-        print("Usage: python process_zips.py <input_directory> <output_directory>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Extract the citation IDs and sources from the ZIP files of TTL files in a directory "
+        "and save them as a CSV file per ZIP file."
+    )
+    parser.add_argument("input_directory", help="Directory containing the ZIP files of TTL files")
+    parser.add_argument("output_directory", help="Directory where to store the CSV files")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1, help="Number of processes handling the ZIP files in parallel"
+    )
+    parser.add_argument(
+        "-c", "--compress", action="store_true", default=False, help="Compress the CSV files with gzip"
+    )
+    args = parser.parse_args()
 
-    input_dir = sys.argv[1]
-    output_dir = sys.argv[2]
-
-    if not os.path.isdir(input_dir):
-        print(f"Error: Input directory '{input_dir}' does not exist.")
+    if not os.path.isdir(args.input_directory):
+        print(f"Error: Input directory '{args.input_directory}' does not exist.")
         sys.exit(1)
 
-    os.makedirs(output_dir, exist_ok=True)
-
-    for zip_file in os.listdir(input_dir):
-        if zip_file.endswith(".zip"):
-            zip_path = os.path.join(input_dir, zip_file)
-            print(f"Processing: {zip_file}")
-            process_zip(zip_path, output_dir)
+    n_rows = process_directory(args.input_directory, args.output_directory, args.workers, args.compress)
+    print(f"Extracted {n_rows} rows")
 
 if __name__ == "__main__":
     main()
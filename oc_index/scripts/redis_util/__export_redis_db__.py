@@ -1,6 +1,7 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
@@ -9,31 +10,38 @@ import argparse
 from tqdm import tqdm
 import csv
 
+from oc_index.utils.redis_scan import RedisScanner, prefix_shards, shard_digits
+
 parser = argparse.ArgumentParser(description='Export a DB from Redis')
 parser.add_argument('--db', type=str, required=True,help='DB to export')
+parser.add_argument('--workers', type=int, default=1, help='Number of processes scanning the DB in parallel')
+parser.add_argument('--shard-prefix', type=str, default='', help='Prefix shared by the keys, the scan is split according to the digits following it')
+parser.add_argument('--shard-digits', type=int, default=None, help='Number of digits following the prefix used to split the scan (default: the fewest digits giving a shard per worker, 0 disables the sharding, there is no sharding with 1 worker)')
 
 args = parser.parse_args()
 
 rconn_db = Redis(host="localhost", port="6379", db=args.db)
 
+REDIS_R_BUFFER = 100000
+shards = ["*"]
+digits = shard_digits(args.workers, args.shard_digits)
+if digits:
+    shards = prefix_shards(args.shard_prefix, digits, complete=True)
+
 with open('redis_'+str(args.db)+'.csv', 'a+') as f:
     write = csv.writer(f)
-    r_buffer_keys = []
-    REDIS_R_BUFFER = 100000
-    for key in tqdm(rconn_db.scan_iter()):
-        r_buffer_keys.append(key)
-        if len(r_buffer_keys) >= REDIS_R_BUFFER:
-            values = rconn_db.mget(r_buffer_keys)
-
-            # Print the values
-            for key, value in zip(r_buffer_keys, values):
-                write.writerow([key.decode('utf-8'),value.decode('utf-8')])
-
-            # reset buffer
-            r_buffer_keys = []
-
-    # add last elements too
-    if len(r_buffer_keys) > 0:
-        values = rconn_db.mget(r_buffer_keys)
-        for key, value in zip(r_buffer_keys, values):
-            write.writerow([key.decode('utf-8'),value.decode('utf-8')])
+    with tqdm(total=rconn_db.dbsize()) as pbar:
+        scanner = RedisScanner(
+            rconn_db,
+            shards,
+            fetch="get",
+            count=10000,
+            batch_size=REDIS_R_BUFFER,
+            workers=args.workers,
+        )
+        for keys, values in scanner:
+            for key, value in zip(keys, values):
+                # the key may have been deleted (or it is not a string)
+                if value is not None:
+                    write.writerow([key.decode('utf-8'),value.decode('utf-8')])
+            pbar.update(len(keys))
@@ -1,4 +1,9 @@
 #!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
 """
 redis_citation_stats.py
 
@@ -14,6 +19,14 @@ Produces:
   - per-key citation-count distribution (min/max/avg/median, top-N busiest keys)
   - optional CSV/JSON dump of the full per-key breakdown
 
+The DB is read in a single streaming pass with constant memory: edges are
+counted exactly, unique citing entities are estimated with HyperLogLog
+sketches (in memory, or in Redis via PFADD with --pfadd-db), only the top-N
+busiest keys are kept and the citations-per-key distribution is kept as a
+histogram (count -> number of keys). The per-key CSV is written while scanning.
+With --workers and --shard-digits the keyspace is split in SCAN MATCH shards
+(e.g. "br/060*", ..., "br/069*") that are scanned in parallel.
+
 Usage:
     python redis_citation_stats.py --host 127.0.0.1 --port 6379 --db 8 \
         --pattern "br/*" --out-json stats.json --out-csv per_key.csv
@@ -21,14 +34,20 @@ Usage:
 
 import argparse
 import csv
+import heapq
 import json
-import statistics
 from collections import Counter, defaultdict
 
 import redis
 
+from oc_index.utils.redis_scan import RedisScanner, prefix_shards
+from oc_index.utils.sketch import HyperLogLog
+
+# Key of the overall sketch when the sketches are stored in Redis
+OVERALL = "__overall__"
+
 
-def parse_args():
+def parse_args(argv=None):
     p = argparse.ArgumentParser(description="Compute citation stats from a Redis SET-based DB.")
     p.add_argument("--host", default="127.0.0.1")
     p.add_argument("--port", type=int, default=6379)
@@ -39,56 +58,133 @@ def parse_args():
     p.add_argument("--top-n", type=int, default=10, help="Show top-N busiest cited keys")
     p.add_argument("--out-json", default=None, help="Optional path to dump full stats as JSON")
     p.add_argument("--out-csv", default=None, help="Optional path to dump per-key breakdown as CSV")
-    return p.parse_args()
+    p.add_argument(
+        "--workers", type=int, default=1, help="Number of processes scanning the DB in parallel"
+    )
+    p.add_argument(
+        "--shard-digits",
+        type=int,
+        default=0,
+        help="Split the SCAN in 10^N shards according to the N digits following the "
+        "pattern prefix (e.g. 2 with 'br/06*'), scanned in parallel by the workers",
+    )
+    p.add_argument(
+        "--pfadd-db",
+        type=int,
+        default=None,
+        help="Optional Redis DB where to keep the unique-citing sketches (PFADD) "
+        "instead of in memory, the sketches are deleted at the end",
+    )
+    p.add_argument(
+        "--hll-precision", type=int, default=14, help="Precision of the in-memory HyperLogLog sketches"
+    )
+    return p.parse_args(argv)
 
 
-def scan_keys(r, pattern, count):
-    """Yield all keys matching pattern using SCAN (non-blocking, safe for large DBs)."""
-    cursor = 0
-    while True:
-        cursor, keys = r.scan(cursor=cursor, match=pattern, count=count)
-        for k in keys:
-            yield k
-        if cursor == 0:
-            break
+def scan_shards(args):
+    """The SCAN MATCH patterns covering the keys matching args.pattern, split
+    according to the digits that follow the pattern prefix if required."""
+    if args.shard_digits and args.pattern.endswith("*"):
+        return prefix_shards(args.pattern[:-1], args.shard_digits)
+    return [args.pattern]
 
 
-def batched(iterable, n):
-    batch = []
-    for item in iterable:
-        batch.append(item)
-        if len(batch) >= n:
-            yield batch
-            batch = []
-    if batch:
-        yield batch
+class InMemoryUniqueCounter:
+    """Unique citing entities per collection and overall, as in-memory HyperLogLog sketches."""
 
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.collections = defaultdict(lambda: HyperLogLog(self.precision))
+        self.overall = HyperLogLog(self.precision)
 
-def main():
-    args = parse_args()
-    r = redis.Redis(host=args.host, port=args.port, db=args.db, decode_responses=True)
+    def add_batch(self, pairs):
+        for collection, citing_id in pairs:
+            self.collections[collection].add(citing_id)
+            self.overall.add(citing_id)
+
+    def counts(self):
+        return {c: hll.count() for c, hll in self.collections.items()}, self.overall.count()
+
+    def close(self):
+        pass
+
+
+class RedisUniqueCounter:
+    """Unique citing entities per collection and overall, as Redis HyperLogLog keys (PFADD)."""
+
+    def __init__(self, r, prefix="stats:hll:"):
+        self.r = r
+        self.prefix = prefix
+        self.collections = set()
+
+    def add_batch(self, pairs):
+        per_collection = defaultdict(list)
+        for collection, citing_id in pairs:
+            per_collection[collection].append(citing_id)
+        if not per_collection:
+            return
+        pipe = self.r.pipeline(transaction=False)
+        for collection, citing_ids in per_collection.items():
+            self.collections.add(collection)
+            pipe.pfadd(self.prefix + collection, *citing_ids)
+            pipe.pfadd(self.prefix + OVERALL, *citing_ids)
+        pipe.execute()
+
+    def counts(self):
+        per_collection = {c: self.r.pfcount(self.prefix + c) for c in self.collections}
+        return per_collection, self.r.pfcount(self.prefix + OVERALL)
+
+    def close(self):
+        keys = [self.prefix + c for c in self.collections] + [self.prefix + OVERALL]
+        self.r.delete(*keys)
+
+
+def histogram_stats(histogram):
+    """min/max/mean/median of a distribution given as value -> frequency."""
+    n = sum(histogram.values())
+    if not n:
+        return None
+    values = sorted(histogram)
+    mean = sum(v * f for v, f in histogram.items()) / n
+
+    def nth(idx):
+        seen = 0
+        for v in values:
+            seen += histogram[v]
+            if seen > idx:
+                return v
 
-    # ---- accumulators ----
-    per_key = {}                              # cited_key -> {collection: [citing_ids]}
+    if n % 2:
+        median = nth(n // 2)
+    else:
+        median = (nth(n // 2 - 1) + nth(n // 2)) / 2
+    return {"min": values[0], "max": values[-1], "mean": mean, "median": median}
+
+
+def compute_stats(r, args, unique_counter, csv_writer=None):
     collection_edge_counts = Counter()        # collection -> number of citation edges
-    collection_unique_citing = defaultdict(set)  # collection -> set of unique citing_ids
-    unique_citing_overall = set()             # citing_id (collection-agnostic)
-    unique_cited_overall = set()              # cited keys themselves
-    citations_per_key = {}                    # cited_key -> total citation count (all collections)
+    count_histogram = Counter()               # citations of a key -> number of keys
+    top_keys = []                             # min-heap of (count, key, per-collection counts)
 
     total_keys = 0
     total_edges = 0
 
-    for key_batch in batched(scan_keys(r, args.pattern, args.scan_count), args.batch_size):
-        pipe = r.pipeline(transaction=False)
-        for key in key_batch:
-            pipe.smembers(key)
-        results = pipe.execute()
-
+    scanner = RedisScanner(
+        r,
+        scan_shards(args),
+        fetch="smembers",
+        count=args.scan_count,
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    for key_batch, results in scanner:
+        pairs = []
         for key, members in zip(key_batch, results):
+            if members is None:
+                # not a SET
+                continue
             total_keys += 1
-            unique_cited_overall.add(key)
-            per_key[key] = defaultdict(list)
+            key_counts = Counter()
 
             for member in members:
                 if ":" not in member:
@@ -96,68 +192,108 @@ def main():
                     continue
                 collection, citing_id = member.split(":", 1)
 
-                per_key[key][collection].append(citing_id)
-                collection_edge_counts[collection] += 1
-                collection_unique_citing[collection].add(citing_id)
-                unique_citing_overall.add(citing_id)   # collection-agnostic uniqueness
-                total_edges += 1
+                key_counts[collection] += 1
+                pairs.append((collection, citing_id))
+                if csv_writer is not None:
+                    csv_writer.writerow([key, collection, citing_id])
+
+            cnt = sum(key_counts.values())
+            collection_edge_counts.update(key_counts)
+            total_edges += cnt
+            count_histogram[cnt] += 1
+
+            entry = (cnt, key, dict(key_counts))
+            if len(top_keys) < args.top_n:
+                heapq.heappush(top_keys, entry)
+            elif args.top_n and cnt > top_keys[0][0]:
+                heapq.heapreplace(top_keys, entry)
+
+        unique_counter.add_batch(pairs)
+
+    collection_unique_citing, unique_citing_overall = unique_counter.counts()
+    return {
+        "total_keys": total_keys,
+        "total_edges": total_edges,
+        "unique_citing_overall": unique_citing_overall,
+        "collection_edge_counts": dict(collection_edge_counts),
+        "collection_unique_citing_counts": collection_unique_citing,
+        "citations_per_key_stats": histogram_stats(count_histogram),
+        "citations_per_key_histogram": {str(c): n for c, n in sorted(count_histogram.items())},
+        "top_keys": [
+            {"key": key, "total": cnt, "collections": colls}
+            for cnt, key, colls in sorted(top_keys, key=lambda x: (-x[0], x[1]))
+        ],
+    }
+
 
-            citations_per_key[key] = sum(len(v) for v in per_key[key].values())
+def run(args):
+    r = redis.Redis(host=args.host, port=args.port, db=args.db, decode_responses=True)
+
+    if args.pfadd_db is not None:
+        unique_counter = RedisUniqueCounter(
+            redis.Redis(host=args.host, port=args.port, db=args.pfadd_db, decode_responses=True)
+        )
+    else:
+        unique_counter = InMemoryUniqueCounter(args.hll_precision)
+
+    csv_file = None
+    csv_writer = None
+    if args.out_csv:
+        csv_file = open(args.out_csv, "w", newline="")
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow(["cited_key", "collection", "citing_id"])
+
+    try:
+        stats = compute_stats(r, args, unique_counter, csv_writer)
+    finally:
+        unique_counter.close()
+        if csv_file is not None:
+            csv_file.close()
 
     # ---- summary stats ----
-    counts_list = list(citations_per_key.values())
     print("=" * 60)
     print("GLOBAL STATS")
     print("=" * 60)
-    print(f"Total cited keys scanned:        {total_keys}")
-    print(f"Total citation edges:            {total_edges}")
-    print(f"Unique citing entities (overall, collection-agnostic): {len(unique_citing_overall)}")
+    print(f"Total cited keys scanned:        {stats['total_keys']}")
+    print(f"Total citation edges:            {stats['total_edges']}")
+    print(f"Unique citing entities (overall, collection-agnostic, estimated): {stats['unique_citing_overall']}")
     print()
 
     print("Per-collection edge counts:")
-    for coll, cnt in collection_edge_counts.most_common():
-        print(f"  {coll:15s} edges={cnt:8d}   unique_citing={len(collection_unique_citing[coll])}")
+    for coll, cnt in Counter(stats["collection_edge_counts"]).most_common():
+        print(f"  {coll:15s} edges={cnt:8d}   unique_citing~={stats['collection_unique_citing_counts'][coll]}")
     print()
 
-    if counts_list:
+    distribution = stats["citations_per_key_stats"]
+    if distribution:
         print("Citations-per-key distribution:")
-        print(f"  min:    {min(counts_list)}")
-        print(f"  max:    {max(counts_list)}")
-        print(f"  mean:   {statistics.mean(counts_list):.2f}")
-        print(f"  median: {statistics.median(counts_list)}")
+        print(f"  min:    {distribution['min']}")
+        print(f"  max:    {distribution['max']}")
+        print(f"  mean:   {distribution['mean']:.2f}")
+        print(f"  median: {distribution['median']}")
         print()
 
-    top_keys = sorted(citations_per_key.items(), key=lambda x: x[1], reverse=True)[: args.top_n]
     print(f"Top {args.top_n} busiest cited keys:")
-    for key, cnt in top_keys:
-        colls = ", ".join(f"{c}:{len(v)}" for c, v in per_key[key].items())
-        print(f"  {key:25s} total={cnt:5d}   ({colls})")
+    for top in stats["top_keys"]:
+        colls = ", ".join(f"{c}:{n}" for c, n in top["collections"].items())
+        print(f"  {top['key']:25s} total={top['total']:5d}   ({colls})")
     print()
 
     # ---- optional exports ----
     if args.out_json:
-        out = {
-            "total_keys": total_keys,
-            "total_edges": total_edges,
-            "unique_citing_overall": len(unique_citing_overall),
-            "collection_edge_counts": dict(collection_edge_counts),
-            "collection_unique_citing_counts": {c: len(s) for c, s in collection_unique_citing.items()},
-            "citations_per_key": citations_per_key,
-        }
         with open(args.out_json, "w") as f:
-            json.dump(out, f, indent=2)
+            json.dump(stats, f, indent=2)
         print(f"Wrote JSON summary to {args.out_json}")
 
     if args.out_csv:
-        with open(args.out_csv, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["cited_key", "collection", "citing_id"])
-            for key, coll_dict in per_key.items():
-                for coll, citing_ids in coll_dict.items():
-                    for cid in citing_ids:
-                        writer.writerow([key, coll, cid])
         print(f"Wrote per-key breakdown CSV to {args.out_csv}")
 
+    return stats
+
+
+def main(argv=None):
+    run(parse_args(argv))
+
 
 if __name__ == "__main__":
     main()
@@ -3,131 +3,226 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
 from argparse import ArgumentParser
-from os import sep, walk, makedirs
-from os.path import isdir, basename
-from json import load, dump, loads
+from os import sep, makedirs
+from json import dump, loads
 from collections import deque
 from os.path import exists
-import tarfile
-
-
-def get_all_files(i_dir_or_targz_file):
-    result = []
-    targz_fd = None
-
-    if isdir(i_dir_or_targz_file):
-        for cur_dir, cur_subdir, cur_files in walk(i_dir_or_targz_file):
-            for cur_file in cur_files:
-                if cur_file.endswith(".json") and not basename(cur_file).startswith(
-                    "."
-                ):
-                    result.append(cur_dir + sep + cur_file)
-    elif i_dir_or_targz_file.endswith("tar.gz"):
-        targz_fd = tarfile.open(i_dir_or_targz_file, "r:gz", encoding="utf-8")
-        for cur_file in targz_fd:
-            if cur_file.name.endswith(".json") and not basename(
-                cur_file.name
-            ).startswith("."):
-                result.append(cur_file)
-    else:
-        print("It is not possible to process the input path.")
-    return result, targz_fd
+from multiprocessing import Process, Queue
 
+from oc_index.utils.input_files import iter_input_files
 
-def load_json(file, targz_fd, file_idx, len_all_files):
-    result = None
+# Faster gzip decompression (ISA-L) when available
+try:
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
 
-    if targz_fd is None:
-        print("Open file %s of %s" % (file_idx, len_all_files))
-        with open(file, encoding="utf8") as f:
-            result = load(f)
-    else:
-        print("Open file %s of %s (in tar.gz archive)" % (file_idx, len_all_files))
-        cur_tar_file = targz_fd.extractfile(file)
-        json_str = cur_tar_file.read()
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = loads
+
+OPERATORS = {
+    "==": lambda value, to_check: value == to_check,
+    ">=": lambda value, to_check: value >= to_check,
+    "<=": lambda value, to_check: value <= to_check,
+    "!=": lambda value, to_check: value != to_check,
+    ">": lambda value, to_check: value > to_check,
+    "<": lambda value, to_check: value < to_check,
+}
+
+# Number of items stored in each output file
+ITEMS_X_FILE = 10000
+
+
+def iter_json_members(i_dir_or_compr_file):
+    """It yields the content (as bytes) of the JSON files in the directory or in
+    the archive (tar.gz, tar.zst, zip) specified. The archives are read as streams,
+    thus their members are never extracted on disk nor listed in advance."""
+    for input_file in iter_input_files(i_dir_or_compr_file, ".json"):
+        yield input_file.read()
+
+
+def is_matching(item, metadata_field, metadata_value):
+    matching = False
+    all_to_get = deque(metadata_field)
+    all_to_check = deque(metadata_value)
+    while not matching and len(all_to_get) > 0:
+        to_get = deque(all_to_get.popleft())
+        op, to_check = all_to_check.popleft()
+
+        value = None
+        while to_get:
+            if value is None:
+                value = item.get(to_get.popleft())
+            else:
+                value = value.get(to_get.popleft())
+
+        if value is None:
+            matching = True
+        else:
+            matching = OPERATORS[op](value, to_check)
+    return matching
+
+
+def trim_json(json_bytes, metadata_field, metadata_value):
+    """It returns the items of the Crossref JSON document in input that have
+    references and match the metadata specified."""
+    # Documents without any reference are skipped without being parsed
+    if b'"reference"' not in json_bytes:
+        return []
 
-        # In Python 3.5 it seems that, for some reason, the extractfile method returns an
-        # object 'bytes' that cannot be managed by the function 'load' in the json package.
-        # Thus, to avoid issues, in case an object having type 'bytes' is return, it is
-        # transformed as a string before passing it to the function 'loads'. Please note
-        # that Python 3.9 does not show this behaviour, and it works correctly without
-        # any transformation.
-        if type(json_str) is bytes:
-            json_str = json_str.decode("utf-8")
+    json_doc = json_loads(json_bytes)
+    if "items" not in json_doc and "message" in json_doc:
+        json_doc = json_doc["message"]
 
-        result = loads(json_str)
+    return [
+        item
+        for item in json_doc.get("items", [])
+        if item.get("reference") and is_matching(item, metadata_field, metadata_value)
+    ]
 
-    return result
 
+class TrimmedItemsWriter(object):
+    """It stores the trimmed items in files containing ITEMS_X_FILE items each,
+    named '<worker>_<index>.json' (or '.json.gz' if compressed)."""
 
-def process(input_dir_or_targz, output_dir, metadata_field, metadata_value):
-    result = {"items": []}
-    idx = 1
-    item_idx = 0
+    def __init__(self, output_dir, worker, compress=False):
+        self._output_dir = output_dir
+        self._worker = worker
+        self._compress = compress
+        self._items = []
+        self._idx = 1
+        self.n_items = 0
+
+    def add(self, items):
+        for item in items:
+            self._items.append(item)
+            self.n_items += 1
+            if len(self._items) >= ITEMS_X_FILE:
+                self.flush()
+
+    def flush(self):
+        if self._items:
+            file_path = "%s%s%s_%s.json" % (
+                self._output_dir,
+                sep,
+                self._worker,
+                self._idx,
+            )
+            if self._compress:
+                g = gzip.open(file_path + ".gz", "wt", encoding="utf8")
+            else:
+                g = open(file_path, "w", encoding="utf8")
+            with g:
+                dump({"items": self._items}, g, ensure_ascii=False)
+            self._items = []
+            self._idx += 1
+
+
+def _trim_worker(
+    worker, in_queue, out_queue, output_dir, metadata_field, metadata_value, compress
+):
+    writer = TrimmedItemsWriter(output_dir, worker, compress)
+    result = None
+    json_bytes = in_queue.get()
+    while json_bytes is not None:
+        if result is None:
+            try:
+                writer.add(trim_json(json_bytes, metadata_field, metadata_value))
+            except Exception as e:
+                # It is raised again by the caller, which would otherwise wait
+                # forever. The input is still consumed, so that the caller is
+                # never blocked on the bounded queue.
+                result = e
+                out_queue.put(e)
+        json_bytes = in_queue.get()
+    if result is None:
+        try:
+            writer.flush()
+            result = writer.n_items
+        except Exception as e:
+            result = e
+        out_queue.put(result)
+
+
+def process(
+    input_dir_or_targz,
+    output_dir,
+    metadata_field,
+    metadata_value,
+    workers=1,
+    compress=False,
+):
+    for op, _ in metadata_value:
+        if op not in OPERATORS:
+            print("Error: Comparison operator not found:", op)
+            exit(-1)
 
     if not exists(output_dir):
         makedirs(output_dir)
 
-    all_files, targz_fd = get_all_files(input_dir_or_targz)
-    len_all_files = len(all_files)
-    for jdx, cur_file in enumerate(all_files):
-        json_doc = load_json(cur_file, targz_fd, jdx + 1, len_all_files)
-
-        for item in json_doc.get("items", []):
-            if "reference" in item and len(item["reference"]) > 0:
-
-                matching = False
-                all_to_get = deque(metadata_field)
-                all_to_check = deque(metadata_value)
-                while not matching and len(all_to_get) > 0:
-                    to_get = deque(all_to_get.popleft())
-                    op, to_check = all_to_check.popleft()
-
-                    value = None
-                    while to_get:
-                        if value is None:
-                            value = item.get(to_get.popleft())
-                        else:
-                            value = value.get(to_get.popleft())
-
-                    if value is None:
-                        matching = True
-                    elif op == "==":
-                        matching = value == to_check
-                    elif op == ">=":
-                        matching = value >= to_check
-                    elif op == "<=":
-                        matching = value <= to_check
-                    elif op == "!=":
-                        matching = value != to_check
-                    elif op == ">":
-                        matching = value > to_check
-                    elif op == "<":
-                        matching = value < to_check
-                    else:
-                        print("Error: Comparison operator not found:", op)
-                        exit(-1)
-
-                if matching:
-                    if item_idx >= 10000:
-                        with open(
-                            output_dir + sep + str(idx) + ".json", "w", encoding="utf8"
-                        ) as g:
-                            dump(result, g, ensure_ascii=False)
-                        result = {"items": []}
-                        item_idx = 0
-                        idx += 1
-
-                    item_idx += 1
-                    result.get("items").append(item)
-
-    if result.get("items"):
-        with open(output_dir + sep + str(idx) + ".json", "w", encoding="utf8") as g:
-            dump(result, g, ensure_ascii=False)
+    if workers <= 1:
+        writer = TrimmedItemsWriter(output_dir, 0, compress)
+        for json_bytes in iter_json_members(input_dir_or_targz):
+            writer.add(trim_json(json_bytes, metadata_field, metadata_value))
+        writer.flush()
+        return writer.n_items
+
+    # The input is read by this process, while the workers parse the JSON
+    # documents and write their own output files. The queue is bounded to
+    # keep in memory only a few documents at a time.
+    in_queue = Queue(maxsize=workers * 2)
+    out_queue = Queue()
+    processes = [
+        Process(
+            target=_trim_worker,
+            args=(
+                worker,
+                in_queue,
+                out_queue,
+                output_dir,
+                metadata_field,
+                metadata_value,
+                compress,
+            ),
+        )
+        for worker in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    try:
+        for file_idx, json_bytes in enumerate(
+            iter_json_members(input_dir_or_targz), 1
+        ):
+            # The workers put their results when the input ends, thus anything
+            # received before is the error of a worker
+            if not out_queue.empty():
+                break
+            if file_idx % 1000 == 0:
+                print("Read %s files" % file_idx)
+            in_queue.put(json_bytes)
+        for _ in processes:
+            in_queue.put(None)
+        n_items = 0
+        for _ in processes:
+            result = out_queue.get()
+            if isinstance(result, Exception):
+                raise result
+            n_items += result
+        for p in processes:
+            p.join()
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+                p.join()
+    return n_items
 
 
 def main():
@@ -164,6 +259,22 @@ def main():
         required=True,
         help="The value of the metadata to consider in the comparison",
     )
+    arg_parser.add_argument(
+        "-w",
+        "--workers",
+        dest="workers",
+        type=int,
+        default=1,
+        help="The number of processes parsing the JSON files.",
+    )
+    arg_parser.add_argument(
+        "-c",
+        "--compress",
+        dest="compress",
+        action="store_true",
+        default=False,
+        help="Store the selected JSON files compressed with gzip.",
+    )
 
     args = arg_parser.parse_args()
     metadata_fields = args.metadata_field.split(" ")
@@ -173,10 +284,17 @@ def main():
         metadata_fields = [item.split("=>") for item in metadata_fields]
         metadata_values = [item.split(":", 1) for item in metadata_values]
 
-        process(args.input, args.output, metadata_fields, metadata_values)
+        process(
+            args.input,
+            args.output,
+            metadata_fields,
+            metadata_values,
+            args.workers,
+            args.compress,
+        )
     else:
         print("Error: different number of metadata fields and values specified.")
 
 
 # Example of call
-# python -m index.coci.trimdump -i /input/dir -o /output/dir -m "deposited=>date-time member" -v ">=:2019-10-12T07:59:37Z ==:316"
+# python -m index.coci.trimdump -i /input/dir -o /output/dir -m "deposited=>date-time member" -v ">=:2019-10-12T07:59:37Z ==:316" -w 8
@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
 
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
 """
 Run overlap queries for OpenCitations collections.
 
@@ -29,15 +33,37 @@ Only exclusive:
 
 Custom endpoint:
     python combinations.py --endpoint http://localhost:7021
+
+Without the triplestore, from the citations DB populated by cits2redis (DB 8):
+    python combinations.py --source redis:8 --workers 8
+
+Without the triplestore, from the prov:atLocation dump (directories or ZIP
+files of the TTL/CSV files created by gen_source_rdf):
+    python combinations.py --source /path/to/atlocation/dump
+
+Without the triplestore, each citation's set of collections is encoded as a
+7-bit mask and the citations are counted by mask in a single streaming pass,
+every combination and exclusive count is then derived from the 128 counters.
 """
 
 import argparse
 import csv
+import io
 import itertools
+import os
+import re
 import sys
+from array import array
+from zipfile import ZipFile
 
+import numpy as np
+import redis
 import requests
 
+from oc_index.utils.redis_scan import RedisScanner, prefix_shards, shard_digits
+from oc_index.utils.sketch import hash64
+from oc_index.utils.tasks import run_tasks
+
 
 COLLECTIONS = [
     "coci",
@@ -51,6 +77,14 @@ COLLECTIONS = [
 
 BASE = "https://w3id.org/oc/index/"
 
+# Bit of each collection in the masks
+BITS = {c: 1 << i for i, c in enumerate(COLLECTIONS)}
+
+AT_LOCATION_PATTERN = re.compile(
+    rb"<https://w3id.org/oc/index/ci/([^>]+)>\s+<http://www.w3.org/ns/prov#atLocation>"
+    rb"\s+<https://w3id.org/oc/index/([^/>]+)/>"
+)
+
 
 def build_query(combination):
     """
@@ -121,6 +155,178 @@ def run_query(endpoint, query):
     )
 
 
+class OverlapCounter:
+    """
+    Number of citations for each of the 2^7 sets of collections (masks)
+    they belong to. The citations of collections not in COLLECTIONS only
+    count for the known collections they belong to.
+    """
+
+    def __init__(self):
+        self.masks = [0] * (1 << len(COLLECTIONS))
+
+    def add(self, mask, n=1):
+        if mask:
+            self.masks[mask] += n
+
+    def merge(self, other):
+        self.masks = [a + b for a, b in zip(self.masks, other.masks)]
+
+    def combination_count(self, combination):
+        """
+        Citations present in all the collections of the combination
+        (and possibly in others).
+        """
+        c = sum(BITS[col] for col in combination)
+        return sum(n for m, n in enumerate(self.masks) if m & c == c)
+
+    def only_count(self, collection):
+        """
+        Citations present only in the collection.
+        """
+        return self.masks[BITS[collection]]
+
+
+def count_members(keys, values):
+    """
+    It counts the citations of a batch of the citations DB: the members of
+    a cited entity are "<collection>:<citing>", thus the collections of a
+    citation are the ones of all the members with the same citing entity.
+    """
+    counter = OverlapCounter()
+    for members in values:
+        if not members:
+            continue
+        citing_masks = {}
+        for member in members:
+            collection, sep, citing = member.partition(":")
+            if sep and collection in BITS:
+                citing_masks[citing] = citing_masks.get(citing, 0) | BITS[collection]
+        for mask in citing_masks.values():
+            counter.add(mask)
+    return counter
+
+
+def count_redis(r, workers=1, digits=None):
+    shards = ["*"]
+    digits = shard_digits(workers, digits)
+    if digits:
+        shards = prefix_shards("br/06", digits, complete=True)
+    counter = OverlapCounter()
+    for batch_counter in RedisScanner(
+        r,
+        shards,
+        fetch="smembers",
+        count=10000,
+        batch_size=10000,
+        workers=workers,
+        log_every=10000000,
+        process=count_members,
+    ):
+        counter.merge(batch_counter)
+    return counter
+
+
+def iter_locations(path):
+    """
+    It yields the (citation, collection) pairs, as bytes, in the prov:atLocation
+    dump, i.e. the TTL files or the CSV files ("citation,source") created by
+    gen_source_rdf, either in a directory (recursively), in ZIP files, or given
+    directly.
+    """
+    if os.path.isdir(path):
+        for cur_dir, _, cur_files in os.walk(path):
+            for cur_file in sorted(cur_files):
+                yield from iter_locations(os.path.join(cur_dir, cur_file))
+    elif path.endswith(".zip"):
+        with ZipFile(path) as archive:
+            for name in archive.namelist():
+                with archive.open(name) as f:
+                    yield from _iter_file_locations(name, f)
+    else:
+        with open(path, "rb") as f:
+            yield from _iter_file_locations(path, f)
+
+
+def _iter_file_locations(name, f):
+    if name.endswith(".ttl") or name.endswith(".nt"):
+        for line in f:
+            match = AT_LOCATION_PATTERN.search(line)
+            if match:
+                yield match.groups()
+    elif name.endswith(".csv"):
+        reader = csv.reader(io.TextIOWrapper(f, encoding="utf-8"))
+        for row in reader:
+            if len(row) == 2 and row != ["citation", "source"]:
+                yield row[0].encode("utf-8"), row[1].lower().encode("utf-8")
+
+
+def count_locations(path, partition=0, partitions=1):
+    """
+    It counts the citations of the prov:atLocation dump, considering only the
+    citations in the partition specified (according to the hash of their OCI),
+    so that each partition can be counted in a separate pass.
+    The (hash, bit) pairs are sorted to OR the bits of each citation.
+    """
+    bits = {c.encode("utf-8"): b for c, b in BITS.items()}
+    hashes = array("Q")
+    masks = array("B")
+    for citation, collection in iter_locations(path):
+        bit = bits.get(collection)
+        if bit is None:
+            continue
+        h = hash64(citation.decode("utf-8"))
+        if h % partitions == partition:
+            hashes.append(h)
+            masks.append(bit)
+
+    counter = OverlapCounter()
+    if hashes:
+        hashes = np.frombuffer(hashes, dtype=np.uint64)
+        masks = np.frombuffer(masks, dtype=np.uint8)
+        order = np.argsort(hashes, kind="stable")
+        hashes = hashes[order]
+        starts = np.flatnonzero(np.r_[True, hashes[1:] != hashes[:-1]])
+        citation_masks = np.bitwise_or.reduceat(masks[order], starts)
+        counter.masks = np.bincount(
+            citation_masks, minlength=len(counter.masks)
+        ).tolist()
+        counter.masks[0] = 0
+    return counter
+
+
+def count_dump(path, workers=1, partitions=1):
+    """
+    It counts the citations of the prov:atLocation dump in 'partitions' passes,
+    run in parallel by the workers.
+    """
+    counter = OverlapCounter()
+    for partition_counter in run_tasks(
+        count_locations,
+        ((path, partition) for partition in range(partitions)),
+        (partitions,),
+        workers,
+    ):
+        counter.merge(partition_counter)
+    return counter
+
+
+def count_source(source, workers=1, partitions=1, digits=None):
+    """
+    It returns the OverlapCounter of the source, either "redis:<DB>" or the
+    path of the prov:atLocation dump.
+    """
+    if source.lower().startswith("redis:"):
+        r = redis.Redis(
+            host="localhost",
+            port=6379,
+            db=int(source.split(":", 1)[1]),
+            decode_responses=True,
+        )
+        return count_redis(r, workers, digits)
+    return count_dump(source, workers, partitions)
+
+
 def main():
 
     parser = argparse.ArgumentParser(
@@ -164,8 +370,51 @@ def main():
         help="Exclusive output CSV",
     )
 
+    parser.add_argument(
+        "--source",
+        default="sparql",
+        help="Where to count the citations: 'sparql' (the --endpoint), "
+        "'redis:<DB>' (the citations DB populated by cits2redis) or the path "
+        "of the prov:atLocation dump (TTL/CSV files, also in ZIP files)",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes reading the citations DB or the dump in parallel",
+    )
+
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=None,
+        help="Passes over the dump, each keeping in memory only a partition "
+        "of the citations (default: the number of workers)",
+    )
+
+    parser.add_argument(
+        "--shard-digits",
+        type=int,
+        default=None,
+        help="The citations DB is read in 10^N shards according to the N "
+        "digits following the OMID prefix (default: the fewest digits giving "
+        "a shard per worker, no sharding with one worker)",
+    )
+
     args = parser.parse_args()
 
+    # All the counts are derived from a single pass over the citations
+    counter = None
+    if args.source != "sparql":
+        print(f"Counting the citations by collections in {args.source}...\n")
+        counter = count_source(
+            args.source,
+            args.workers,
+            args.partitions or max(1, args.workers),
+            args.shard_digits,
+        )
+
 
     ############################################################
     # ALL COMBINATIONS INCLUDING SINGLE COLLECTIONS
@@ -181,7 +430,7 @@ def main():
             if 1 <= size <= len(COLLECTIONS)
         )
 
-        counter = 1
+        progress = 1
 
         print(
             f"Running {total} combination queries...\n"
@@ -200,17 +449,18 @@ def main():
                 name = "-".join(combination)
 
                 print(
-                    f"[{counter}/{total}] {name}"
+                    f"[{progress}/{total}] {name}"
                 )
 
-                query = build_query(combination)
-
                 try:
 
-                    count = run_query(
-                        args.endpoint,
-                        query
-                    )
+                    if counter is not None:
+                        count = counter.combination_count(combination)
+                    else:
+                        count = run_query(
+                            args.endpoint,
+                            build_query(combination)
+                        )
 
                 except Exception as e:
 
@@ -230,7 +480,7 @@ def main():
                     }
                 )
 
-                counter += 1
+                progress += 1
 
 
         with open(
@@ -276,16 +526,15 @@ def main():
                 f"only-{collection}"
             )
 
-            query = build_only_query(
-                collection
-            )
-
             try:
 
-                count = run_query(
-                    args.endpoint,
-                    query
-                )
+                if counter is not None:
+                    count = counter.only_count(collection)
+                else:
+                    count = run_query(
+                        args.endpoint,
+                        build_only_query(collection)
+                    )
 
             except Exception as e:
 
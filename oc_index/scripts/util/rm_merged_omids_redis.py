@@ -1,6 +1,7 @@
 # SPDX-FileCopyrightText: 2019-2022 Silvio Peroni <essepuntato@gmail.com>
 # SPDX-FileCopyrightText: 2021-2022 Arianna Moretti <arianna.moretti2@studio.unibo.it>
 # SPDX-FileCopyrightText: 2021-2022 Giuseppe Grieco <g.grieco1997@gmail.com>
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
 #
 # SPDX-License-Identifier: ISC
 
@@ -9,6 +10,9 @@ import re
 import argparse
 import redis
 
+from oc_index.utils.citation_count import CitationCounts
+from oc_index.utils.redis_scan import RedisScanner, prefix_shards, shard_digits
+
 
 def extract_merged_ids(csv_file):
     merged_ids = set()
@@ -39,6 +43,32 @@ def main():
     parser.add_argument("--port", type=int, default=6379, help="Redis port")
     parser.add_argument("--db", type=int, required=True, help="Redis database number")
     parser.add_argument("--csv", required=True, help="Path to CSV file")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes scanning Redis in parallel",
+    )
+    parser.add_argument(
+        "--shard-digits",
+        type=int,
+        default=None,
+        help="Split the scan in 10^N shards according to the N digits following the OMID prefix "
+        "(default: the fewest digits giving a shard per worker, no sharding with one worker)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of keys checked in each pipeline",
+    )
+    parser.add_argument(
+        "--counts-db",
+        type=int,
+        default=None,
+        help="Redis database of the citation counts to update (see cits2redis), "
+        "when --db is the citations database",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -55,31 +85,77 @@ def main():
         decode_responses=True
     )
 
+    counts = None
+    if args.counts_db is not None:
+        counts = CitationCounts(
+            redis.Redis(
+                host=args.host, port=args.port, db=args.counts_db, decode_responses=True
+            ),
+            r,
+        )
+
     # Extract IDs
     merged_ids = extract_merged_ids(args.csv)
     print(f"Collected {len(merged_ids)} merged IDs.")
 
     # 1️⃣ Delete keys if they exist
-    for mid in merged_ids:
-        if r.exists(mid):
+    merged_ids = sorted(merged_ids)
+    for idx in range(0, len(merged_ids), args.batch_size):
+        batch = merged_ids[idx : idx + args.batch_size]
+        pipe = r.pipeline(transaction=False)
+        for mid in batch:
+            pipe.exists(mid)
+        to_delete = [mid for mid, found in zip(batch, pipe.execute()) if found]
+        for mid in to_delete:
             print(f"[KEY DELETE] {mid}")
-            if not args.dry_run:
-                r.delete(mid)
-
-    # 2️⃣ Remove from sets
-    cursor = 0
-    while True:
-        cursor, keys = r.scan(cursor=cursor)
-        for key in keys:
-            if r.type(key) == "set":
-                for mid in merged_ids:
-                    if r.sismember(key, mid):
-                        print(f"[SET REMOVE] {mid} from {key}")
-                        if not args.dry_run:
-                            r.srem(key, mid)
-
-        if cursor == 0:
-            break
+        if to_delete and not args.dry_run:
+            if counts is not None:
+                # the citations of the deleted sets are removed from the counts
+                pipe = r.pipeline(transaction=False)
+                for mid in to_delete:
+                    pipe.smembers(mid)
+                counts.remove(
+                    (mid, member)
+                    for mid, members in zip(
+                        to_delete, pipe.execute(raise_on_error=False)
+                    )
+                    if isinstance(members, set)
+                    for member in members
+                )
+            r.delete(*to_delete)
+
+    # 2️⃣ Remove from sets, intersecting each set with the merged IDs while
+    # the keyspace is scanned in parallel
+    if not merged_ids:
+        print("Done.")
+        return
+    shards = ["*"]
+    digits = shard_digits(args.workers, args.shard_digits)
+    if digits:
+        shards = prefix_shards("06", digits, complete=True)
+    scanner = RedisScanner(
+        r,
+        shards,
+        fetch="smembers",
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    merged = set(merged_ids)
+    for keys, found in scanner:
+        pipe = r.pipeline(transaction=False)
+        for key, members in zip(keys, found):
+            # members is None when the key is not a set
+            if not members:
+                continue
+            to_remove = sorted(members & merged)
+            for mid in to_remove:
+                print(f"[SET REMOVE] {mid} from {key}")
+            if to_remove and not args.dry_run:
+                if counts is not None:
+                    counts.remove((key, mid) for mid in to_remove)
+                else:
+                    pipe.srem(key, *to_remove)
+        pipe.execute()
 
     print("Done.")
 
@@ -0,0 +1,158 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Requests per second allowed for each host, within the polite limits of the APIs
+RATE_LIMITS = {
+    "api.crossref.org": 40,
+    "api.datacite.org": 10,
+    "pub.orcid.org": 20,
+    "pubmed.ncbi.nlm.nih.gov": 3,
+    "doi.org": 20,
+}
+DEFAULT_RATE = 10
+# The status codes of the responses worth retrying
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+# The result of the lookups whose API could not be reached (or kept failing),
+# which must not be taken for a negative result
+UNAVAILABLE = object()
+
+
+def unavailable(response):
+    """It tells whether a response returned by ApiClient.get is a transport
+    failure, i.e. the API could not be reached or kept failing, rather than an
+    answer of the API."""
+    return response is None or response.status_code in RETRY_STATUS
+
+
+class TokenBucket(object):
+    """A thread-safe token bucket allowing 'rate' calls per second on average, with
+    bursts of up to 'capacity' calls. Each call of acquire takes a token, waiting
+    until it is available."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            # The token is reserved now, also if it is available only later
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class ApiClient(object):
+    """It sends GET requests through a pooled HTTP session shared by all the threads,
+    limiting the requests sent to each host with a token bucket (RATE_LIMITS) and
+    retrying with exponential backoff when a host is not reachable or answers with
+    one of RETRY_STATUS. The same request asked by many threads at the same time is
+    sent once, and its response is returned to all of them."""
+
+    def __init__(
+        self,
+        rate_limits=None,
+        default_rate=DEFAULT_RATE,
+        pool_size=20,
+        retries=3,
+        backoff=1.0,
+        timeout=30,
+    ):
+        self.rate_limits = RATE_LIMITS if rate_limits is None else rate_limits
+        self.default_rate = default_rate
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.rate_limits) + 1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._buckets = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(
+                    self.rate_limits.get(host, self.default_rate)
+                )
+            return self._buckets[host]
+
+    def get(self, url, headers=None):
+        """It returns the response to a GET request, or None if the host was not
+        reachable. The responses with a status code not in RETRY_STATUS are
+        returned as they are."""
+        key = (url, tuple(sorted(headers.items())) if headers else ())
+        with self._lock:
+            future = self._in_flight.get(key)
+            sender = future is None
+            if sender:
+                future = self._in_flight[key] = Future()
+        if not sender:
+            return future.result()
+
+        try:
+            response = self._get(url, headers)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _get(self, url, headers):
+        bucket = self._bucket(urlsplit(url).netloc)
+        response = None
+        for attempt in range(self.retries + 1):
+            bucket.acquire()
+            delay = self.backoff * 2**attempt
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS:
+                    return response
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+            except (requests.ConnectionError, requests.Timeout):
+                response = None
+            if attempt < self.retries:
+                time.sleep(delay)
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+_client = {}
+_client_lock = threading.Lock()
+
+
+def get_api_client():
+    """It returns the ApiClient shared in the process, so that the limits of the
+    requests to each host hold for all the finders and identifier managers."""
+    with _client_lock:
+        if "client" not in _client:
+            _client["client"] = ApiClient()
+        return _client["client"]
@@ -0,0 +1,186 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import json
+from array import array
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from oc_index.utils.redis_scan import RedisScanner, prefix_shards, shard_digits
+
+# Hash fields of the total incoming and outgoing citations of a BR, the
+# per-collection ones are "in:<collection>" and "out:<collection>"
+IN = "in"
+OUT = "out"
+
+
+def omid_id(omid):
+    """It returns the bare OMID of a BR as stored in the citations DB, e.g.
+    '0634096064' for 'omid:br/0634096064', 'br/0634096064', 'coci:br/0634096064'."""
+    return omid.rpartition("/")[2].rpartition(":")[2]
+
+
+def parse_member(member):
+    """It splits a member of the citations DB, i.e. '<collection>:br/<OMID>' or
+    '<OMID>', in its collection (None if missing) and bare OMID."""
+    collection, sep, citing = member.partition(":")
+    if not sep or "/" in collection:
+        return None, omid_id(member)
+    return collection, omid_id(citing)
+
+
+class CitationCounts(object):
+    """The incoming and outgoing citations of each BR, in total and per
+    collection, stored as a Redis hash per BR (keyed by its bare OMID) and
+    updated incrementally while the citations are added or removed.
+
+    If the citations DB is specified, the citations are added to (removed
+    from) it as well, and only the ones actually added (removed) are counted,
+    so that loading the same citations again does not change the counts."""
+
+    def __init__(self, rconn_counts, rconn_cits=None):
+        self.rconn_counts = rconn_counts
+        self.rconn_cits = rconn_cits
+
+    def _changed(self, citations, command):
+        if self.rconn_cits is None:
+            return citations
+        pipe = self.rconn_cits.pipeline(transaction=False)
+        for cited, member in citations:
+            getattr(pipe, command)(cited, member)
+        return [cit for cit, changed in zip(citations, pipe.execute()) if changed]
+
+    def _update(self, citations, amount):
+        # The increments of the same field are summed before sending them
+        increments = defaultdict(int)
+        for cited, member in citations:
+            collection, citing = parse_member(member)
+            cited = omid_id(cited)
+            increments[(cited, IN)] += amount
+            increments[(citing, OUT)] += amount
+            if collection:
+                increments[(cited, IN + ":" + collection)] += amount
+                increments[(citing, OUT + ":" + collection)] += amount
+        if increments:
+            pipe = self.rconn_counts.pipeline(transaction=False)
+            for (br, field), value in increments.items():
+                pipe.hincrby(br, field, value)
+            pipe.execute()
+
+    def add(self, citations):
+        """It counts the citations in input, given as (cited, member) pairs in the
+        format of the citations DB, e.g. ('br/062', 'coci:br/061'). It returns the
+        number of citations counted."""
+        citations = self._changed(list(citations), "sadd")
+        self._update(citations, 1)
+        return len(citations)
+
+    def remove(self, citations):
+        """It removes the citations in input from the counts, as in add."""
+        citations = self._changed(list(citations), "srem")
+        self._update(citations, -1)
+        return len(citations)
+
+    def get(self, omids):
+        """It returns the counts (field -> value) of each BR in input."""
+        pipe = self.rconn_counts.pipeline(transaction=False)
+        for omid in omids:
+            pipe.hgetall(omid_id(omid))
+        return [
+            {_decode(k): int(v) for k, v in counts.items()} for counts in pipe.execute()
+        ]
+
+    def to_array(self, workers=1):
+        """It returns all the counts as a NumPy structured array sorted by the
+        integer value of the OMIDs, with the columns 'omid', 'in', 'out' and the
+        per-collection 'in:<collection>' and 'out:<collection>'."""
+        omids = array("q")
+        columns = defaultdict(lambda: array("q", bytes(8 * len(omids))))
+        shards = ["*"]
+        digits = shard_digits(workers)
+        if digits:
+            shards = prefix_shards("06", digits, complete=True)
+        scanner = RedisScanner(
+            self.rconn_counts,
+            shards,
+            fetch="hgetall",
+            count=10000,
+            batch_size=10000,
+            workers=workers,
+        )
+        for keys, values in scanner:
+            for key, counts in zip(keys, values):
+                key = _decode(key)
+                if not counts or not key.isdigit():
+                    continue
+                for field, value in counts.items():
+                    columns[_decode(field)].append(int(value))
+                omids.append(int(key))
+                # The fields missing for this BR are 0
+                for column in columns.values():
+                    if len(column) < len(omids):
+                        column.append(0)
+
+        names = [IN, OUT] + sorted(c for c in columns if c not in (IN, OUT))
+        dtype = [("omid", "<i8")] + [(name, "<i8") for name in names]
+        result = np.zeros(len(omids), dtype=dtype)
+        result["omid"] = np.frombuffer(omids, dtype=np.int64)
+        for name in names:
+            if name in columns:
+                result[name] = np.frombuffer(columns[name], dtype=np.int64)
+        result.sort(order="omid")
+        # SCAN may return a key twice
+        keep = np.ones(len(result), dtype=bool)
+        keep[1:] = result["omid"][1:] != result["omid"][:-1]
+        return result[keep]
+
+    def export(self, path, file_format="bin", workers=1):
+        """It stores all the counts, sorted by OMID, either as a binary file of
+        little-endian int64 records (described by the '<path>.json' file written
+        next to it, see load_counts) or as a Parquet file (requires pyarrow)."""
+        counts = self.to_array(workers)
+        if file_format == "bin":
+            counts.tofile(path)
+            with open(path + ".json", "w") as f:
+                json.dump(
+                    {
+                        "columns": list(counts.dtype.names),
+                        "dtype": "<i8",
+                        "rows": len(counts),
+                    },
+                    f,
+                )
+        elif file_format == "parquet":
+            pd.DataFrame(counts).to_parquet(path, index=False)
+        else:
+            raise ValueError("Unknown export format: %s" % file_format)
+        return len(counts)
+
+
+def load_counts(path):
+    """It loads (memory-mapped) the counts exported in the binary format."""
+    with open(path + ".json") as f:
+        info = json.load(f)
+    dtype = [(name, info["dtype"]) for name in info["columns"]]
+    if not info["rows"]:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(info["rows"],))
+
+
+def lookup_counts(counts, omid):
+    """It returns the record of the BR in the counts loaded, or None, by
+    binary search on the (sorted) OMIDs."""
+    omid = int(omid_id(omid))
+    pos = np.searchsorted(counts["omid"], omid)
+    if pos < len(counts) and counts["omid"][pos] == omid:
+        return counts[pos]
+    return None
+
+
+def _decode(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else value
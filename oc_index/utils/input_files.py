@@ -0,0 +1,228 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import io
+import os
+import tarfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from zipfile import ZipFile
+
+import zstandard as zstd
+
+# Faster gzip decompression (ISA-L) when available
+try:
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
+
+ZSTD_MAGIC = 0xFD2FB528
+# The magic numbers of the skippable frames are 0x184D2A50-0x184D2A5F
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A50
+ZSTD_SKIPPABLE_MASK = 0xFFFFFFF0
+
+
+def byte_ranges(path, chunk_size):
+    """It returns the (start, end) byte ranges of about 'chunk_size' bytes covering a
+    file, with each range ending at the end of a line."""
+    ranges = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_size, size) - 1)
+            f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def iter_range_lines(path, start, end):
+    """It yields the (non-empty) lines, as bytes, in the byte range of a file."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        while start < end:
+            line = f.readline()
+            if not line:
+                break
+            start += len(line)
+            if line.strip():
+                yield line
+
+
+class InputFile(object):
+    """A file of an input dump, which can be a file in a directory (also compressed
+    with gzip or zst) or a member of a ZIP, tar.gz or tar.zst archive. It is never
+    extracted nor decompressed on disk: 'open' returns a binary stream reading it.
+
+    The members of the tar archives are read while the archive is streamed, thus
+    they can be opened only until the next file of the input is requested."""
+
+    def __init__(self, name, opener):
+        self.name = name
+        self._opener = opener
+
+    def open(self):
+        return self._opener()
+
+    def read(self):
+        with self.open() as f:
+            return f.read()
+
+    def __repr__(self):
+        return "InputFile(%r)" % self.name
+
+
+def _is_wanted(name, req_type):
+    return name.endswith(req_type) and not os.path.basename(name).startswith(".")
+
+
+def zst_frames(path):
+    """It returns the (offset, size) of the zst frames in a file, skipping the
+    skippable ones, by reading only the headers of the frames and of their blocks."""
+    frames = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        offset = 0
+        while offset < size:
+            f.seek(offset)
+            magic = int.from_bytes(f.read(4), "little")
+            if magic & ZSTD_SKIPPABLE_MASK == ZSTD_SKIPPABLE_MAGIC:
+                offset += 8 + int.from_bytes(f.read(4), "little")
+                continue
+            if magic != ZSTD_MAGIC:
+                raise ValueError("The file '%s' is not a valid zst file" % path)
+            f.seek(offset)
+            header = f.read(18)
+            descriptor = header[4]
+            frame_end = offset + zstd.frame_header_size(header)
+            last_block = False
+            while not last_block:
+                f.seek(frame_end)
+                header = int.from_bytes(f.read(3), "little")
+                last_block = header & 1
+                block_size = 1 if (header >> 1) & 3 == 1 else header >> 3
+                frame_end += 3 + block_size
+            if descriptor & 4:
+                # Content checksum
+                frame_end += 4
+            frames.append((offset, frame_end - offset))
+            offset = frame_end
+    return frames
+
+
+def _decompress_frame(data):
+    return zstd.ZstdDecompressor().decompressobj().decompress(data)
+
+
+class ParallelZstdReader(io.RawIOBase):
+    """It reads a zst file made of many frames (e.g. as created by 'zstd -T' or
+    'pzstd'), decompressing up to 'workers' frames at the same time, ahead of the
+    ones being read."""
+
+    def __init__(self, path, frames, workers):
+        self._file = open(path, "rb")
+        self._frames = iter(frames)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = deque()
+        self._buffer = b""
+        self._pos = 0
+        for _ in range(workers):
+            self._submit()
+
+    def _submit(self):
+        frame = next(self._frames, None)
+        if frame is not None:
+            offset, size = frame
+            self._file.seek(offset)
+            self._pending.append(
+                self._executor.submit(_decompress_frame, self._file.read(size))
+            )
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while self._pos >= len(self._buffer):
+            if not self._pending:
+                return 0
+            self._buffer = self._pending.popleft().result()
+            self._pos = 0
+            self._submit()
+        n = min(len(b), len(self._buffer) - self._pos)
+        b[:n] = self._buffer[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._executor.shutdown(cancel_futures=True)
+            self._file.close()
+        super().close()
+
+
+def open_zst(path, workers=1):
+    """It returns a binary stream of the content of a zst file, decompressed in
+    parallel if it is made of many frames and more than one worker is specified."""
+    if workers > 1:
+        frames = zst_frames(path)
+        if len(frames) > 1:
+            return io.BufferedReader(ParallelZstdReader(path, frames, workers))
+    # The stream reader of zstandard cannot be read by lines by itself
+    return io.BufferedReader(
+        zstd.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True
+        )
+    )
+
+
+def _open_file(path, workers):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        return open_zst(path, workers)
+    return open(path, "rb")
+
+
+def _iter_tar(fileobj, req_type):
+    with tarfile.open(fileobj=fileobj, mode="r|", encoding="utf-8") as archive:
+        for member in archive:
+            if member.isfile() and _is_wanted(member.name, req_type):
+                yield InputFile(
+                    member.name, lambda member=member: archive.extractfile(member)
+                )
+
+
+def iter_input_files(input_path, req_type, workers=1):
+    """It yields the InputFile of each file with the extension 'req_type' in the
+    input, which can be a directory (with files having that extension, also
+    compressed with gzip or zst), a ZIP, tar.gz or tar.zst archive, or a single
+    file (also compressed with gzip or zst). The zst files are decompressed with
+    'workers' threads, if they are made of many frames."""
+    compressed = tuple(req_type + ext for ext in ("", ".gz", ".zst"))
+    if os.path.isdir(input_path):
+        for cur_dir, cur_subdir, cur_files in os.walk(input_path):
+            cur_subdir.sort()
+            for cur_file in sorted(cur_files):
+                if _is_wanted(cur_file, compressed):
+                    path = os.path.join(cur_dir, cur_file)
+                    yield InputFile(path, lambda path=path: _open_file(path, workers))
+    elif input_path.endswith(("tar.gz", ".tgz")):
+        with gzip.open(input_path, "rb") as gz_fd:
+            yield from _iter_tar(gz_fd, req_type)
+    elif input_path.endswith("tar.zst"):
+        with open_zst(input_path, workers) as zst_fd:
+            yield from _iter_tar(zst_fd, req_type)
+    elif input_path.endswith(".zip"):
+        with ZipFile(input_path) as archive:
+            for member in archive.namelist():
+                if _is_wanted(member, req_type):
+                    yield InputFile(member, lambda member=member: archive.open(member))
+    elif input_path.endswith(compressed):
+        yield InputFile(input_path, lambda: _open_file(input_path, workers))
+    else:
+        print("It is not possible to process the input path.", input_path)
@@ -0,0 +1,177 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import re
+
+import numpy as np
+
+# The fastest JSON decoder available
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    try:
+        from msgspec.json import decode as json_loads
+    except ImportError:
+        from json import loads as json_loads
+
+CHUNK_SIZE = 1 << 20
+
+_NON_SPACE = re.compile(rb"\S")
+_TOKEN = re.compile(rb'["\[\]{}]')
+_STRING_END = re.compile(rb'(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR_END = re.compile(rb"[\s,\]}]")
+_ESCAPE = re.compile(rb"\\.", re.DOTALL)
+# How much each byte changes the depth of the JSON values
+_DEPTH_DELTA = np.zeros(256, dtype=np.int8)
+_DEPTH_DELTA[[ord("["), ord("{")]] = 1
+_DEPTH_DELTA[[ord("]"), ord("}")]] = -1
+
+
+class _Reader(object):
+    """A buffer over a binary stream, keeping only the bytes from 'mark' on."""
+
+    def __init__(self, fp, chunk_size):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self.buf = b""
+        self.pos = 0
+        self.mark = 0
+
+    def fill(self):
+        data = self._fp.read(self._chunk_size)
+        if not data:
+            return False
+        self.buf = self.buf[self.mark :] + data
+        self.pos -= self.mark
+        self.mark = 0
+        return True
+
+    def next_char(self):
+        """It consumes and returns the next non-whitespace byte (b"" at the end)."""
+        while True:
+            match = _NON_SPACE.search(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return match.group()
+            self.pos = len(self.buf)
+            if not self.fill():
+                return b""
+
+    def search(self, pattern):
+        """It returns the next match of a pattern, which cannot span the
+        bytes skipped while searching it."""
+        while True:
+            match = pattern.search(self.buf, self.pos)
+            if match:
+                return match
+            self.pos = len(self.buf)
+            if not self.fill():
+                raise ValueError("Unexpected end of the JSON document")
+
+    def skip_string(self):
+        """It consumes the rest of a string, whose opening quote is consumed."""
+        while True:
+            match = _STRING_END.match(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return
+            if not self.fill():
+                raise ValueError("Unexpected end of the JSON document")
+
+    def skip_value(self, first):
+        """It consumes the rest of a value, whose first byte is consumed."""
+        if first == b'"':
+            self.skip_string()
+        elif first in (b"{", b"["):
+            depth = 1
+            while depth:
+                match = self.search(_TOKEN)
+                self.pos = match.end()
+                token = match.group()
+                if token == b'"':
+                    self.skip_string()
+                elif token in (b"{", b"["):
+                    depth += 1
+                else:
+                    depth -= 1
+        elif first:
+            self.pos = self.search(_SCALAR_END).start()
+        else:
+            raise ValueError("Unexpected end of the JSON document")
+
+
+def _find_key(reader, key):
+    if reader.next_char() != b"{":
+        raise ValueError("The JSON document is not an object")
+    while True:
+        reader.mark = reader.pos
+        char = reader.next_char()
+        if char == b"}":
+            return False
+        if char == b",":
+            continue
+        if char != b'"':
+            raise ValueError("Invalid key in the JSON document")
+        # The buffer is shifted when it is filled, but always starts at the mark
+        reader.mark = reader.pos
+        reader.skip_string()
+        name = reader.buf[reader.mark : reader.pos - 1]
+        if reader.next_char() != b":":
+            raise ValueError("Invalid key in the JSON document")
+        if name == key:
+            return True
+        reader.mark = reader.pos
+        reader.skip_value(reader.next_char())
+
+
+def _array_bounds(data):
+    """It returns the offsets of the commas separating the elements of an array in
+    the bytes in input, which start outside any element, and the offset of the end
+    of the array (or -1 if it is not in the bytes). The commas are found with
+    vectorised operations on the bytes, after blanking the escaped characters of the
+    strings: the bytes with an even number of quotes before them and at depth 0 are
+    outside the elements."""
+    clean = np.frombuffer(_ESCAPE.sub(b"__", data), dtype=np.uint8)
+    outside_strings = (np.cumsum(clean == ord('"'), dtype=np.int64) & 1) == 0
+    depth = np.cumsum(_DEPTH_DELTA[clean] * outside_strings, dtype=np.int64)
+    closed = np.flatnonzero(depth < 0)
+    end = closed[0] if len(closed) else len(data)
+    commas = np.flatnonzero(
+        (clean[:end] == ord(",")) & (depth[:end] == 0) & outside_strings[:end]
+    )
+    return commas, end if len(closed) else -1
+
+
+def iter_json_array(fp, key=None, chunk_size=CHUNK_SIZE):
+    """It yields, as bytes and one at a time, the elements of a JSON array in a binary
+    stream, which is the whole document or, if 'key' is specified, the value of that
+    key of the top-level object (nothing is yielded if there is no such key). The
+    stream is read in chunks of 'chunk_size' bytes, and only the elements in the
+    current chunk are kept in memory, thus each element can be decoded (e.g. with
+    json_loads) and dropped before reading the next ones."""
+    reader = _Reader(fp, chunk_size)
+    if key is not None and not _find_key(reader, key.encode("utf-8")):
+        return
+    if reader.next_char() != b"[":
+        raise ValueError("The JSON value is not an array")
+    data = reader.buf[reader.pos :]
+    while True:
+        commas, end = _array_bounds(data)
+        start = 0
+        for comma in commas:
+            yield data[start:comma].strip()
+            start = comma + 1
+        if end >= 0:
+            element = data[start:end].strip()
+            if element:
+                yield element
+            return
+        # The incomplete element at the end is scanned again with the next chunk
+        data = data[start:]
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            raise ValueError("Unexpected end of the JSON document")
+        data += chunk
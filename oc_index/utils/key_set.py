@@ -0,0 +1,100 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import numpy as np
+import pandas as pd
+
+# The keys of the rows that are not a pair of (small enough) integers have
+# this bit set, thus they never collide with the packed pairs
+HASHED = np.uint64(1 << 63)
+
+
+def pair_keys(first, second):
+    """It returns the uint64 key of each row of the two columns in input: the two
+    values packed in 32 bits each, if they are integers in [0, 2^31), or a hash of
+    the row otherwise (e.g. (1, 4972128) -> 1 << 32 | 4972128)."""
+    raw_first = pd.Series(first).reset_index(drop=True)
+    raw_second = pd.Series(second).reset_index(drop=True)
+    first = pd.to_numeric(raw_first, errors="coerce")
+    second = pd.to_numeric(raw_second, errors="coerce")
+    packable = (
+        first.between(0, 2**31 - 1)
+        & second.between(0, 2**31 - 1)
+        & (first % 1 == 0)
+        & (second % 1 == 0)
+    ).to_numpy()
+    keys = np.zeros(len(packable), dtype=np.uint64)
+    keys[packable] = (
+        first[packable].to_numpy(dtype=np.uint64) << np.uint64(32)
+    ) | second[packable].to_numpy(dtype=np.uint64)
+    if not packable.all():
+        keys[~packable] = row_keys(
+            pd.DataFrame({0: raw_first.astype(str), 1: raw_second.astype(str)})[~packable]
+        )
+    return keys
+
+
+def _value_text(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _as_text(column):
+    """It returns the values of the column as strings, the integral numbers without
+    decimals, so that a value gets the same text whatever the dtype inferred by
+    pandas for the column (e.g. 2020 in an int64 column, 2020.0 in a float64 one
+    or in an object one after fillna(""))."""
+    if pd.api.types.is_float_dtype(column):
+        integral = (column % 1 == 0).to_numpy()
+        text = column.astype(str).to_numpy(dtype=object)
+        text[integral] = column[integral].astype(np.int64).astype(str).to_numpy()
+        return pd.Series(text, index=column.index)
+    if column.dtype == object:
+        return column.map(_value_text)
+    return column.astype(str)
+
+
+def row_keys(df):
+    """It returns the uint64 key (a 63-bit hash of the values, as text) of each row."""
+    text = pd.DataFrame({idx: _as_text(column) for idx, (_, column) in enumerate(df.items())})
+    return pd.util.hash_pandas_object(text, index=False).to_numpy(dtype=np.uint64) | HASHED
+
+
+class KeySet(object):
+    """A set of uint64 keys kept as sorted NumPy arrays (8 bytes per key). The keys
+    are added in runs, merged when a run is not much smaller than the previous
+    one, so that there are O(log n) runs and each key is merged O(log n) times."""
+
+    def __init__(self):
+        self._runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    def contains(self, keys):
+        """It returns a boolean mask of the keys in input already in the set."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        found = np.zeros(len(keys), dtype=bool)
+        for run in self._runs:
+            pos = np.minimum(np.searchsorted(run, keys), len(run) - 1)
+            found |= run[pos] == keys
+        return found
+
+    def add_new(self, keys):
+        """It adds the keys in input to the set and returns a boolean mask of the
+        ones that were not in the set, nor earlier in the input."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        new = np.zeros(len(keys), dtype=bool)
+        new[np.unique(keys, return_index=True)[1]] = True
+        new &= ~self.contains(keys)
+        run = np.sort(keys[new])
+        if len(run):
+            self._runs.append(run)
+            while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+                last = self._runs.pop()
+                self._runs[-1] = np.sort(np.concatenate((self._runs[-1], last)))
+        return new
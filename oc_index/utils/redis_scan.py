@@ -0,0 +1,246 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+from multiprocessing import Process, Queue
+from time import perf_counter
+
+from redis.exceptions import ResponseError
+
+# Characters having a special meaning in the glob-style patterns of SCAN MATCH
+GLOB_SPECIAL = "\\*?[]^"
+
+# The values that can be fetched together with the keys scanned
+FETCH = (None, "get", "smembers", "smismember", "hgetall", "type")
+
+
+def escape_pattern(text):
+    return "".join("\\" + c if c in GLOB_SPECIAL else c for c in text)
+
+
+def prefix_shards(prefix="", digits=1, complete=False):
+    """It returns the SCAN MATCH patterns splitting the keys starting with
+    'prefix' according to the 'digits' characters following it, e.g. with
+    prefix 'br/06' and 1 digit 'br/060*', ..., 'br/069*'. A few more patterns
+    cover the keys having shorter or non-numerical suffixes, so that every key
+    starting with the prefix is matched by exactly one pattern. If 'complete'
+    is True, the keys not starting with the prefix are covered as well."""
+    escaped = escape_pattern(prefix)
+    patterns = [escaped]
+    for level in range(digits):
+        patterns = [p + str(d) for p in patterns for d in range(10)]
+    patterns = [p + "*" for p in patterns]
+    for level in range(digits):
+        head = escaped + "[0-9]" * level
+        patterns.append(head)
+        patterns.append(head + "[^0-9]*")
+    if complete:
+        for idx, c in enumerate(prefix):
+            head = escape_pattern(prefix[:idx])
+            patterns.append(head)
+            patterns.append(head + "[^" + escape_pattern(c) + "]*")
+    return patterns
+
+
+def shard_digits(workers, digits=None):
+    """It returns the digits of the shards (see prefix_shards) to be read by
+    'workers' processes. Since SCAN applies MATCH to the keys after walking the
+    cursor, each pattern walks the whole keyspace: with one worker (or 'digits'
+    equal to 0) it is 0, i.e. a single '*' pattern, otherwise 'digits' if
+    specified or the fewest digits giving at least a shard per worker."""
+    if workers <= 1 or digits == 0:
+        return 0
+    if digits:
+        return digits
+    digits = 1
+    while 10**digits < workers:
+        digits += 1
+    return digits
+
+
+def _fetch(r, keys, fetch, members):
+    if fetch is None:
+        return [None] * len(keys)
+    if fetch == "get":
+        return r.mget(keys)
+
+    pipe = r.pipeline(transaction=False)
+    for key in keys:
+        if fetch == "smismember":
+            pipe.smismember(key, members)
+        else:
+            getattr(pipe, fetch)(key)
+    # Keys of the wrong type get None instead of failing the whole batch
+    return [
+        None if isinstance(value, ResponseError) else value
+        for value in pipe.execute(raise_on_error=False)
+    ]
+
+
+def scan_batches(r, match="*", fetch=None, members=None, count=1000, batch_size=1000):
+    """It yields (keys, values) batches of at most 'batch_size' keys matching
+    the pattern, using a single SCAN cursor and fetching the values of each
+    batch in one round trip ('fetch' is the name of the command used)."""
+    if fetch not in FETCH:
+        raise ValueError("Unknown fetch command: %s" % fetch)
+    if fetch == "smismember" and not members:
+        raise ValueError("The members to check are needed for smismember")
+    members = list(members) if members is not None else None
+
+    batch = []
+    for key in r.scan_iter(match=match, count=count):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            yield batch, _fetch(r, batch, fetch, members)
+            batch = []
+    if batch:
+        yield batch, _fetch(r, batch, fetch, members)
+
+
+def _as_batch(keys, values):
+    return keys, values
+
+
+def _scan_worker(r, in_queue, out_queue, fetch, members, count, batch_size, process):
+    try:
+        pattern = in_queue.get()
+        while pattern is not None:
+            for keys, values in scan_batches(
+                r, pattern, fetch, members, count, batch_size
+            ):
+                out_queue.put((len(keys), process(keys, values)))
+            pattern = in_queue.get()
+    except Exception as e:
+        # It is raised again by the consumer, which would otherwise wait forever
+        out_queue.put(e)
+    out_queue.put(None)
+
+
+class RedisScanner(object):
+    """It walks all the keys of a Redis DB matching a list of patterns (the
+    shards, see prefix_shards), yielding (keys, values) batches. With more than
+    one worker, the shards are scanned in parallel by processes using their own
+    connections (i.e. 'r' is inherited by forking) and the batches are yielded
+    in no particular order. If 'process' is specified, it is called on each
+    (keys, values) batch by the worker that read it, and its results are
+    yielded instead of the batches.
+
+    Since SCAN may return a key more than once (e.g. when the DB is rehashed
+    while scanning), the consumers must tolerate duplicates as SCAN does."""
+
+    def __init__(
+        self,
+        r,
+        shards=("*",),
+        fetch=None,
+        members=None,
+        count=1000,
+        batch_size=1000,
+        workers=1,
+        log_every=0,
+        logger=None,
+        process=None,
+    ):
+        if fetch not in FETCH:
+            raise ValueError("Unknown fetch command: %s" % fetch)
+        if fetch == "smismember" and not members:
+            raise ValueError("The members to check are needed for smismember")
+        self.r = r
+        self.shards = list(shards)
+        self.fetch = fetch
+        self.members = list(members) if members is not None else None
+        self.count = count
+        self.batch_size = batch_size
+        self.workers = max(1, min(workers, len(self.shards)))
+        self.log_every = log_every
+        self.logger = logger
+        self.process = process if process is not None else _as_batch
+        self.keys = 0
+        self.elapsed = 0.0
+
+    def keys_per_second(self):
+        return self.keys / self.elapsed if self.elapsed else 0.0
+
+    def _log(self, message):
+        if self.logger is None:
+            print(message)
+        else:
+            self.logger.info(message)
+
+    def _iter_batches(self):
+        if self.workers <= 1:
+            for pattern in self.shards:
+                for keys, values in scan_batches(
+                    self.r,
+                    pattern,
+                    self.fetch,
+                    self.members,
+                    self.count,
+                    self.batch_size,
+                ):
+                    yield len(keys), self.process(keys, values)
+            return
+
+        in_queue = Queue()
+        out_queue = Queue(maxsize=self.workers * 2)
+        for pattern in self.shards:
+            in_queue.put(pattern)
+        for _ in range(self.workers):
+            in_queue.put(None)
+        processes = [
+            Process(
+                target=_scan_worker,
+                args=(
+                    self.r,
+                    in_queue,
+                    out_queue,
+                    self.fetch,
+                    self.members,
+                    self.count,
+                    self.batch_size,
+                    self.process,
+                ),
+            )
+            for _ in range(self.workers)
+        ]
+        for p in processes:
+            p.start()
+        try:
+            running = self.workers
+            while running:
+                batch = out_queue.get()
+                if batch is None:
+                    running -= 1
+                elif isinstance(batch, Exception):
+                    raise batch
+                else:
+                    yield batch
+            for p in processes:
+                p.join()
+        finally:
+            # The consumer stopped early: the workers may be blocked on the queue
+            for p in processes:
+                if p.is_alive():
+                    p.terminate()
+                    p.join()
+
+    def __iter__(self):
+        start = perf_counter()
+        next_log = self.log_every
+        for n_keys, batch in self._iter_batches():
+            self.keys += n_keys
+            self.elapsed = perf_counter() - start
+            if self.log_every and self.keys >= next_log:
+                next_log += self.log_every
+                self._log(
+                    "Scanned %s keys (%.0f keys/s)" % (self.keys, self.keys_per_second())
+                )
+            yield batch
+        self.elapsed = perf_counter() - start
+        if self.log_every:
+            self._log(
+                "Scan completed: %s keys in %.1fs (%.0f keys/s)"
+                % (self.keys, self.elapsed, self.keys_per_second())
+            )
@@ -0,0 +1,155 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import json
+import sqlite3
+import threading
+import time
+
+from oc_index.utils.config import get_config
+
+# Number of writes between two checks of the size of the cache
+EVICTION_INTERVAL = 1000
+# Seconds after which a negative result (e.g. an id not found) is looked up again
+NEGATIVE_TTL = 86400
+
+
+class ResponseCache(object):
+    """A persistent cache of the (parsed) responses of the APIs, stored in a SQLite
+    database and keyed by service and normalised id, which can be shared by many
+    threads and processes. The entries older than 'ttl' seconds are ignored and
+    removed, and the least recently written ones are removed when there are more
+    than 'max_entries'. The entries can also be given a shorter time to live when
+    they are written, e.g. 'negative_ttl' for the negative results. The hits and
+    misses are counted in the attributes with those names."""
+
+    def __init__(self, path, ttl=None, max_entries=None, negative_ttl=NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(path, check_same_thread=False, timeout=60)
+        with self._con:
+            self._con.execute("PRAGMA journal_mode=WAL")
+            self._con.execute(
+                "CREATE TABLE IF NOT EXISTS responses (service TEXT, id TEXT, "
+                "value TEXT, created REAL, expires REAL, PRIMARY KEY (service, id)) "
+                "WITHOUT ROWID"
+            )
+            columns = [row[1] for row in self._con.execute("PRAGMA table_info(responses)")]
+            if "expires" not in columns:
+                self._con.execute("ALTER TABLE responses ADD COLUMN expires REAL")
+            self._con.execute(
+                "CREATE INDEX IF NOT EXISTS responses_created ON responses (created)"
+            )
+
+    def _min_created(self):
+        return time.time() - self.ttl if self.ttl else float("-inf")
+
+    def get_many(self, service, ids):
+        """It returns a dictionary with the cached value of the ids in input that
+        are in the cache."""
+        ids = list(ids)
+        result = {}
+        with self._lock:
+            # SQLite accepts up to 999 parameters in a query
+            for idx in range(0, len(ids), 900):
+                batch = ids[idx : idx + 900]
+                rows = self._con.execute(
+                    "SELECT id, value FROM responses WHERE service = ? AND created >= ? "
+                    "AND (expires IS NULL OR expires >= ?) AND id IN (%s)"
+                    % ",".join("?" * len(batch)),
+                    [service, self._min_created(), time.time()] + batch,
+                )
+                for id_string, value in rows:
+                    result[id_string] = json.loads(value)
+            self.hits += len(result)
+            self.misses += len(set(ids)) - len(result)
+        return result
+
+    def get(self, service, id_string):
+        """It returns a tuple (found, value) with the cached value of an id."""
+        result = self.get_many(service, [id_string])
+        return id_string in result, result.get(id_string)
+
+    def set_many(self, service, values, ttl=None):
+        """It stores the values (JSON serialisable) of the ids in the dictionary
+        in input, for 'ttl' seconds if specified."""
+        now = time.time()
+        expires = now + ttl if ttl else None
+        with self._lock, self._con:
+            self._con.executemany(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                [
+                    (service, id_string, json.dumps(value), now, expires)
+                    for id_string, value in values.items()
+                ],
+            )
+            self._writes += len(values)
+            if self._writes >= EVICTION_INTERVAL:
+                self._writes = 0
+                self._evict()
+
+    def set(self, service, id_string, value, ttl=None):
+        self.set_many(service, {id_string: value}, ttl)
+
+    def _evict(self):
+        self._con.execute("DELETE FROM responses WHERE expires < ?", (time.time(),))
+        if self.ttl:
+            self._con.execute(
+                "DELETE FROM responses WHERE created < ?", (self._min_created(),)
+            )
+        if self.max_entries:
+            self._con.execute(
+                "DELETE FROM responses WHERE created <= (SELECT created FROM responses "
+                "ORDER BY created DESC LIMIT 1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def evict(self):
+        """It removes the expired entries and the oldest ones beyond max_entries."""
+        with self._lock, self._con:
+            self._evict()
+
+    def stats(self):
+        """It returns the hits, the misses and the number of entries in the cache."""
+        with self._lock:
+            (entries,) = self._con.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        with self._lock:
+            self._con.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache():
+    """It returns the ResponseCache shared in the process, as specified in the 'cnc'
+    section of the config (api_cache, api_cache_ttl in days, api_cache_size in
+    entries, api_cache_negative_ttl in days), or None if no cache is specified."""
+    config = get_config()
+    path = config.get("cnc", "api_cache", fallback="")
+    if not path:
+        return None
+    with _caches_lock:
+        if path not in _caches:
+            ttl = config.get("cnc", "api_cache_ttl", fallback="")
+            size = config.get("cnc", "api_cache_size", fallback="")
+            negative_ttl = config.get("cnc", "api_cache_negative_ttl", fallback="")
+            _caches[path] = ResponseCache(
+                path,
+                float(ttl) * 86400 if ttl else None,
+                int(size) if size else None,
+                float(negative_ttl) * 86400 if negative_ttl else NEGATIVE_TTL,
+            )
+        return _caches[path]
@@ -0,0 +1,70 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+from hashlib import blake2b
+from math import log
+
+try:
+    from xxhash import xxh64_intdigest
+except ImportError:
+    xxh64_intdigest = None
+
+
+def hash64(value):
+    """It returns a 64-bit hash of the string in input, stable across processes
+    (unlike the built-in hash) so that sketches built in parallel can be merged."""
+    data = value.encode("utf-8")
+    if xxh64_intdigest is not None:
+        return xxh64_intdigest(data)
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "little")
+
+
+class HyperLogLog(object):
+    """HyperLogLog sketch estimating the number of distinct strings added to it,
+    using 2^precision one-byte registers (16 KB with the default precision,
+    i.e. a standard error of about 0.8%)."""
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self._shift = 64 - precision
+        self._mask = (1 << self._shift) - 1
+
+    def add(self, value):
+        h = hash64(value)
+        idx = h >> self._shift
+        rank = self._shift - (h & self._mask).bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        histogram = [0] * (self._shift + 2)
+        for register in self.registers:
+            histogram[register] += 1
+        estimate = (
+            alpha
+            * self.m
+            * self.m
+            / sum(n * 2.0**-rank for rank, n in enumerate(histogram))
+        )
+        # Small range correction (linear counting)
+        if estimate <= 2.5 * self.m and histogram[0]:
+            estimate = self.m * log(self.m / histogram[0])
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
@@ -0,0 +1,118 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import json
+import os
+from multiprocessing import Process, Queue
+from queue import Empty
+from threading import Lock
+
+
+def _worker(target, args, in_queue, out_queue):
+    task = in_queue.get()
+    while task is not None:
+        try:
+            out_queue.put(target(*task, *args))
+        except Exception as e:
+            # It is raised again by the caller, which would otherwise wait forever
+            out_queue.put(e)
+        task = in_queue.get()
+
+
+def _result(result):
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def run_tasks(target, tasks, args=(), workers=1, queue_size=0):
+    """
+    Call target(*task, *args) for each task, in a pool of 'workers' processes if
+    more than one, and yield the results (in no particular order). If 'queue_size'
+    is specified, the tasks (e.g. a generator reading a dump) are read while the
+    results are yielded, and at most 'queue_size' of them wait for a worker at a
+    time; otherwise, all the tasks are queued first.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield target(*task, *args)
+        return
+
+    in_queue = Queue(queue_size)
+    out_queue = Queue()
+    if not queue_size:
+        tasks = list(tasks)
+        workers = min(workers, len(tasks))
+    processes = [
+        Process(target=_worker, args=(target, args, in_queue, out_queue))
+        for _ in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    try:
+        pending = 0
+        for task in tasks:
+            in_queue.put(task)
+            pending += 1
+            while pending:
+                try:
+                    result = out_queue.get_nowait()
+                except Empty:
+                    break
+                pending -= 1
+                yield _result(result)
+        for _ in processes:
+            in_queue.put(None)
+        for _ in range(pending):
+            yield _result(out_queue.get())
+        for p in processes:
+            p.join()
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+                p.join()
+
+
+class Manifest(object):
+    """
+    The keys of the tasks done, kept (one per line) in a file that is appended to
+    while they are done, so that an interrupted process can skip them when resumed.
+    The first line of the file records the settings the tasks depend on (e.g. the
+    size of the chunks of the input), and a manifest can be resumed only with the
+    same settings.
+    """
+
+    def __init__(self, path, settings=None):
+        self.path = path
+        self.done = set()
+        self._lock = Lock()
+        header = "# " + json.dumps(settings or {}, sort_keys=True) + "\n"
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, encoding="utf8") as f:
+                if f.readline() != header:
+                    raise ValueError(
+                        "The manifest '%s' was created with different settings" % path
+                    )
+                for line in f:
+                    self.done.add(line.rstrip("\n"))
+            self._file = open(path, "a", encoding="utf8")
+        else:
+            self._file = open(path, "w", encoding="utf8")
+            self._file.write(header)
+            self._file.flush()
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def add(self, key):
+        with self._lock:
+            self.done.add(key)
+            self._file.write(key + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
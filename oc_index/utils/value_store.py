@@ -0,0 +1,186 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import csv
+import os
+import sqlite3
+import threading
+import weakref
+from itertools import islice
+
+# Number of values added before they are written in the database
+APPEND_BATCH = 10000
+# Ids looked up with a list of parameters, larger lookups use a temporary table
+MAX_PARAMS = 900
+
+
+def _append_csv(con, field, csv_path, rows):
+    source = (field, os.path.abspath(csv_path))
+    before = os.stat(csv_path) if os.path.exists(csv_path) else None
+    loaded = con.execute(
+        "SELECT size, mtime FROM sources WHERE field = ? AND path = ?", source
+    ).fetchone()
+    with open(csv_path, "a", encoding="utf8", newline="") as f:
+        if before is None:
+            f.write('"id","value"\n')
+        csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator="\n").writerows(
+            (id_string, value) for id_string, _, value in rows
+        )
+    # The CSV is still in sync with the database, unless it had changed since
+    # it was last loaded (it is then loaded again, see load_csv)
+    if before is None or loaded == (before.st_size, before.st_mtime):
+        after = os.stat(csv_path)
+        con.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+            source + (after.st_size, after.st_mtime),
+        )
+
+
+def _flush(con, pending, lock, csv_paths):
+    with lock:
+        if pending:
+            with con:
+                if not csv_paths:
+                    con.executemany(
+                        "INSERT OR IGNORE INTO data VALUES (?, ?, ?)", pending
+                    )
+                else:
+                    new_rows = {}
+                    for row in pending:
+                        inserted = con.execute(
+                            "INSERT OR IGNORE INTO data VALUES (?, ?, ?)", row
+                        ).rowcount
+                        if inserted and row[1] in csv_paths:
+                            new_rows.setdefault(row[1], []).append(row)
+                    # The CSVs are written before the transaction is committed, so
+                    # that an interruption leaves them ahead of the database
+                    for field, rows in new_rows.items():
+                        _append_csv(con, field, csv_paths[field], rows)
+            del pending[:]
+
+
+def _close(con, pending, lock, csv_paths):
+    _flush(con, pending, lock, csv_paths)
+    con.close()
+
+
+class ValueStore(object):
+    """It stores a set of values for each field (e.g. 'date') of each id in a SQLite
+    database, indexed by id, so that the values of many ids can be retrieved with a
+    single query without keeping them in memory. The values added are written in
+    batches of APPEND_BATCH (and before any lookup, or when the store is closed).
+    The id/value CSV files used by CSVManager can be loaded in bulk with load_csv.
+    If 'csv_paths' maps a field to one of these CSV files, the new values of the
+    field are also appended to it when they are written, as CSVManager does."""
+
+    def __init__(self, path, csv_paths=None):
+        self.path = path
+        self.csv_paths = dict(csv_paths or {})
+        self._lock = threading.RLock()
+        self._pending = []
+        self._con = sqlite3.connect(path, check_same_thread=False, timeout=60)
+        with self._con:
+            self._con.execute("PRAGMA journal_mode=WAL")
+            self._con.execute(
+                "CREATE TABLE IF NOT EXISTS data (id TEXT, field TEXT, value TEXT, "
+                "PRIMARY KEY (id, field, value)) WITHOUT ROWID"
+            )
+            self._con.execute(
+                "CREATE TABLE IF NOT EXISTS sources (field TEXT, path TEXT, "
+                "size INTEGER, mtime REAL, PRIMARY KEY (field, path))"
+            )
+        self._finalizer = weakref.finalize(
+            self, _close, self._con, self._pending, self._lock, self.csv_paths
+        )
+
+    def load_csv(self, field, csv_path, batch_size=APPEND_BATCH):
+        """It adds the values of the field in a CSV with the columns 'id' and 'value'
+        and returns the number of rows read. A CSV is not read again if it has not
+        changed since it was last loaded."""
+        if not os.path.exists(csv_path):
+            return 0
+        stat = os.stat(csv_path)
+        source = (field, os.path.abspath(csv_path))
+        with self._lock:
+            loaded = self._con.execute(
+                "SELECT size, mtime FROM sources WHERE field = ? AND path = ?", source
+            ).fetchone()
+            if loaded == (stat.st_size, stat.st_mtime):
+                return 0
+
+            rows = 0
+            with open(csv_path, encoding="utf-8", newline="") as f, self._con:
+                reader = csv.DictReader(f)
+                while True:
+                    batch = [
+                        (row["id"], field, row["value"])
+                        for row in islice(reader, batch_size)
+                    ]
+                    if not batch:
+                        break
+                    self._con.executemany(
+                        "INSERT OR IGNORE INTO data VALUES (?, ?, ?)", batch
+                    )
+                    rows += len(batch)
+                self._con.execute(
+                    "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                    source + (stat.st_size, stat.st_mtime),
+                )
+        return rows
+
+    def add(self, id_string, field, value):
+        """It adds a value to the ones of the field of an id."""
+        with self._lock:
+            self._pending.append((id_string, field, value))
+            if len(self._pending) >= APPEND_BATCH:
+                self.flush()
+
+    def add_many(self, rows):
+        """It adds the (id, field, value) tuples in input."""
+        with self._lock:
+            self._pending.extend(rows)
+            if len(self._pending) >= APPEND_BATCH:
+                self.flush()
+
+    def flush(self):
+        _flush(self._con, self._pending, self._lock, self.csv_paths)
+
+    def get_many(self, ids):
+        """It returns a dictionary mapping the ids in input that are in the store to
+        a dictionary with the set of values of each of their fields."""
+        ids = list(dict.fromkeys(ids))
+        result = {}
+        with self._lock:
+            self.flush()
+            if len(ids) <= MAX_PARAMS:
+                rows = self._con.execute(
+                    "SELECT id, field, value FROM data WHERE id IN (%s)"
+                    % ",".join("?" * len(ids)),
+                    ids,
+                )
+            else:
+                with self._con:
+                    self._con.execute(
+                        "CREATE TEMP TABLE IF NOT EXISTS lookup (id TEXT PRIMARY KEY)"
+                    )
+                    self._con.execute("DELETE FROM lookup")
+                    self._con.executemany(
+                        "INSERT INTO lookup VALUES (?)", ((i,) for i in ids)
+                    )
+                    rows = self._con.execute(
+                        "SELECT data.id, field, value FROM lookup JOIN data USING (id)"
+                    ).fetchall()
+            for id_string, field, value in rows:
+                result.setdefault(id_string, {}).setdefault(field, set()).add(value)
+        return result
+
+    def get(self, id_string):
+        """It returns the dictionary with the set of values of each field of an id,
+        or None if it is not in the store."""
+        return self.get_many([id_string]).get(id_string)
+
+    def close(self):
+        self._finalizer()
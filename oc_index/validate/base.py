@@ -12,6 +12,7 @@ import importlib
 from abc import ABCMeta, abstractmethod
 
 from oc_index.oci.citation import OCIManager
+from oc_index.oci.moph import MOPHIndex
 from oc_index.utils.config import get_config
 
 from os.path import join
@@ -27,6 +28,31 @@ class CitationValidator(metaclass=ABCMeta):
         self._service = service
         self._prefix = self._config.get(self._service, "prefix")
 
+        # MOPH tables of the current index dump, used to skip existing citations
+        self._moph = None
+        moph_dir = self._config.get("cnc", "moph", fallback="")
+        if moph_dir:
+            moph_oci = self._config.get("cnc", "moph_oci", fallback="")
+            self._moph = MOPHIndex(
+                os.path.expanduser(moph_dir),
+                os.path.expanduser(moph_oci) if moph_oci else None,
+                lib_path=self._config.get("cnc", "moph_lib", fallback="") or None,
+            )
+
+    def _remove_indexed(self, query, result_map=None):
+        """It removes from the query the OCIs already included in the index,
+        according to the MOPH tables. If a result map is specified, the OCIs
+        checked are added to it, marked as processed if already indexed."""
+        if self._moph is None:
+            return query
+        new_query = []
+        for oci, found in zip(query, self._moph.contains(query)):
+            if result_map is not None and oci not in result_map:
+                result_map[oci] = found
+            if not found:
+                new_query.append(oci)
+        return new_query
+
     @abstractmethod
     def build_oci_query(self, input_file, result_map, disable_tqdm=False):
         pass
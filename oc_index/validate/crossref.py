@@ -22,6 +22,23 @@ class CrossrefValidator(CitationValidator):
         self._doi_manager = DOIManager()
         self._logger = get_logger()
 
+    def _get_references_oci(self, citing, references):
+        """It returns the pairs (reference, oci) of the references having a
+        valid DOI, encoding all the OCIs of the citing entity in one batch."""
+        valid_references = []
+        cited = []
+        for ref in references:
+            doi = self._doi_manager.normalise(ref.get("DOI"))
+            if doi is not None:
+                valid_references.append(ref)
+                cited.append(doi)
+        ocis = self._oci_manager.get_ocis(
+            [citing] * len(cited), cited, prefix=self._prefix
+        )
+        return [
+            (ref, oci.replace("oci:", "")) for ref, oci in zip(valid_references, ocis)
+        ]
+
     def build_oci_query(self, input_file, result_map, disable_tqdm=False):
         json_content = {"items": []}
 
@@ -33,17 +50,12 @@ class CrossrefValidator(CitationValidator):
         for row in tqdm(json_content["items"], disable=disable_tqdm):
             citing = self._doi_manager.normalise(row.get("DOI"))
             if citing is not None and "reference" in row:
-                for ref in row["reference"]:
-                    cited = self._doi_manager.normalise(ref.get("DOI"))
-                    if cited is not None:
-                        oci = self._oci_manager.get_oci(
-                            citing, cited, prefix=self._prefix
-                        ).replace("oci:", "")
-                        # Add oci only if has not been processed in the past
-                        # in the case this is a duplicate.
-                        if oci not in result_map:
-                            query.append(oci)
-        return query
+                for _, oci in self._get_references_oci(citing, row["reference"]):
+                    # Add oci only if has not been processed in the past
+                    # in the case this is a duplicate.
+                    if oci not in result_map:
+                        query.append(oci)
+        return self._remove_indexed(query)
 
     def validate_citations(self, input_directory, result_map, output_directory):
         if not os.path.exists(output_directory):
@@ -62,16 +74,15 @@ class CrossrefValidator(CitationValidator):
                 for row in tqdm(json_content["items"]):
                     citing = self._doi_manager.normalise(row.get("DOI"))
                     if citing is not None and "reference" in row:
-                        for ref in row["reference"]:
-                            cited = self._doi_manager.normalise(ref.get("DOI"))
-                            if cited is not None:
-                                oci = self._oci_manager.get_oci(
-                                    citing, cited, prefix=self._prefix
-                                ).replace("oci:", "")
-                                # Add oci only if has not been processed in the past
-                                # in the case this is a duplicate.
-                                if oci not in result_map:
-                                    query.append(oci)
+                        for _, oci in self._get_references_oci(
+                            citing, row["reference"]
+                        ):
+                            # Add oci only if has not been processed in the past
+                            # in the case this is a duplicate.
+                            if oci not in result_map:
+                                query.append(oci)
+
+                query = self._remove_indexed(query, result_map)
 
                 # Create input file
                 with open("input.csv", "w") as f:
@@ -86,19 +97,16 @@ class CrossrefValidator(CitationValidator):
                     citing = self._doi_manager.normalise(row.get("DOI"))
                     if citing is not None and "reference" in row:
                         reference = []
-                        for ref in row["reference"]:
-                            cited = self._doi_manager.normalise(ref.get("DOI"))
-                            if cited is not None:
-                                oci = self._oci_manager.get_oci(
-                                    citing, cited, prefix=self._prefix
-                                ).replace("oci:", "")
-                                # Add oci only if has not been preprocessed and it is not a duplicate
-                                if oci in result_map and not result_map[oci]:
-                                    # Set result map true for the oci to avoid duplicates
-                                    result_map[oci] = True
-                                    reference.append(ref)
-                                else:
-                                    duplicated += 1
+                        for ref, oci in self._get_references_oci(
+                            citing, row["reference"]
+                        ):
+                            # Add oci only if has not been preprocessed and it is not a duplicate
+                            if oci in result_map and not result_map[oci]:
+                                # Set result map true for the oci to avoid duplicates
+                                result_map[oci] = True
+                                reference.append(ref)
+                            else:
+                                duplicated += 1
                         row["reference"] = reference
                         items.append(row)
 
@@ -55,7 +55,7 @@ class INDEXValidator(CitationValidator):
                     # in the case this is a duplicate.
                     if oci not in result_map:
                         query.append(oci)
-        return query
+        return self._remove_indexed(query)
 
     def validate_citations(self, input_directory, result_map, output_directory):
         if not os.path.exists(output_directory):
@@ -86,6 +86,8 @@ class INDEXValidator(CitationValidator):
                             else:
                                 print(oci,result_map[oci])
 
+                query = self._remove_indexed(query, result_map)
+
                 # Create input file
                 with open("input.csv", "w") as f:
                     for oci in query:
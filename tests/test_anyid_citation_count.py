@@ -0,0 +1,119 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import csv
+import os
+import tempfile
+import unittest
+
+import fakeredis
+
+from oc_index.scripts.anyid_citation_count import (
+    AnyIdMap,
+    anyid_counts,
+    citation_shards,
+    count_csv_citations,
+    omid_to_int,
+)
+from oc_index.utils.redis_scan import RedisScanner
+
+
+class AnyIdCitationCountTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.omidmap = os.path.join(self.tmp_dir.name, "meta_br.csv")
+        with open(self.omidmap, "w", newline="") as f:
+            csv.writer(f).writerows(
+                [
+                    ["doi:10.1/a", "omid:br/061"],
+                    ["pmid:1", "omid:br/061"],
+                    ["doi:10.1/b", "omid:br/062"],
+                    ["doi:10.1/c", "omid:br/063; omid:br/064"],
+                    ["openalex:W1", "omid:br/065"],
+                    ["doi:10.1/d", "omid:br/066"],
+                ]
+            )
+        # 062 is cited by 061, 063 and 064 (both with doi:10.1/c, counted once),
+        # 065 (counted, even if its ANY-ID is not a DOI) and 067 (without any
+        # ANY-ID, not counted)
+        self.citations = {
+            "062": {"061", "063", "064", "065", "067"},
+            "br/061": {"coci:br/062"},
+            "064": {"061"},
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def check(self, anyid_map, results):
+        counts = dict(zip(anyid_map.ids, anyid_counts(anyid_map, results).tolist()))
+        self.assertEqual(
+            {
+                "doi:10.1/a": 1,
+                "pmid:1": 1,
+                "doi:10.1/b": 3,
+                "doi:10.1/c": 1,
+                "doi:10.1/d": 0,
+            },
+            counts,
+        )
+
+    def test_omid_to_int(self):
+        self.assertEqual(634096064, omid_to_int("omid:br/0634096064"))
+        self.assertEqual(634096064, omid_to_int("coci:br/0634096064"))
+        self.assertEqual(634096064, omid_to_int("0634096064"))
+        self.assertEqual(-1, omid_to_int("doi:10.1/a"))
+
+    def test_map(self):
+        anyid_map = AnyIdMap(["doi", "pmid"]).load(self.omidmap)
+        self.assertEqual(6, len(anyid_map))
+        self.assertEqual(
+            ["doi:10.1/a", "pmid:1", "doi:10.1/b", "doi:10.1/c", "doi:10.1/d"],
+            anyid_map.ids,
+        )
+        self.assertEqual([0, 2, 3, 4, 5, 6, 7], anyid_map.indptr.tolist())
+
+    def test_redis(self):
+        r = fakeredis.FakeRedis(decode_responses=True)
+        for cited, citing in self.citations.items():
+            r.sadd(cited, *citing)
+        anyid_map = AnyIdMap(["doi", "pmid"]).load(self.omidmap)
+        for workers in (1, 2):
+            self.check(
+                anyid_map,
+                RedisScanner(
+                    r,
+                    citation_shards(workers - 1),
+                    fetch="smembers",
+                    batch_size=1,
+                    workers=workers,
+                    process=anyid_map.count,
+                ),
+            )
+
+    def test_citation_shards(self):
+        # Every form of the OMID keys is matched by exactly one shard
+        r = fakeredis.FakeRedis(decode_responses=True)
+        keys = ["0612", "06", "br/0634", "br/06", "coci:br/0656", "omid:br/061", "omid:br/06x"]
+        for key in keys:
+            r.set(key, 1)
+        for digits in (0, 1, 2):
+            matched = [k for shard in citation_shards(digits) for k in r.scan_iter(shard)]
+            self.assertEqual(sorted(keys), sorted(matched))
+
+    def test_csv(self):
+        cits_csv = os.path.join(self.tmp_dir.name, "cits.csv")
+        with open(cits_csv, "w", newline="") as f:
+            csv.writer(f).writerows(
+                [cited, "; ".join(citing)] for cited, citing in self.citations.items()
+            )
+        anyid_map = AnyIdMap(["doi", "pmid"]).load(self.omidmap)
+        for workers in (1, 2):
+            self.check(anyid_map, count_csv_citations(anyid_map, cits_csv, workers))
+
+
+if __name__ == "__main__":
+    unittest.main()
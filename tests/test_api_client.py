@@ -0,0 +1,212 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import json
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os.path import join
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from oc_index.finder.crossref import CrossrefResourceFinder
+from oc_index.utils import api_client, response_cache
+from oc_index.utils.api_client import ApiClient, TokenBucket
+from oc_index.utils import config
+
+WORKS = {
+    "10.1000/a": {"DOI": "10.1000/A", "issued": {"date-parts": [[2019, 5, 27]]}},
+    "10.1000/b": {"DOI": "10.1000/b", "issued": {"date-parts": [[2020]]}},
+    "10.1000/c,d": {"DOI": "10.1000/c,d", "issued": {"date-parts": [[2021, 2]]}},
+}
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """A stand-in for the DOI handle and Crossref APIs, storing the requests
+    received and failing the first ones as set in the server."""
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append(self.path)
+            failure = self.server.failures
+            if failure:
+                self.server.failures -= 1
+        time.sleep(self.server.delay)
+        url = urlsplit(self.path)
+        if failure:
+            status, body = 503, {}
+        elif url.path.startswith("/handles/"):
+            doi = unquote(url.path[len("/handles/") :])
+            status, body = 200, {"responseCode": 1 if doi in WORKS else 100}
+        elif url.path == "/works":
+            dois = parse_qs(url.query)["filter"][0].replace("doi:", "").split(",")
+            items = [WORKS[doi] for doi in dois if doi in WORKS]
+            status, body = 200, {"message": {"items": items}}
+        elif url.path.startswith("/works/"):
+            doi = unquote(url.path[len("/works/") :])
+            status, body = (200, {"message": WORKS[doi]}) if doi in WORKS else (404, {})
+        else:
+            status, body = 200, {"path": self.path}
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ApiHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.failures = 0
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:%d" % self.server.server_port
+        self.client = ApiClient(default_rate=1000, backoff=0.01)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ApiClientTest(ServerTest):
+    def test_token_bucket(self):
+        bucket = TokenBucket(50, capacity=1)
+        start = time.monotonic()
+        for _ in range(11):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_rate_limit(self):
+        client = ApiClient(rate_limits={"127.0.0.1:%d" % self.server.server_port: 20})
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            list(executor.map(lambda i: client.get("%s/%d" % (self.url, i)), range(30)))
+        # The first 20 requests are a burst, the others are sent at 20 per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.45)
+        self.assertEqual(30, len(self.server.requests))
+        client.close()
+
+    def test_retry(self):
+        self.server.failures = 2
+        response = self.client.get(self.url + "/x")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, len(self.server.requests))
+
+        self.server.failures = 10
+        self.assertEqual(503, self.client.get(self.url + "/x").status_code)
+
+    def test_unreachable(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertIsNone(self.client.get(self.url + "/x"))
+
+    def test_coalescing(self):
+        self.server.delay = 0.2
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            responses = list(executor.map(lambda _: self.client.get(self.url + "/same"), range(6)))
+        self.assertEqual(1, len(self.server.requests))
+        self.assertTrue(all(r.json() == {"path": "/same"} for r in responses))
+
+
+class PrefetchTest(ServerTest):
+    def setUp(self):
+        super().setUp()
+        # The previous config is restored afterwards
+        self.config_state = dict(config._state)
+        config.reset_config()
+        config.get_config(join("tests", "config.ini"))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        api_client._client["client"] = self.client
+        self.finder = CrossrefResourceFinder({}, use_api_service=True)
+        self.finder._api = self.url + "/works/"
+        self.finder._dm._api = self.url + "/handles/"
+
+    def tearDown(self):
+        api_client._client.clear()
+        for cache in response_cache._caches.values():
+            cache.close()
+        response_cache._caches.clear()
+        config._state.clear()
+        config._state.update(self.config_state)
+        self.tmp_dir.cleanup()
+        super().tearDown()
+
+    def test_prefetch(self):
+        self.finder.prefetch(
+            ["10.1000/a", "doi:10.1000/A", "10.1000/b", "10.1000/c,d", "10.1000/none", None]
+        )
+        # 4 validity lookups, 1 batch lookup and 1 single lookup (for the DOI with a comma)
+        self.assertEqual(6, len(self.server.requests))
+        self.assertEqual("2019-05-27", self.finder.get_pub_date("10.1000/a"))
+        self.assertEqual("2020", self.finder.get_pub_date("10.1000/b"))
+        self.assertEqual("2021-02", self.finder.get_pub_date("10.1000/c,d"))
+        self.assertIsNone(self.finder.get_pub_date("10.1000/none"))
+        self.assertEqual(6, len(self.server.requests))
+
+    def test_without_prefetch(self):
+        self.assertEqual("2019-05-27", self.finder.get_pub_date("10.1000/a"))
+        self.assertEqual(2, len(self.server.requests))
+        # The other columns are taken from the same response
+        self.assertEqual(set(), self.finder.get_container_issn("10.1000/a"))
+        self.assertEqual(set(), self.finder.get_orcid("10.1000/a"))
+        self.assertEqual(2, len(self.server.requests))
+
+    def test_cache(self):
+        cache_path = join(self.tmp_dir.name, "cache.db")
+        config.get_config().set("cnc", "api_cache", cache_path)
+        self.finder.prefetch(["10.1000/a", "10.1000/b", "10.1000/none"])
+        self.assertEqual(4, len(self.server.requests))
+        self.assertEqual("2019-05-27", self.finder.get_pub_date("10.1000/a"))
+
+        # Another finder (e.g. in a later run) takes the responses from the cache
+        finder = CrossrefResourceFinder({}, use_api_service=True)
+        finder._api = self.finder._api
+        finder._dm._api = self.finder._dm._api
+        self.assertEqual("2019-05-27", finder.get_pub_date("10.1000/a"))
+        self.assertEqual(4, len(self.server.requests))
+        finder.prefetch(["10.1000/a", "10.1000/b", "10.1000/none"])
+        self.assertEqual("2020", finder.get_pub_date("10.1000/b"))
+        # The DOI not found is not looked up again either
+        self.assertFalse(finder.is_valid("10.1000/none"))
+        self.assertEqual(4, len(self.server.requests))
+        stats = finder._cache.stats()
+        self.assertEqual(5, stats["entries"])
+        self.assertGreater(stats["hits"], 0)
+
+        # The negative results expire after the negative_ttl of the cache
+        finder._cache.negative_ttl = 0.2
+        finder.prefetch(["10.1000/other"])
+        finder.prefetch(["10.1000/other"])
+        self.assertEqual(5, len(self.server.requests))
+        time.sleep(0.3)
+        finder.prefetch(["10.1000/other"])
+        self.assertEqual(6, len(self.server.requests))
+
+    def test_unavailable(self):
+        config.get_config().set("cnc", "api_cache", join(self.tmp_dir.name, "cache.db"))
+        self.server.failures = 100
+        self.finder.prefetch(["10.1000/a"])
+        self.assertFalse(self.finder.is_valid("10.1000/a"))
+        self.assertEqual(0, self.finder._cache.stats()["entries"])
+
+        # The lookups that failed are not cached, thus they are sent again
+        self.server.failures = 0
+        self.finder.prefetch(["10.1000/a"])
+        self.assertEqual("2019-05-27", self.finder.get_pub_date("10.1000/a"))
+        self.assertEqual(2, self.finder._cache.stats()["entries"])
+
+
+if __name__ == "__main__":
+    unittest.main()
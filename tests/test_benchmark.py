@@ -0,0 +1,137 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from os.path import join
+from unittest.mock import patch
+
+import fakeredis
+
+from oc_index.benchmark.suite import BENCHMARKS, compare, run_suite
+from oc_index.benchmark.synthetic import SyntheticDump
+from oc_index.scripts import benchmark, meta2redis
+
+
+class SyntheticDumpTest(unittest.TestCase):
+    def test_deterministic(self):
+        dump = SyntheticDump(brs=200, degree=5, seed=1)
+        self.assertEqual(dump.anyid_pairs(), SyntheticDump(brs=200, degree=5, seed=1).anyid_pairs())
+        self.assertNotEqual(dump.anyid_pairs(), SyntheticDump(brs=200, degree=5, seed=2).anyid_pairs())
+        # Only older BRs are cited, and some DOIs are not in Meta
+        for citing, cited in dump.citations():
+            if dump.known(cited):
+                self.assertLess(cited, citing)
+                self.assertLessEqual(dump.dates[cited], dump.dates[citing])
+        self.assertLess(len(dump.omid_pairs()), len(dump.anyid_pairs()))
+
+    def test_skew(self):
+        def top_cited(skew):
+            dump = SyntheticDump(brs=500, degree=10, skew=skew)
+            counts = {}
+            for _, cited in dump.citations():
+                counts[cited] = counts.get(cited, 0) + 1
+            return max(counts.values())
+
+        self.assertGreater(top_cited(2.0), top_cited(0))
+
+    def test_meta_dumps(self):
+        # The CSV and the RDF dumps are stored in the same way by meta2redis
+        dump = SyntheticDump(brs=150, degree=3)
+        server = fakeredis.FakeServer()
+        snapshots = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dump.write_meta_csv(join(tmp_dir, "meta.csv"))
+            dump.write_meta_rdf(join(tmp_dir, "rdf"))
+            for kind in ("csv", "rdf"):
+                dbs = []
+                for db in range(3):
+                    redis_db = meta2redis.RedisDB.__new__(meta2redis.RedisDB)
+                    redis_db.rconn = fakeredis.FakeRedis(server=server, db=db, decode_responses=True)
+                    redis_db.rconn.flushdb()
+                    dbs.append(redis_db)
+                if kind == "csv":
+                    with open(join(tmp_dir, "meta.csv"), "rb") as f:
+                        meta2redis._process_csv_file(f, *dbs)
+                else:
+                    meta2redis._entities_by_id.cache_clear()
+                    for filepath in meta2redis._get_rdf_files(join(tmp_dir, "rdf")):
+                        indexes = meta2redis._extract_rdf_indexes(
+                            filepath,
+                            join(tmp_dir, "rdf"),
+                            meta2redis.BASE_IRI,
+                            meta2redis.DIR_SPLIT,
+                            meta2redis.ITEMS_PER_FILE,
+                        )
+                        dbs[0].flush_index(indexes[0])
+                        dbs[1].flush_index(indexes[1])
+                        dbs[2].flush_metadata(indexes[2])
+                snapshots.append(
+                    (
+                        {k: dbs[0].rconn.smembers(k) for k in dbs[0].rconn.scan_iter()},
+                        {k: dbs[1].rconn.smembers(k) for k in dbs[1].rconn.scan_iter()},
+                        {k: json.loads(dbs[2].rconn.get(k)) for k in dbs[2].rconn.scan_iter()},
+                    )
+                )
+        self.assertEqual(snapshots[0], snapshots[1])
+        self.assertEqual(dump.metadata(7), snapshots[0][2][dump.omid(7)])
+        self.assertEqual({dump.omid(7)}, snapshots[0][0][dump.doi(7)])
+
+
+class SuiteTest(unittest.TestCase):
+    def test_run_suite(self):
+        report = run_suite(brs=60, degree=3, repeat=1)
+        self.assertEqual(list(BENCHMARKS), [r["name"] for r in report["results"]])
+        for result in report["results"]:
+            self.assertGreater(result["rows"], 0)
+            self.assertGreater(result["rows_per_second"], 0)
+            self.assertGreaterEqual(result["peak_rss_kb"], result["base_rss_kb"])
+        # The report can be stored as JSON
+        self.assertEqual(report, json.loads(json.dumps(report)))
+
+    def test_unknown_benchmark(self):
+        with self.assertRaises(ValueError):
+            run_suite(["none"])
+
+    def test_compare(self):
+        baseline = {
+            "results": [
+                {"name": "a", "rows_per_second": 100.0},
+                {"name": "b", "rows_per_second": 100.0},
+            ]
+        }
+        report = {
+            "results": [
+                {"name": "a", "rows_per_second": 95.0},
+                {"name": "b", "rows_per_second": 50.0},
+                {"name": "c", "rows_per_second": 10.0},
+            ]
+        }
+        self.assertEqual([("b", 0.5)], compare(report, baseline, tolerance=0.1))
+
+    def test_main(self):
+        # The dump is built from the options of the command line, whose degree is a float
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = join(tmp_dir, "report.json")
+            argv = [
+                "oc.index.benchmark", "-b", "citation", "--brs", "60",
+                "--degree", "2.5", "-r", "1", "-o", output,
+            ]
+            with patch.object(sys, "argv", argv), redirect_stdout(StringIO()):
+                benchmark.main()
+            with open(output, encoding="utf-8") as f:
+                report = json.load(f)
+        self.assertEqual(2.5, report["dump"]["degree"])
+        self.assertEqual(["citation"], [r["name"] for r in report["results"]])
+        self.assertGreater(report["results"][0]["rows"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
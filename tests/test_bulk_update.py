@@ -0,0 +1,162 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import gzip
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from oc_index.scripts.bulk_update import (
+    DELETE,
+    INSERT,
+    SparqlUpdater,
+    build_update,
+    chunk_key,
+    bulk_update,
+    iter_chunks,
+    iter_input_files,
+    iter_triples,
+)
+from oc_index.utils.tasks import Manifest
+
+TRIPLES = [
+    '<https://w3id.org/oc/index/ci/06%d-062> <http://www.w3.org/ns/prov#atLocation> '
+    '<https://w3id.org/oc/index/coci/> .' % i
+    for i in range(10)
+] + ['<https://w3id.org/oc/index/ci/061-062> <http://www.w3.org/2000/01/rdf-schema#label> '
+     '"a \\"quoted\\" label\\n"@en .']
+
+
+class EndpointHandler(BaseHTTPRequestHandler):
+    """A stand-in SPARQL Update endpoint, storing the requests received and
+    failing the first ones as set in the server."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            if self.server.failures:
+                self.server.failures -= 1
+                status = 503
+            else:
+                self.server.updates.append(body.decode("utf-8"))
+                status = 200 if b"fail" not in body else 400
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class BulkUpdateTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp_dir.name, "input")
+        os.makedirs(os.path.join(self.input_dir, "sub"))
+        with open(os.path.join(self.input_dir, "a.nt"), "w") as f:
+            f.write("# a comment\n\n" + "\n".join(TRIPLES[:6]) + "\n")
+        with gzip.open(os.path.join(self.input_dir, "sub", "b.nt.gz"), "wt") as f:
+            f.write("\n".join(TRIPLES[6:]) + "\n")
+        with open(os.path.join(self.input_dir, "c.txt"), "w") as f:
+            f.write(TRIPLES[0])
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), EndpointHandler)
+        self.server.lock = threading.Lock()
+        self.server.updates = []
+        self.server.failures = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.updater = SparqlUpdater(
+            "http://127.0.0.1:%d/sparql" % self.server.server_port, retries=3, backoff=0.01
+        )
+        self.files = iter_input_files(self.input_dir)
+
+    def tearDown(self):
+        self.updater.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp_dir.cleanup()
+
+    def sent_triples(self):
+        triples = []
+        for update in self.server.updates:
+            triples.extend(line for line in update.splitlines() if line.endswith(" ."))
+        return triples
+
+    def test_read(self):
+        self.assertEqual(
+            [os.path.join(self.input_dir, "a.nt"), os.path.join(self.input_dir, "sub", "b.nt.gz")],
+            self.files,
+        )
+        self.assertEqual(
+            [t.encode("utf-8") for t in TRIPLES],
+            [t for path in self.files for t in iter_triples(path)],
+        )
+        triples = [b"x" * 10] * 5
+        self.assertEqual([3, 2], [len(c) for c in iter_chunks(triples, 3, 1000)])
+        self.assertEqual([2, 2, 1], [len(c) for c in iter_chunks(triples, 3, 22)])
+        self.assertEqual([1] * 5, [len(c) for c in iter_chunks(triples, 3, 5)])
+        self.assertEqual(
+            b"DELETE DATA {\nGRAPH <https://w3id.org/oc/index/> {\n<a> <b> <c> .\n}\n}",
+            build_update(DELETE, [b"<a> <b> <c> ."], "https://w3id.org/oc/index/"),
+        )
+
+    def test_bulk_update(self):
+        self.server.failures = 2
+        self.assertEqual(
+            (4, 11),
+            bulk_update(self.updater, INSERT, self.files, "https://w3id.org/oc/index/", workers=3, max_triples=3),
+        )
+        self.assertEqual(4, len(self.server.updates))
+        self.assertTrue(
+            all(u.startswith("INSERT DATA {\nGRAPH <https://w3id.org/oc/index/> {") for u in self.server.updates)
+        )
+        self.assertEqual(sorted(TRIPLES), sorted(self.sent_triples()))
+
+    def test_retries(self):
+        self.server.failures = 10
+        with self.assertRaises(requests.HTTPError):
+            self.updater.update(b"INSERT DATA { <a> <b> <c> . }")
+        self.assertEqual([], self.server.updates)
+
+        self.server.failures = 0
+        with self.assertRaises(requests.HTTPError):
+            self.updater.update(b"INSERT DATA { <a> <b> <fail> . }")
+        self.assertEqual(1, len(self.server.updates))
+
+    def test_manifest(self):
+        manifest_path = os.path.join(self.tmp_dir.name, "manifest.txt")
+        manifest = Manifest(manifest_path, {"max_triples": 3, "max_bytes": 1000})
+        manifest.add(chunk_key(DELETE, self.files[0], 1))
+        manifest.close()
+
+        manifest = Manifest(manifest_path, {"max_triples": 3, "max_bytes": 1000})
+        self.assertEqual(
+            (3, 8),
+            bulk_update(self.updater, DELETE, self.files, manifest=manifest, workers=2, max_triples=3),
+        )
+        manifest.close()
+        self.assertEqual(sorted(TRIPLES[:3] + TRIPLES[6:]), sorted(self.sent_triples()))
+
+        # Everything is done, nothing is sent again
+        manifest = Manifest(manifest_path, {"max_triples": 3, "max_bytes": 1000})
+        self.assertEqual(4, len(manifest.done))
+        self.assertEqual(
+            (0, 0),
+            bulk_update(self.updater, DELETE, self.files, manifest=manifest, workers=2, max_triples=3),
+        )
+        manifest.close()
+        self.assertEqual(3, len(self.server.updates))
+
+        with self.assertRaises(ValueError):
+            Manifest(manifest_path, {"max_triples": 4, "max_bytes": 1000})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import os
+import tempfile
+import unittest
+
+import fakeredis
+
+from oc_index.utils.citation_count import (
+    CitationCounts,
+    load_counts,
+    lookup_counts,
+    parse_member,
+)
+
+
+class CitationCountsTest(unittest.TestCase):
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        self.r_cits = fakeredis.FakeRedis(server=server, db=8, decode_responses=True)
+        self.r_counts = fakeredis.FakeRedis(server=server, db=12, decode_responses=True)
+        self.counts = CitationCounts(self.r_counts, self.r_cits)
+        self.citations = [
+            ("br/062", "coci:br/061"),
+            ("br/062", "doci:br/063"),
+            ("br/063", "coci:br/061"),
+        ]
+
+    def test_parse_member(self):
+        self.assertEqual(("coci", "061"), parse_member("coci:br/061"))
+        self.assertEqual((None, "061"), parse_member("061"))
+        self.assertEqual((None, "061"), parse_member("br/061"))
+
+    def test_add_remove(self):
+        self.assertEqual(3, self.counts.add(self.citations))
+        # Citations already in the index are not counted again
+        self.assertEqual(1, self.counts.add([("br/062", "coci:br/061"), ("064", "061")]))
+        self.assertEqual({"coci:br/061", "doci:br/063"}, self.r_cits.smembers("br/062"))
+        self.assertEqual(
+            [
+                {"out": 3, "out:coci": 2},
+                {"in": 2, "in:coci": 1, "in:doci": 1},
+                {"in": 1, "in:coci": 1, "out": 1, "out:doci": 1},
+                {"in": 1},
+            ],
+            self.counts.get(["omid:br/061", "062", "br/063", "064"]),
+        )
+
+        self.assertEqual(
+            1, self.counts.remove([("br/062", "doci:br/063"), ("br/062", "x")])
+        )
+        self.assertEqual(
+            [
+                {"in": 1, "in:coci": 1, "in:doci": 0},
+                {"in": 1, "in:coci": 1, "out": 0, "out:doci": 0},
+            ],
+            self.counts.get(["062", "063"]),
+        )
+
+    def test_export(self):
+        self.counts.add(self.citations)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "counts.bin")
+            for workers in (1, 2):
+                self.assertEqual(3, self.counts.export(path, workers=workers))
+                counts = load_counts(path)
+                self.assertEqual(
+                    ("omid", "in", "out", "in:coci", "in:doci", "out:coci", "out:doci"),
+                    counts.dtype.names,
+                )
+                self.assertEqual([61, 62, 63], counts["omid"].tolist())
+                self.assertEqual([0, 2, 1], counts["in"].tolist())
+                record = lookup_counts(counts, "omid:br/061")
+                self.assertEqual((61, 0, 2, 0, 0, 2, 0), tuple(record.tolist()))
+                self.assertIsNone(lookup_counts(counts, "064"))
+                del counts
+            with self.assertRaises(ValueError):
+                self.counts.export(path, "xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
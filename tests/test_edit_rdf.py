@@ -0,0 +1,88 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import os
+import tempfile
+import unittest
+from zipfile import ZipFile
+
+from oc_index.scripts.edit_rdf import edit_directory, edit_files
+
+CITATION = (
+    "<https://w3id.org/oc/index/ci/061-062> "
+    "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://purl.org/spar/cito/Citation> .\n"
+    "<https://w3id.org/oc/index/ci/061-062> "
+    "<http://purl.org/spar/cito/hasCitingEntity> <https://w3id.org/oc/meta/br/061> .\n"
+    "<https://w3id.org/oc/index/ci/061-062> "
+    "<http://purl.org/spar/cito/hasCitedEntity> <https://w3id.org/oc/meta/br/062> .\n"
+    "<https://w3id.org/oc/index/ci/061-062> "
+    "<http://purl.org/spar/cito/hasCitationCreationDate> \"2020\" .\n"
+)
+TO_REMOVE = ["hasCitedEntity", "hasCitingEntity"]
+TO_REPLACE = [
+    (
+        "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://purl.org/spar/cito/Citation>",
+        "<http://www.w3.org/ns/prov#atLocation> <https://w3id.org/oc/index/coci/>",
+    ),
+    ("\"2020\"", "\"2021\""),
+]
+EXPECTED = (
+    "<https://w3id.org/oc/index/ci/061-062> "
+    "<http://www.w3.org/ns/prov#atLocation> <https://w3id.org/oc/index/coci/> .\n"
+    "<https://w3id.org/oc/index/ci/061-062> "
+    "<http://purl.org/spar/cito/hasCitationCreationDate> \"2021\" .\n"
+)
+
+
+class EditRDFTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp_dir.name, "input")
+        os.makedirs(self.input_dir)
+        with open(os.path.join(self.input_dir, "a.ttl"), "w") as f:
+            f.write(CITATION)
+        with open(os.path.join(self.input_dir, "a.txt"), "w") as f:
+            f.write(CITATION)
+        with ZipFile(os.path.join(self.input_dir, "b.zip"), "w") as archive:
+            archive.writestr("1.ttl", CITATION)
+            archive.writestr("2.ttl", CITATION)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_edit_files(self):
+        output_file = os.path.join(self.tmp_dir.name, "a.ttl")
+        edit_files(os.path.join(self.input_dir, "a.ttl"), output_file, TO_REMOVE, TO_REPLACE)
+        with open(output_file) as f:
+            self.assertEqual(EXPECTED, f.read())
+
+        edit_files(os.path.join(self.input_dir, "a.ttl"), output_file, [], [])
+        with open(output_file) as f:
+            self.assertEqual(CITATION, f.read())
+
+    def test_edit_directory(self):
+        for workers, to_zip in ((1, False), (2, True)):
+            out_dir = os.path.join(self.tmp_dir.name, "out%d" % workers)
+            self.assertEqual(
+                ["a.ttl", "b.zip"],
+                sorted(edit_directory(self.input_dir, out_dir, TO_REMOVE, TO_REPLACE, workers, to_zip)),
+            )
+            if to_zip:
+                self.assertEqual(["a.zip", "b.zip"], sorted(os.listdir(out_dir)))
+                with ZipFile(os.path.join(out_dir, "a.zip")) as archive:
+                    self.assertEqual(EXPECTED, archive.read("a.ttl").decode("utf-8"))
+            else:
+                self.assertEqual(["a.ttl", "b.zip"], sorted(os.listdir(out_dir)))
+                with open(os.path.join(out_dir, "a.ttl")) as f:
+                    self.assertEqual(EXPECTED, f.read())
+            with ZipFile(os.path.join(out_dir, "b.zip")) as archive:
+                self.assertEqual(["1.ttl", "2.ttl"], sorted(archive.namelist()))
+                for member in archive.namelist():
+                    self.assertEqual(EXPECTED, archive.read(member).decode("utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import copy
+import random
+import unittest
+from os.path import join
+
+from oc_index.finder.base import OMIDResourceFinder, ResourceFinderHandler
+from oc_index.utils import config
+
+
+class DictDataSource(object):
+    """A stand-in datasource counting the mget calls."""
+
+    def __init__(self, data):
+        self.data = data
+        self.mget_calls = 0
+
+    def mget(self, resources_id):
+        self.mget_calls += 1
+        return {i: copy.deepcopy(self.data.get(i)) for i in resources_id}
+
+
+class CountingFinder(OMIDResourceFinder):
+    """An OMID finder counting the ids it is asked."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.calls = 0
+
+    def get_pub_date(self, id_string):
+        self.calls += 1
+        return super().get_pub_date(id_string)
+
+    def get_container_issn(self, id_string):
+        self.calls += 1
+        return super().get_container_issn(id_string)
+
+
+class ResourceFinderHandlerTest(unittest.TestCase):
+    def setUp(self):
+        # The previous config is restored afterwards
+        self.config_state = dict(config._state)
+        config.reset_config()
+        config.get_config(join("tests", "config.ini"))
+
+        rng = random.Random(3)
+        self.ids = ["omid:br/06%d" % i for i in range(60)]
+        self.finder_data = []
+        for _ in range(3):
+            data = {}
+            for id_string in rng.sample(self.ids, 25):
+                data[id_string] = {
+                    "date": rng.choice([None, "2020", ["2019", "2021-01"]]),
+                    "issn": rng.sample(["1111-1111", "2222-2222", "3333-3333"], rng.randint(0, 2)),
+                    "valid": True,
+                    "orcid": [],
+                    "citations": None,
+                }
+            self.finder_data.append(data)
+        # The data of the datasource are used before the support data of the finders
+        self.datasource_data = {
+            id_string: {"date": "1999", "issn": ["4444-4444"], "valid": True}
+            for id_string in rng.sample(self.ids, 10)
+        }
+        self.pairs = [tuple(rng.sample(self.ids, 2)) for _ in range(80)]
+
+    def tearDown(self):
+        config._state.clear()
+        config._state.update(self.config_state)
+
+    def handler(self, datasource=None):
+        return ResourceFinderHandler(
+            [CountingFinder(copy.deepcopy(data)) for data in self.finder_data], datasource
+        )
+
+    def test_get_dates(self):
+        expected = {i: self.handler().get_date(i) for i in self.ids}
+        handler = self.handler()
+        self.assertEqual(expected, handler.get_dates(self.ids + self.ids[:10]))
+        # Each finder is asked only the ids not found by the previous ones, once each
+        for idx, finder in enumerate(handler.resource_finders):
+            self.assertEqual(
+                sum(
+                    1
+                    for i in self.ids
+                    if not any(
+                        (data.get(i) or {}).get("date") for data in self.finder_data[:idx]
+                    )
+                ),
+                finder.calls,
+            )
+
+    def test_share_issn_many(self):
+        handler = self.handler()
+        expected = [handler.share_issn(a, b) for a, b in self.pairs]
+        handler = self.handler()
+        self.assertEqual(expected, handler.share_issn_many(self.pairs))
+        for finder in handler.resource_finders:
+            self.assertLessEqual(finder.calls, len(self.ids))
+
+    def test_datasource(self):
+        datasource = DictDataSource(self.datasource_data)
+        handler = self.handler(datasource)
+        dates = handler.get_dates(self.ids)
+        self.assertEqual(1, datasource.mget_calls)
+        for id_string in self.datasource_data:
+            self.assertEqual("1999", dates[id_string])
+        result = handler.share_issn_many(self.pairs)
+        self.assertEqual(2, datasource.mget_calls)
+        for (a, b), (shared, _, __) in zip(self.pairs, result):
+            if a in self.datasource_data and b in self.datasource_data:
+                self.assertTrue(shared)
+        # The support data of the finders are restored
+        for finder, data in zip(handler.resource_finders, self.finder_data):
+            self.assertEqual(data, finder._data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import csv
+import gzip
+import os
+import tempfile
+import unittest
+from zipfile import ZipFile
+
+from oc_index.scripts.gen_source_rdf import process_directory
+from oc_index.scripts.rdfsource2csv import (
+    process_directory as rdfsource2csv,
+    process_ttl_file,
+)
+
+CITATION = (
+    "<https://w3id.org/oc/index/ci/%s> "
+    "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type> "
+    "<http://purl.org/spar/cito/Citation> .\n"
+    "<https://w3id.org/oc/index/ci/%s> "
+    "<http://purl.org/spar/cito/hasCitingEntity> <https://w3id.org/oc/meta/br/061> .\n"
+)
+
+
+class GenSourceRDFTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp_dir.name, "input")
+        os.makedirs(self.input_dir)
+        with open(os.path.join(self.input_dir, "a.ttl"), "w") as f:
+            # The same citation twice, a single atLocation is created
+            f.write(CITATION % ("061-062", "061-062") * 2)
+            f.write(CITATION % ("061-063", "061-063"))
+        with ZipFile(os.path.join(self.input_dir, "b.zip"), "w") as archive:
+            archive.writestr("1.ttl", CITATION % ("064-065", "064-065"))
+            archive.writestr("2.ttl", "")
+            archive.writestr("3.txt", CITATION % ("066-067", "066-067"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self, path, compress):
+        if compress:
+            with gzip.open(path + ".gz", "rt") as f:
+                return f.read()
+        with open(path) as f:
+            return f.read()
+
+    def test_process_directory(self):
+        for workers, compress in ((1, False), (2, False), (2, True)):
+            output_dir = os.path.join(self.tmp_dir.name, "out%d%d" % (workers, compress))
+            self.assertEqual(
+                3, process_directory(self.input_dir, "CROCI", output_dir, workers, compress)
+            )
+            self.assertEqual(
+                sorted(
+                    f + (".gz" if compress else "")
+                    for f in ("a-croci.ttl", "a-croci.csv", "b_1-croci.ttl", "b_1-croci.csv")
+                ),
+                sorted(os.listdir(output_dir)),
+            )
+            self.assertEqual(
+                "<https://w3id.org/oc/index/ci/061-062> "
+                "<http://www.w3.org/ns/prov#atLocation> <https://w3id.org/oc/index/croci/> .\n"
+                "<https://w3id.org/oc/index/ci/061-063> "
+                "<http://www.w3.org/ns/prov#atLocation> <https://w3id.org/oc/index/croci/> .\n",
+                self.read(os.path.join(output_dir, "a-croci.ttl"), compress),
+            )
+            self.assertEqual(
+                [["citation", "source"], ["064-065", "croci"]],
+                list(csv.reader(
+                    self.read(os.path.join(output_dir, "b_1-croci.csv"), compress).splitlines()
+                )),
+            )
+
+    def test_rdfsource2csv(self):
+        process_directory(self.input_dir, "croci", self.input_dir)
+        with ZipFile(os.path.join(self.input_dir, "c.zip"), "w") as archive:
+            for name in ("a-croci.ttl", "b_1-croci.ttl"):
+                archive.write(os.path.join(self.input_dir, name), name)
+
+        self.assertEqual(
+            [("061-062", "croci"), ("061-063", "croci")],
+            process_ttl_file(self.read(os.path.join(self.input_dir, "a-croci.ttl"), False)),
+        )
+        for workers, compress in ((1, False), (2, True)):
+            output_dir = os.path.join(self.tmp_dir.name, "csv%d" % workers)
+            self.assertEqual(3, rdfsource2csv(self.input_dir, output_dir, workers, compress))
+            self.assertEqual(
+                ["b.csv", "c.csv"],
+                sorted(f.replace(".gz", "") for f in os.listdir(output_dir)),
+            )
+            self.assertEqual(
+                [
+                    ["citation", "source"],
+                    ["061-062", "croci"],
+                    ["061-063", "croci"],
+                    ["064-065", "croci"],
+                ],
+                list(csv.reader(
+                    self.read(os.path.join(output_dir, "c.csv"), compress).splitlines()
+                )),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
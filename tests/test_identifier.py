@@ -148,6 +148,22 @@ class IdentifierManagerTest(unittest.TestCase):
             self.invalid_orcid_3, om.normalise(self.invalid_orcid_3.replace("-", "  "))
         )
 
+    def test_normalise_many(self):
+        for manager, ids in (
+            (DOIManager(), [self.valid_doi_1, "https://doi.org/" + self.valid_doi_2.upper(), None]),
+            (PMIDManager(), [self.valid_pmid_1, "pmid:000" + self.valid_pmid_2, "a"]),
+            (ISSNManager(), [self.valid_issn_1, self.valid_issn_2.replace("-", " "), None]),
+            (ORCIDManager(), [self.valid_orcid_1, self.valid_orcid_2.replace("-", ""), None]),
+        ):
+            ids = ids * 3
+            for include_prefix in (False, True):
+                expected = [manager.normalise(i, include_prefix) for i in ids]
+                self.assertEqual(expected, manager.normalise_many(ids, include_prefix))
+                self.assertEqual(expected, manager.normalise_many(iter(ids), include_prefix))
+                self.assertEqual(
+                    expected, manager.normalise_many(ids, include_prefix, memo=False)
+                )
+
     def test_orcid_is_valid(self):
         om = ORCIDManager()
         self.assertTrue(om.is_valid(self.valid_orcid_1))
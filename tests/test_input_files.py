@@ -0,0 +1,119 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import gzip
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+from zipfile import ZipFile
+
+import zstandard as zstd
+
+from oc_index.utils.input_files import iter_input_files, open_zst, zst_frames
+
+CONTENTS = {
+    "a.json": b'{"id": "a"}\n',
+    "sub/b.json": b'{"id": "b"}\n',
+    "c.csv": b"id\nc\n",
+}
+
+
+class InputFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_all(self, path, req_type=".json", workers=1):
+        return {
+            os.path.basename(f.name): f.read()
+            for f in iter_input_files(path, req_type, workers)
+        }
+
+    def make_tar(self):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as archive:
+            for name, content in sorted(CONTENTS.items()):
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                archive.addfile(info, io.BytesIO(content))
+            archive.addfile(tarfile.TarInfo(".hidden.json"), io.BytesIO())
+        return buffer.getvalue()
+
+    def test_directory(self):
+        input_dir = os.path.join(self.root, "input")
+        os.makedirs(os.path.join(input_dir, "sub"))
+        with open(os.path.join(input_dir, "a.json"), "wb") as f:
+            f.write(CONTENTS["a.json"])
+        with gzip.open(os.path.join(input_dir, "sub", "b.json.gz"), "wb") as f:
+            f.write(CONTENTS["sub/b.json"])
+        with open(os.path.join(input_dir, "d.json.zst"), "wb") as f:
+            f.write(zstd.ZstdCompressor().compress(b'{"id": "d"}\n'))
+        with open(os.path.join(input_dir, "c.csv"), "wb") as f:
+            f.write(CONTENTS["c.csv"])
+        self.assertEqual(
+            {
+                "a.json": CONTENTS["a.json"],
+                "b.json.gz": CONTENTS["sub/b.json"],
+                "d.json.zst": b'{"id": "d"}\n',
+            },
+            self.read_all(input_dir),
+        )
+        self.assertEqual({"c.csv": CONTENTS["c.csv"]}, self.read_all(input_dir, ".csv"))
+
+    def test_archives(self):
+        expected = {"a.json": CONTENTS["a.json"], "b.json": CONTENTS["sub/b.json"]}
+        tar = self.make_tar()
+
+        targz = os.path.join(self.root, "dump.tar.gz")
+        with open(targz, "wb") as f:
+            f.write(gzip.compress(tar))
+        self.assertEqual(expected, self.read_all(targz))
+
+        tarzst = os.path.join(self.root, "dump.tar.zst")
+        with open(tarzst, "wb") as f:
+            f.write(zstd.ZstdCompressor().compress(tar))
+        self.assertEqual(expected, self.read_all(tarzst))
+
+        zip_path = os.path.join(self.root, "dump.zip")
+        with ZipFile(zip_path, "w") as archive:
+            for name, content in CONTENTS.items():
+                archive.writestr(name, content)
+        self.assertEqual(expected, self.read_all(zip_path))
+        self.assertEqual({"c.csv": CONTENTS["c.csv"]}, self.read_all(zip_path, ".csv"))
+
+        # No file is extracted on disk
+        self.assertEqual(
+            ["dump.tar.gz", "dump.tar.zst", "dump.zip"], sorted(os.listdir(self.root))
+        )
+
+    def test_multi_frame_zst(self):
+        lines = [b'{"id": %d}\n' % i for i in range(20000)]
+        content = b"".join(lines)
+        path = os.path.join(self.root, "dump.json.zst")
+        compressor = zstd.ZstdCompressor(write_checksum=True)
+        with open(path, "wb") as f:
+            for start in range(0, len(content), 10000):
+                f.write(compressor.compress(content[start : start + 10000]))
+            # A skippable frame
+            f.write((0x184D2A50).to_bytes(4, "little") + (3).to_bytes(4, "little") + b"abc")
+            f.write(compressor.compress(b"last\n"))
+        self.assertEqual(len(range(0, len(content), 10000)) + 1, len(zst_frames(path)))
+
+        for workers in (1, 3):
+            with open_zst(path, workers) as f:
+                self.assertEqual(lines + [b"last\n"], list(f))
+            self.assertEqual(
+                {"dump.json.zst": content + b"last\n"}, self.read_all(path, workers=workers)
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import io
+import json
+import unittest
+
+from oc_index.utils.json_stream import iter_json_array, json_loads
+
+
+class JsonStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.items = [
+            {"DOI": "10.1/a", "title": 'é "]}\\', "other": "\\\\\\\""},
+            1,
+            -2.5e3,
+            "str,]",
+            None,
+            True,
+            [],
+            {},
+            [[1], [2, {"a": "[{"}]],
+            "\\",
+        ]
+        self.doc = {"before": 'x\\"]}', "list": [1, {"c": "[{"}], "items": self.items, "after": 1}
+
+    def read(self, data, key=None, chunk_size=1 << 20):
+        return [json_loads(e) for e in iter_json_array(io.BytesIO(data), key, chunk_size)]
+
+    def test_iter_json_array(self):
+        for chunk_size in (1, 2, 7, 64, 1 << 20):
+            for indent in (None, 2):
+                data = json.dumps(self.doc, indent=indent, ensure_ascii=False).encode()
+                self.assertEqual(self.items, self.read(data, "items", chunk_size))
+                data = json.dumps(self.items, indent=indent).encode()
+                self.assertEqual(self.items, self.read(data, None, chunk_size))
+
+    def test_empty(self):
+        self.assertEqual([], self.read(b'{"other": [1, 2]}', "items"))
+        self.assertEqual([], self.read(b'{"items": [ ] }', "items"))
+        self.assertEqual([], self.read(b"[]"))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.read(b'{"items": [{"a": 1}, {"b"', "items")
+        with self.assertRaises(ValueError):
+            self.read(b'{"items": 1}', "items")
+        with self.assertRaises(ValueError):
+            self.read(b"[1, 2]", "items")
+
+
+if __name__ == "__main__":
+    unittest.main()
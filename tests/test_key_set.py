@@ -0,0 +1,64 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import random
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from oc_index.utils.key_set import HASHED, KeySet, pair_keys, row_keys
+
+
+class KeySetTest(unittest.TestCase):
+    def test_pair_keys(self):
+        keys = pair_keys(
+            pd.Series([1, "2", "", 1, 2**31]), pd.Series([4972128, "3", "x", 4972128, 1])
+        )
+        self.assertEqual(1 << 32 | 4972128, keys[0])
+        self.assertEqual(2 << 32 | 3, keys[1])
+        self.assertEqual(keys[0], keys[3])
+        # Not packable, hashed
+        self.assertTrue(keys[2] & HASHED)
+        self.assertTrue(keys[4] & HASHED)
+        self.assertEqual(4, len(set(keys.tolist())))
+
+    def test_row_keys(self):
+        keys = row_keys(pd.DataFrame({"a": [1, 1, 2], "b": ["x", "x", "x"]}))
+        self.assertEqual(keys[0], keys[1])
+        self.assertNotEqual(keys[0], keys[2])
+
+        # The same row gets the same key whatever the dtypes inferred for a chunk
+        chunks = (
+            pd.DataFrame({"pmid": [1, 2], "year": [2020, 2021], "title": ["x", "y"]}),
+            pd.DataFrame({"pmid": [1, 3], "year": [2020, None], "title": ["x", None]}).fillna(""),
+            pd.DataFrame({"pmid": [1.0], "year": [2020.0], "title": ["x"]}),
+        )
+        keys = [row_keys(chunk)[0] for chunk in chunks]
+        self.assertEqual(1, len(set(keys)))
+        self.assertNotEqual(
+            row_keys(chunks[1])[1], row_keys(pd.DataFrame({"pmid": [3], "year": [0], "title": [""]}))[0]
+        )
+
+    def test_add_new(self):
+        rng = random.Random(3)
+        key_set = KeySet()
+        expected = set()
+        for _ in range(100):
+            keys = [rng.randrange(3000) for _ in range(rng.randrange(200))]
+            new = []
+            for key in keys:
+                new.append(key not in expected)
+                expected.add(key)
+            self.assertEqual(new, key_set.add_new(np.array(keys, dtype=np.uint64)).tolist())
+        self.assertEqual(len(expected), len(key_set))
+        self.assertEqual(
+            [True, False], key_set.contains([min(expected), 3000]).tolist()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import json
+import shutil
+import tempfile
+import unittest
+from os.path import join
+
+from oc_index.scripts.metadata_crossref import process, profile
+
+
+class MetadataCrossrefTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        documents = [
+            {
+                "items": [
+                    {"deposited": {"date-time": "2024-01-01T10:00:00Z"}, "member": 78, "reference": [{}]},
+                    {"deposited": {"date-time": "2024-01-20T10:00:00Z"}, "member": 316},
+                ]
+            },
+            {
+                "message": {
+                    "items": [
+                        {"deposited": {"date-time": "2019-03-01T10:00:00Z"}, "member": 78, "reference": []},
+                        {"member": 1, "reference": [{}, {}]},
+                    ]
+                }
+            },
+        ]
+        for idx, document in enumerate(documents):
+            with open(join(self.tmp_dir, "%d.json" % idx), "w") as f:
+                json.dump(document, f)
+        self.fields = [["deposited", "date-time"], ["member"]]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_profile(self):
+        for workers in (1, 2):
+            report = profile(self.tmp_dir, self.fields, workers).to_dict()
+            self.assertEqual(4, report["items"])
+            self.assertEqual(2, report["items_with_references"])
+            deposited = report["fields"]["deposited=>date-time"]
+            self.assertEqual(3, deposited["count"])
+            self.assertEqual("2019-03-01T10:00:00Z", deposited["min"])
+            self.assertEqual("2024-01-20T10:00:00Z", deposited["max"])
+            self.assertEqual({"2019-03": 1, "2024-01": 2}, deposited["histogram"])
+            member = report["fields"]["member"]
+            self.assertEqual((1, 316), (member["min"], member["max"]))
+            self.assertEqual({"1": 1, "316": 1, "78": 2}, member["histogram"])
+
+    def test_mixed_types(self):
+        # The numbers and the strings of the same field are compared by type first
+        with open(join(self.tmp_dir, "2.json"), "w") as f:
+            json.dump({"items": [{"member": "316"}, {"member": 2.5}]}, f)
+        for workers in (1, 2):
+            member = profile(self.tmp_dir, self.fields, workers).to_dict()["fields"]["member"]
+            self.assertEqual((1, "316"), (member["min"], member["max"]))
+            self.assertEqual(6, member["count"])
+
+    def test_profile_parallel_error(self):
+        # The error of a worker on a malformed file is raised by the caller
+        with open(join(self.tmp_dir, "2.json"), "w") as f:
+            f.write('{"items": [')
+        with self.assertRaises(ValueError):
+            profile(self.tmp_dir, self.fields, workers=2)
+
+    def test_process(self):
+        self.assertEqual(
+            "2024-01-20T10:00:00Z", process(self.tmp_dir, ["deposited", "date-time"])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
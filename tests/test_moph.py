@@ -0,0 +1,113 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import join
+from zipfile import ZipFile
+
+from oc_index.oci.moph import MOPHIndex
+
+
+class StubMOPHLib(object):
+    """In-memory replacement of libmoph.so, mapping each key to its file id and
+    offset. The keys in 'wrong' are reported as found, as it happens when the
+    fingerprint of a key not in the tables collides."""
+
+    def __init__(self, table, wrong=()):
+        self.table = table
+        self.wrong = wrong
+        self.closed = False
+
+    def moph_open(self, moph_dir):
+        return moph_dir.decode("utf-8")
+
+    def moph_size(self, handle):
+        return len(self.table)
+
+    def moph_lookup(self, handle, buffer, ends, n, files, offsets):
+        start = 0
+        for i in range(n):
+            key = buffer[start : ends[i]]
+            if key in self.table:
+                files[i], offsets[i] = self.table[key]
+            elif key in self.wrong:
+                files[i], offsets[i] = 0, 0
+            else:
+                files[i], offsets[i] = MOPHIndex.UINT32_MAX, 0
+            start = ends[i]
+
+    def moph_close(self, handle):
+        self.closed = True
+
+
+class MOPHIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.oci_dir = join(self.tmp_dir, "oci")
+        self.moph_dir = join(self.tmp_dir, "moph")
+        os.makedirs(self.oci_dir)
+        os.makedirs(self.moph_dir)
+
+        members = [
+            ["0200100-0200101", "0200100-0200102"],
+            ["0200103-0200104"],
+        ]
+        table = {}
+        with open(join(self.moph_dir, MOPHIndex.MANIFEST), "w") as manifest:
+            manifest.write("hash\txxh64\nbuckets\t256\n")
+            with ZipFile(join(self.oci_dir, "dump.zip"), "w") as archive:
+                for idx, ocis in enumerate(members):
+                    content = "oci,citing,cited\n"
+                    for oci in ocis:
+                        table[oci.encode("utf-8")] = (idx, len(content))
+                        content += oci + ",x,y\n"
+                    archive.writestr("dump_%d.csv" % idx, content)
+                    manifest.write("file\tdump.zip\tdump_%d.csv\n" % idx)
+        self.lib = StubMOPHLib(table, wrong=(b"0200100-0200103",))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_contains(self):
+        ocis = ["0200100-0200102", "0200100-0200105", "0200103-0200104"]
+        moph = MOPHIndex(self.moph_dir, lib=self.lib)
+        self.assertEqual(3, len(moph))
+        self.assertEqual([True, False, True], moph.contains(ocis))
+        self.assertEqual([], moph.contains([]))
+        self.assertEqual(
+            [("dump.zip", "dump_1.csv", 17), None],
+            moph.locate(["0200103-0200104", "0200100-0200105"]),
+        )
+        moph.close()
+        self.assertTrue(self.lib.closed)
+
+    def test_contains_verified(self):
+        moph = MOPHIndex(self.moph_dir, lib=self.lib)
+        self.assertEqual([True], moph.contains(["0200100-0200103"]))
+
+        moph = MOPHIndex(self.moph_dir, self.oci_dir, lib=self.lib)
+        self.assertEqual(
+            [True, False, True],
+            moph.contains(["0200100-0200101", "0200100-0200103", "0200100-0200102"]),
+        )
+
+    def test_members(self):
+        # Only the members read most recently are kept in memory
+        moph = MOPHIndex(self.moph_dir, self.oci_dir, lib=self.lib, members=1)
+        ocis = ["0200103-0200104", "0200100-0200101", "0200103-0200104", "0200100-0200102"]
+        self.assertEqual([True] * 4, moph.contains(ocis))
+        self.assertEqual(1, len(moph._members))
+        self.assertEqual([True, False], moph.contains(["0200103-0200104", "0200100-0200103"]))
+        self.assertEqual([1], list(moph._members))
+        moph.close()
+        self.assertEqual(0, len(moph._members))
+
+
+if __name__ == "__main__":
+    unittest.main()
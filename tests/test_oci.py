@@ -583,3 +583,26 @@ class CitationTest(unittest.TestCase):
             len(oci_man.lookup.keys()),
             len(set(doi_1 + doi_2 + doi_3 + doi_4 + doi_5 + doi_6)),
         )
+
+    def test_get_ocis(self):
+        citing = ["10.1038/sj.cdd.4401289", "10.1038/sj.cdd.4401289", "10.1002/jrs.5400"]
+        cited = ["10.1096/fj.00-0336fje", "10.1039/c6ra26307k", "10.1234/ßè∂"]
+
+        new_file_path = join("tests", "data", "lookup_batch.csv")
+        if exists(new_file_path):
+            remove(new_file_path)
+        oci_man = OCIManager(lookup_file=new_file_path)
+        ocis = oci_man.get_ocis(citing, cited, "020")
+
+        single_man = OCIManager()
+        self.assertEqual(
+            ocis,
+            [single_man.get_oci(c1, c2, "020") for c1, c2 in zip(citing, cited)],
+        )
+
+        # All the new codes are in the lookup file once the batch is encoded
+        with open(new_file_path, encoding="utf8") as f:
+            lookup = {row["c"]: row["code"] for row in DictReader(f)}
+        remove(new_file_path)
+        self.assertEqual(oci_man.inverse_lookup, lookup)
+        self.assertEqual([], oci_man.get_ocis([], [], "020"))
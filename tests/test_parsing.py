@@ -0,0 +1,106 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import csv
+import tempfile
+import unittest
+from os.path import join
+
+from oc_index.parsing.crossref import CrossrefParser
+from oc_index.parsing.crowdsourced import CrowdsourcedParser
+from oc_index.parsing.datacite import DataciteParser
+from oc_index.parsing.nih import NIHParser
+from oc_index.parsing.scholix import ScholixParser
+
+
+class CitationParserTest(unittest.TestCase):
+    def setUp(self):
+        test_dir = join("tests", "data")
+        self.inputs = [
+            (CrossrefParser, join(test_dir, "crossref_dump.json")),
+            (CrowdsourcedParser, join(test_dir, "croci_dump.csv")),
+            (DataciteParser, join(test_dir, "doci_dump.csv")),
+            (NIHParser, join(test_dir, "noci_dump.csv")),
+            (ScholixParser, join(test_dir, "citations_data_prov.scholix")),
+        ]
+
+    def get_all(self, parser, filename):
+        parser.parse(filename)
+        result = []
+        cit = parser.get_next_citation_data()
+        while cit is not None:
+            result.append(cit)
+            cit = parser.get_next_citation_data()
+        return result
+
+    def test_iter_citations(self):
+        for parser_class, filename in self.inputs:
+            expected = self.get_all(parser_class(), filename)
+            self.assertTrue(expected)
+            self.assertEqual(expected, list(parser_class().iter_citations(filename)))
+
+    def test_next_batch(self):
+        for parser_class, filename in self.inputs:
+            expected = self.get_all(parser_class(), filename)
+            parser = parser_class()
+            parser.parse(filename)
+            batches = []
+            batch = parser.next_batch(3)
+            while batch:
+                self.assertLessEqual(len(batch), 3)
+                batches.extend(batch)
+                batch = parser.next_batch(3)
+            self.assertEqual(expected, batches)
+            self.assertIsNone(parser.get_next_citation_data())
+
+    def test_items(self):
+        for parser_class, filename in self.inputs:
+            parser = parser_class()
+            parser.parse(filename)
+            items = parser.items
+            self.assertGreater(items, 0)
+            self.get_all(parser, filename)
+            self.assertEqual(items, parser.current_item)
+
+    def test_incremental(self):
+        for parser_class, filename in self.inputs[:1] + self.inputs[-1:]:
+            self.assertEqual(
+                list(parser_class(incremental=False).iter_citations(filename)),
+                list(parser_class().iter_citations(filename)),
+            )
+
+    def test_many_invalid_rows(self):
+        # The invalid rows are skipped without recursion
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = join(tmp_dir, "dump.csv")
+            with open(filename, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["citing_id", "cited_id"])
+                for _ in range(5000):
+                    writer.writerow(["not a doi", "not a doi"])
+                writer.writerow(["10.1000/a", "10.1000/b"])
+            parser = CrowdsourcedParser()
+            parser.parse(filename)
+            self.assertEqual(
+                ("10.1000/a", "10.1000/b", None, None, None, None),
+                parser.get_next_citation_data(),
+            )
+            self.assertIsNone(parser.get_next_citation_data())
+            self.assertEqual(5001, parser.current_item)
+            self.assertEqual(5001, parser.items)
+
+    def test_scholix_identifiers(self):
+        parser = ScholixParser()
+        citations = list(
+            parser.iter_citations(join("tests", "data", "citations_data_prov.scholix"))
+        )
+        for citing, cited, _, _, _, _ in citations:
+            self.assertTrue(citing.startswith("10."))
+            self.assertTrue(cited.startswith("10."))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,7 @@
 
 import json
 import unittest
-from oc_index.preprocessing.datacite import DatacitePreProcessing
+from oc_index.preprocessing.datacite import DatacitePreProcessing, MANIFEST, byte_ranges
 from os.path import exists, join
 import os.path
 from os import listdir
@@ -16,6 +16,7 @@ import shutil
 import math
 import glob
 import csv
+import tempfile
 
 
 class PreprocessingTest(unittest.TestCase):
@@ -231,6 +232,58 @@ class PreprocessingTest(unittest.TestCase):
             for nf in new_files:
                 os.remove(nf)
 
+        def _read_outputs(self, output_dir):
+            ids = []
+            for file in glob.glob(join(output_dir, '*.json')):
+                with open(file) as f:
+                    ids.extend(entity["id"] for entity in json.load(f)["data"])
+            citations = []
+            for file in glob.glob(join(output_dir + "_citations", '*.csv')):
+                with open(file, 'r') as read_obj:
+                    csv_reader = csv.reader(read_obj)
+                    next(csv_reader)
+                    citations.extend(tuple(x) for x in csv_reader)
+            return sorted(ids), sorted(citations)
+
+        def test_byte_ranges(self):
+            file = join(self._input_dir_dc, "dc_pp_input.json")
+            ranges = byte_ranges(file, 5000)
+            self.assertTrue(len(ranges) > 1)
+            self.assertEqual(0, ranges[0][0])
+            self.assertEqual(os.path.getsize(file), ranges[-1][1])
+            with open(file, "rb") as f:
+                content = f.read()
+            for (start, end), (next_start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, next_start)
+                self.assertEqual(b"\n", content[end - 1:end])
+
+        def test_citations_preprocessing_parallel(self):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                serial_dir = join(tmp_dir, "serial")
+                DatacitePreProcessing(self._input_dir_cit, serial_dir, 2, self._process_index).split_input()
+                expected = self._read_outputs(serial_dir)
+                self.assertEqual(4, len(expected[1]))
+
+                parallel_dir = join(tmp_dir, "parallel")
+                dc_pp = DatacitePreProcessing(self._input_dir_cit, parallel_dir, 2, self._process_index)
+                dc_pp.split_input_parallel(workers=2, chunk_size=2000, partitions=3)
+                self.assertEqual(expected, self._read_outputs(parallel_dir))
+                for file in glob.glob(join(parallel_dir, '*.json')):
+                    with open(file) as f:
+                        self.assertTrue(len(json.load(f)["data"]) <= 2)
+
+                # The process is interrupted after having processed all but the last chunk
+                manifest = join(parallel_dir, MANIFEST)
+                with open(manifest) as f:
+                    lines = [line for line in f if not line.startswith("partition")]
+                with open(manifest, "w") as f:
+                    f.writelines(lines[:-1])
+                dc_pp.split_input_parallel(workers=2, chunk_size=2000, partitions=3)
+                self.assertEqual(expected, self._read_outputs(parallel_dir))
+
+                with self.assertRaises(ValueError):
+                    dc_pp.split_input_parallel(workers=2, chunk_size=1000, partitions=3)
+
 
 if __name__ == '__main__':
     unittest.main()
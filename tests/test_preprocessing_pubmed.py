@@ -202,3 +202,20 @@ class PubMedPPTest(unittest.TestCase):
 
 
 
+
+    def test_split_input_parallel(self):
+        for input_type, input_dir in ((self.input_type, self.input_dir), (self.input_type_md, self.input_md_dir)):
+            serial_dir = self.__get_output_directory(input_type + "_serial")
+            parallel_dir = self.__get_output_directory(input_type + "_parallel")
+            for directory in (serial_dir, parallel_dir):
+                shutil.rmtree(directory)
+            NIHPreProcessing(input_dir, serial_dir, self.num_2 * 10, input_type).split_input()
+            NIHPreProcessing(input_dir, parallel_dir, self.num_2 * 10, input_type).split_input(workers=3, chunk_size=2000)
+
+            serial_files = sorted(listdir(serial_dir))
+            self.assertEqual(serial_files, sorted(listdir(parallel_dir)))
+            for file in serial_files:
+                with open(join(serial_dir, file)) as serial, open(join(parallel_dir, file)) as parallel:
+                    self.assertEqual(serial.read(), parallel.read())
+            shutil.rmtree(serial_dir)
+            shutil.rmtree(parallel_dir)
@@ -0,0 +1,147 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import json
+import unittest
+from os.path import join
+
+import fakeredis
+import redis
+
+from oc_index.glob import redis as redis_datasource
+from oc_index.glob.redis import RedisDataSource, get_connection_pool
+from oc_index.utils import config
+
+OMID_A = "omid:br/061"
+OMID_B = "omid:br/062"
+OMID_C = "omid:br/063"
+
+
+class RedisDataSourceTest(unittest.TestCase):
+    def setUp(self):
+        # The previous config is restored afterwards
+        self.config_state = dict(config._state)
+        config.reset_config()
+        c = config.get_config(join("tests", "config.ini"))
+        c.set("COCI", "db", "3")
+        self.server = fakeredis.FakeServer()
+        # The shared pools of all the DBs use the fake server
+        host, port = c.get("redis", "host"), c.get("redis", "port")
+        self.pools = dict(redis_datasource._pools)
+        for db in range(16):
+            redis_datasource._pools[(host, int(port), db)] = redis.ConnectionPool(
+                connection_class=fakeredis.FakeRedisConnection, server=self.server, db=db
+            )
+        self.db_br = fakeredis.FakeRedis(server=self.server, db=int(c.get("cnc", "db_br")))
+        self.db_index = fakeredis.FakeRedis(server=self.server, db=int(c.get("INDEX", "db")))
+        self.db_coci = fakeredis.FakeRedis(server=self.server, db=3)
+
+        self.db_br.sadd("doi:10.1000/a", OMID_A)
+        self.db_br.sadd("doi:10.1000/b", OMID_C, OMID_B)
+        self.db_br.sadd("doi:10.1000/nodata", "omid:br/069")
+        self.db_index.set(OMID_A, json.dumps({"date": "2020", "valid": True, "issn": [], "orcid": []}))
+        self.db_index.set(OMID_C, json.dumps({"date": "2021", "valid": True, "issn": [], "orcid": []}))
+        self.db_coci.set("10.1000/a", json.dumps({"date": "2019", "valid": True, "issn": ["1234-5678"], "orcid": []}))
+
+    def tearDown(self):
+        redis_datasource._pools.clear()
+        redis_datasource._pools.update(self.pools)
+        config._state.clear()
+        config._state.update(self.config_state)
+
+    def test_get(self):
+        datasource = RedisDataSource("COCI")
+        self.assertEqual(
+            {"date": "2019", "valid": True, "issn": ["1234-5678"], "orcid": [], "omid": None},
+            datasource.get("10.1000/a"),
+        )
+        self.assertIsNone(datasource.get("10.1000/none"))
+
+    def test_mget_lazy(self):
+        datasource = RedisDataSource("COCI")
+        result = datasource.mget(["10.1000/a", "10.1000/none", "10.1000/a"])
+        self.assertEqual(["10.1000/a", "10.1000/none"], list(result))
+        self.assertIn("10.1000/none", result)
+        self.assertEqual({}, result._decoded)
+        self.assertEqual("2019", result["10.1000/a"]["date"])
+        self.assertIsNone(result["10.1000/none"])
+        # The decoded values are reused
+        self.assertIs(result["10.1000/a"], result["10.1000/a"])
+
+    def test_unified_index(self):
+        datasource = RedisDataSource("COCI", use_unified_index=True)
+        result = datasource.mget(
+            ["doi:10.1000/a", "doi:10.1000/b", "doi:10.1000/nodata", "doi:10.1000/none"]
+        )
+        self.assertEqual("2020", result["doi:10.1000/a"]["date"])
+        self.assertEqual(OMID_A, result["doi:10.1000/a"]["omid"])
+        # The first OMID having data is used
+        self.assertEqual(OMID_C, result["doi:10.1000/b"]["omid"])
+        self.assertIsNone(result["doi:10.1000/nodata"])
+        self.assertIsNone(result["doi:10.1000/none"])
+        self.assertEqual(OMID_A, datasource.get("doi:10.1000/a")["omid"])
+        # The server does not support scripting, so the pipelines are used
+        self.assertFalse(datasource._use_script)
+
+        index = RedisDataSource("INDEX", use_unified_index=True)
+        self.assertEqual("2020", index.get(OMID_A)["date"])
+
+    def test_shared_pool(self):
+        first = RedisDataSource("COCI", use_unified_index=True)
+        second = RedisDataSource("CROCI", use_unified_index=True)
+        self.assertIs(first._rdata.connection_pool, second._rdata.connection_pool)
+        self.assertIs(first._rid.connection_pool, second._rid.connection_pool)
+        c = config.get_config()
+        self.assertIs(
+            first._rdata.connection_pool,
+            get_connection_pool(c.get("redis", "host"), c.get("redis", "port"), c.get("INDEX", "db")),
+        )
+
+    def test_set(self):
+        datasource = RedisDataSource("COCI")
+        value = datasource.get("10.1000/a")
+        value["date"] = "2018"
+        datasource.set("10.1000/a", value)
+        self.assertEqual(
+            {"date": "2018", "valid": True, "issn": ["1234-5678"], "orcid": []},
+            json.loads(self.db_coci.get("10.1000/a")),
+        )
+
+        datasource.set("10.1000/a", {"issn": ["1234-5678", "8765-4321"], "valid": False}, rewrite=False)
+        self.assertEqual(
+            {"date": "2018", "valid": False, "issn": ["1234-5678", "8765-4321"], "orcid": []},
+            json.loads(self.db_coci.get("10.1000/a")),
+        )
+
+        unified = RedisDataSource("COCI", use_unified_index=True)
+        self.assertFalse(unified.set("doi:10.1000/none", {"date": "2000"}))
+        unified.set("doi:10.1000/nodata", {"date": "2000"})
+        self.assertEqual({"date": "2000"}, json.loads(self.db_index.get("omid:br/069")))
+
+    def test_mset(self):
+        datasource = RedisDataSource("COCI")
+        datasource.mset({"10.1000/x": {"date": "2001"}, "10.1000/y": {"date": "2002"}})
+        self.assertEqual("2002", datasource.get("10.1000/y")["date"])
+
+        unified = RedisDataSource("COCI", use_unified_index=True)
+        unified.mset({"doi:10.1000/a": {"date": "2003"}, "doi:10.1000/none": {"date": "2004"}})
+        self.assertEqual({"date": "2003"}, json.loads(self.db_index.get(OMID_A)))
+        self.assertIsNone(self.db_index.get("doi:10.1000/none"))
+        self.assertFalse(unified.mset({"doi:10.1000/none": {"date": "2004"}}))
+
+    def test_scan_all(self):
+        datasource = RedisDataSource("INDEX")
+        self.assertEqual(
+            {OMID_A: "2020", OMID_C: "2021"},
+            {k: v["date"] for k, v in datasource.scan_all(batch_size=1)},
+        )
+        self.assertEqual(
+            [OMID_A], [k for k, _ in datasource.scan_all(match="omid:br/061")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
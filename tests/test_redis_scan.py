@@ -0,0 +1,115 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import csv
+import os
+import tempfile
+import unittest
+
+import fakeredis
+
+from oc_index.scripts.meta2redis import RedisDB
+from oc_index.utils.redis_scan import RedisScanner, prefix_shards, scan_batches, shard_digits
+
+
+class RedisScanTest(unittest.TestCase):
+    def setUp(self):
+        self.r = fakeredis.FakeRedis(decode_responses=True)
+        self.keys = ["06", "0", "06a", "061", "1x", "doi:10.1/a", "0[6", "06*1"]
+        self.keys += ["06%d" % i for i in range(0, 3000, 7)]
+        for key in self.keys:
+            self.r.set(key, "v" + key)
+        self.r.sadd("set:1", "a", "b")
+        self.r.sadd("set:2", "c")
+
+    def test_prefix_shards(self):
+        self.assertEqual(12, len(prefix_shards("br/06")))
+        self.assertEqual(108, len(prefix_shards("06", 2, complete=True)))
+        all_keys = set(self.keys) | {"set:1", "set:2"}
+        for prefix, digits, complete, expected in (
+            ("06", 2, True, all_keys),
+            ("06", 1, False, {k for k in all_keys if k.startswith("06")}),
+            ("0[", 1, True, all_keys),
+        ):
+            scanned = [
+                key
+                for pattern in prefix_shards(prefix, digits, complete)
+                for key in self.r.scan_iter(match=pattern)
+            ]
+            self.assertEqual(len(set(scanned)), len(scanned))
+            self.assertEqual(expected, set(scanned))
+
+    def test_shard_digits(self):
+        # One worker walks the keyspace once
+        self.assertEqual(0, shard_digits(1))
+        self.assertEqual(0, shard_digits(1, 2))
+        self.assertEqual(0, shard_digits(8, 0))
+        self.assertEqual(1, shard_digits(8))
+        self.assertEqual(2, shard_digits(16))
+        self.assertEqual(3, shard_digits(4, 3))
+
+    def test_scan_batches(self):
+        batches = list(scan_batches(self.r, "set:*", "smembers", batch_size=1))
+        self.assertEqual(2, len(batches))
+        self.assertEqual(
+            {"set:1": {"a", "b"}, "set:2": {"c"}},
+            {keys[0]: values[0] for keys, values in batches},
+        )
+        with self.assertRaises(ValueError):
+            list(scan_batches(self.r, fetch="lrange"))
+        with self.assertRaises(ValueError):
+            RedisScanner(self.r, fetch="smismember")
+
+    def test_scanner(self):
+        for workers in (1, 4):
+            scanner = RedisScanner(
+                self.r,
+                prefix_shards("06", 1, complete=True),
+                fetch="get",
+                batch_size=50,
+                workers=workers,
+            )
+            result = {}
+            for keys, values in scanner:
+                self.assertLessEqual(len(keys), 50)
+                result.update(zip(keys, values))
+            self.assertEqual(len(self.keys) + 2, scanner.keys)
+            self.assertEqual("v061", result["061"])
+            self.assertIsNone(result["set:1"])
+
+    def test_scanner_wrong_type(self):
+        scanner = RedisScanner(
+            self.r, ["set:*", "061"], fetch="smismember", members=["a", "c"], workers=2
+        )
+        result = {key: value for keys, values in scanner for key, value in zip(keys, values)}
+        self.assertEqual({"set:1": [1, 0], "set:2": [0, 1], "061": None}, result)
+
+    def test_scanner_stop(self):
+        scanner = RedisScanner(
+            self.r, prefix_shards("06", 2, complete=True), batch_size=1, workers=3
+        )
+        for keys, _ in scanner:
+            break
+        self.assertEqual(1, scanner.keys)
+
+    def test_export_to_csv(self):
+        redis_db = RedisDB.__new__(RedisDB)
+        redis_db.rconn = self.r
+        self.r.sadd("doi:10.1234/test", "omid:br/0601", "omid:br/0602")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "meta_br.csv")
+            for workers in (1, 3):
+                redis_db.export_to_csv(filepath, workers)
+                with open(filepath, newline="") as f:
+                    rows = {row[0]: set(row[1].split("; ")) for row in csv.reader(f)}
+                self.assertEqual(3, len(rows))
+                self.assertEqual(
+                    {"omid:br/0601", "omid:br/0602"}, rows["doi:10.1234/test"]
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
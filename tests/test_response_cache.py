@@ -0,0 +1,89 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import os
+import tempfile
+import time
+import unittest
+
+from oc_index.utils import response_cache
+from oc_index.utils.response_cache import ResponseCache
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cache.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_set(self):
+        cache = ResponseCache(self.path)
+        cache.set("crossref", "doi:10.1/a", {"issued": [2020], "ISSN": ["1234-5678"]})
+        cache.set_many("datacite", {"doi:10.1/a": "text", "doi:10.1/b": [1, 2]})
+        self.assertEqual(
+            (True, {"issued": [2020], "ISSN": ["1234-5678"]}),
+            cache.get("crossref", "doi:10.1/a"),
+        )
+        self.assertEqual((False, None), cache.get("crossref", "doi:10.1/b"))
+        self.assertEqual(
+            {"doi:10.1/a": "text", "doi:10.1/b": [1, 2]},
+            cache.get_many("datacite", ["doi:10.1/a", "doi:10.1/b", "doi:10.1/c"]),
+        )
+        self.assertEqual({"hits": 3, "misses": 2, "entries": 3}, cache.stats())
+        cache.close()
+
+        # The entries are kept between runs
+        cache = ResponseCache(self.path)
+        self.assertEqual((True, "text"), cache.get("datacite", "doi:10.1/a"))
+        cache.close()
+
+    def test_many_ids(self):
+        cache = ResponseCache(self.path)
+        values = {"id%d" % i: i for i in range(2500)}
+        cache.set_many("s", values)
+        self.assertEqual(values, cache.get_many("s", list(values) + ["other"]))
+        cache.close()
+
+    def test_ttl(self):
+        cache = ResponseCache(self.path, ttl=0.2)
+        cache.set("s", "a", 1)
+        self.assertEqual((True, 1), cache.get("s", "a"))
+        time.sleep(0.3)
+        self.assertEqual((False, None), cache.get("s", "a"))
+        cache.evict()
+        self.assertEqual(0, cache.stats()["entries"])
+        cache.close()
+
+        # The entries can have a shorter time to live of their own
+        cache = ResponseCache(self.path)
+        cache.set_many("s", {"a": None, "b": False}, ttl=0.2)
+        cache.set("s", "c", 1)
+        self.assertEqual({"a": None, "b": False, "c": 1}, cache.get_many("s", ["a", "b", "c"]))
+        time.sleep(0.3)
+        self.assertEqual({"c": 1}, cache.get_many("s", ["a", "b", "c"]))
+        cache.evict()
+        self.assertEqual(1, cache.stats()["entries"])
+        cache.close()
+
+    def test_max_entries(self):
+        cache = ResponseCache(self.path, max_entries=100)
+        for i in range(30):
+            cache.set_many("s", {"id%d_%d" % (i, j): j for j in range(50)})
+        # The cache is checked every EVICTION_INTERVAL writes
+        self.assertLessEqual(
+            cache.stats()["entries"], 100 + response_cache.EVICTION_INTERVAL
+        )
+        cache.evict()
+        self.assertEqual(100, cache.stats()["entries"])
+        # The most recent entries are kept
+        self.assertEqual((True, 49), cache.get("s", "id29_49"))
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
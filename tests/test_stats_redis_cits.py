@@ -0,0 +1,78 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import csv
+import os
+import tempfile
+import unittest
+
+import fakeredis
+
+from oc_index.scripts import stats_redis_cits
+from oc_index.utils.sketch import HyperLogLog
+
+
+class HyperLogLogTest(unittest.TestCase):
+    def test_count(self):
+        hll = HyperLogLog()
+        self.assertEqual(0, hll.count())
+        hll.update("br/06%d" % i for i in range(50000))
+        hll.update("br/06%d" % i for i in range(10000))
+        self.assertLess(abs(hll.count() - 50000), 50000 * 0.03)
+
+        other = HyperLogLog()
+        other.update("br/07%d" % i for i in range(50000))
+        hll.merge(other)
+        self.assertLess(abs(hll.count() - 100000), 100000 * 0.03)
+
+
+class StatsRedisCitsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.r = fakeredis.FakeRedis(server=self.server, db=8, decode_responses=True)
+        self.r.sadd("br/061", "coci:br/062", "coci:br/063", "doci:br/062")
+        self.r.sadd("br/064", "coci:br/062")
+        self.r.sadd("br/065", "poci:br/066", "poci:br/067", "coci:br/068", "malformed")
+        self.r.set("ra/061", "x")
+        self.args = stats_redis_cits.parse_args(["--top-n", "2", "--batch-size", "2"])
+
+    def test_compute_stats(self):
+        for counter in (
+            stats_redis_cits.InMemoryUniqueCounter(),
+            stats_redis_cits.RedisUniqueCounter(
+                fakeredis.FakeRedis(server=self.server, db=15, decode_responses=True)
+            ),
+        ):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                csv_path = os.path.join(tmp_dir, "per_key.csv")
+                with open(csv_path, "w", newline="") as f:
+                    stats = stats_redis_cits.compute_stats(
+                        self.r, self.args, counter, csv.writer(f)
+                    )
+                with open(csv_path, newline="") as f:
+                    rows = list(csv.reader(f))
+            counter.close()
+
+            self.assertEqual(3, stats["total_keys"])
+            self.assertEqual(7, stats["total_edges"])
+            self.assertEqual(5, stats["unique_citing_overall"])
+            self.assertEqual({"coci": 4, "doci": 1, "poci": 2}, stats["collection_edge_counts"])
+            self.assertEqual(
+                {"coci": 3, "doci": 1, "poci": 2}, stats["collection_unique_citing_counts"]
+            )
+            self.assertEqual({"1": 1, "3": 2}, stats["citations_per_key_histogram"])
+            self.assertEqual(
+                {"min": 1, "max": 3, "mean": 7 / 3, "median": 3},
+                stats["citations_per_key_stats"],
+            )
+            self.assertEqual(["br/061", "br/065"], [t["key"] for t in stats["top_keys"]])
+            self.assertEqual(7, len(rows))
+            self.assertIn(["br/065", "poci", "br/066"], rows)
+        self.assertEqual([], fakeredis.FakeRedis(server=self.server, db=15).keys())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import gzip
+import io
+import json
+import shutil
+import tarfile
+import tempfile
+import unittest
+from os import listdir, makedirs
+from os.path import join
+
+from oc_index.scripts.trim_crossref import process
+
+
+class TrimCrossrefTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.targz = join(self.tmp_dir, "dump.tar.gz")
+        documents = [
+            {
+                "items": [
+                    {"DOI": "10.1/a", "deposited": {"date-time": "2024-01-01"}, "reference": [{"DOI": "10.1/x"}]},
+                    {"DOI": "10.1/b", "deposited": {"date-time": "2020-01-01"}, "reference": [{"DOI": "10.1/x"}]},
+                    {"DOI": "10.1/c", "deposited": {"date-time": "2024-05-01"}},
+                    {"DOI": "10.1/d", "deposited": {"date-time": "2024-05-01"}, "reference": []},
+                ]
+            },
+            {"items": [{"DOI": "10.1/e", "deposited": {"date-time": "2024-01-01"}}]},
+            {
+                "message": {
+                    "items": [
+                        {"DOI": "10.1/f", "deposited": {"date-time": "2025-01-01"}, "reference": [{"key": "r1"}]},
+                        {"DOI": "10.1/g", "reference": [{"key": "r1"}]},
+                    ]
+                }
+            },
+        ]
+        with tarfile.open(self.targz, "w:gz") as archive:
+            for idx, document in enumerate(documents):
+                content = json.dumps(document).encode("utf-8")
+                info = tarfile.TarInfo("crossref/%d.json" % idx)
+                info.size = len(content)
+                archive.addfile(info, io.BytesIO(content))
+        self.fields = [["deposited", "date-time"]]
+        self.values = [[">=", "2023-01-01"]]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _read_dois(self, output_dir):
+        dois = []
+        for filename in listdir(output_dir):
+            opener = gzip.open if filename.endswith(".gz") else open
+            with opener(join(output_dir, filename), "rt", encoding="utf8") as f:
+                dois.extend(item["DOI"] for item in json.load(f)["items"])
+        return sorted(dois)
+
+    def test_process(self):
+        output_dir = join(self.tmp_dir, "out")
+        n_items = process(self.targz, output_dir, self.fields, self.values)
+        self.assertEqual(3, n_items)
+        self.assertEqual(["0_1.json"], listdir(output_dir))
+        self.assertEqual(["10.1/a", "10.1/f", "10.1/g"], self._read_dois(output_dir))
+
+    def test_process_parallel_compressed(self):
+        output_dir = join(self.tmp_dir, "out_gz")
+        n_items = process(
+            self.targz, output_dir, self.fields, self.values, workers=2, compress=True
+        )
+        self.assertEqual(3, n_items)
+        self.assertTrue(all(f.endswith(".json.gz") for f in listdir(output_dir)))
+        self.assertEqual(["10.1/a", "10.1/f", "10.1/g"], self._read_dois(output_dir))
+
+    def test_process_parallel_error(self):
+        # The error of a worker on a malformed file is raised by the caller
+        input_dir = join(self.tmp_dir, "malformed")
+        makedirs(input_dir)
+        for idx in range(5):
+            with open(join(input_dir, "%d.json" % idx), "w", encoding="utf8") as f:
+                f.write('{"items": [{"reference": [}' if idx == 2 else '{"items": []}')
+        with self.assertRaises(ValueError):
+            process(input_dir, join(self.tmp_dir, "out_err"), self.fields, self.values, workers=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import csv
+import io
+import itertools
+import os
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+from zipfile import ZipFile
+
+import fakeredis
+
+from oc_index.scripts.ts_source_stats import (
+    COLLECTIONS,
+    count_dump,
+    count_redis,
+    main,
+)
+
+
+class SourceStatsTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        # citation (citing, cited) -> collections it belongs to
+        self.citations = {}
+        for _ in range(300):
+            citation = ("06%d" % rng.randint(1, 40), "06%d" % rng.randint(1, 40))
+            self.citations.setdefault(citation, set()).update(
+                rng.sample(COLLECTIONS, rng.randint(1, 3))
+            )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def check(self, counter):
+        for size in range(1, len(COLLECTIONS) + 1):
+            for combination in itertools.combinations(COLLECTIONS, size):
+                self.assertEqual(
+                    sum(
+                        1
+                        for colls in self.citations.values()
+                        if colls.issuperset(combination)
+                    ),
+                    counter.combination_count(combination),
+                )
+        for collection in COLLECTIONS:
+            self.assertEqual(
+                sum(1 for colls in self.citations.values() if colls == {collection}),
+                counter.only_count(collection),
+            )
+
+    def test_redis(self):
+        r = fakeredis.FakeRedis(decode_responses=True)
+        for (citing, cited), collections in self.citations.items():
+            r.sadd("br/" + cited, *(c + ":br/" + citing for c in collections))
+        r.sadd("br/0699", "croci:br/061")
+        for workers in (1, 3):
+            self.check(count_redis(r, workers, 1))
+
+    def write_dump(self):
+        ttl_path = os.path.join(self.tmp_dir.name, "source.zip")
+        csv_path = os.path.join(self.tmp_dir.name, "source.csv")
+        ttl_lines = []
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["citation", "source"])
+            for idx, ((citing, cited), collections) in enumerate(self.citations.items()):
+                for pos, collection in enumerate(sorted(collections)):
+                    oci = citing + "-" + cited
+                    # The collections of a citation are split between the files
+                    if (idx + pos) % 2:
+                        writer.writerow([oci, collection])
+                    else:
+                        ttl_lines.append(
+                            "<https://w3id.org/oc/index/ci/%s> "
+                            "<http://www.w3.org/ns/prov#atLocation> "
+                            "<https://w3id.org/oc/index/%s/> .\n" % (oci, collection)
+                        )
+        with ZipFile(ttl_path, "w") as archive:
+            archive.writestr("source.ttl", "".join(ttl_lines))
+
+    def run_main(self, *args):
+        output = os.path.join(self.tmp_dir.name, "combinations.csv")
+        only_output = os.path.join(self.tmp_dir.name, "only.csv")
+        argv = ["ts_source_stats", "--output", output, "--only-output", only_output]
+        with mock.patch("sys.argv", argv + list(args)), redirect_stdout(io.StringIO()):
+            main()
+        with open(output, newline="") as f:
+            combinations = {row["combination"]: row["count"] for row in csv.DictReader(f)}
+        with open(only_output, newline="") as f:
+            only = {row["collection"]: row["count"] for row in csv.DictReader(f)}
+        return combinations, only
+
+    def test_dump(self):
+        self.write_dump()
+        for workers, partitions in ((1, 1), (1, 3), (2, 4)):
+            self.check(count_dump(self.tmp_dir.name, workers, partitions))
+
+    def test_dump_error(self):
+        # The error of a worker is raised by the caller
+        self.write_dump()
+        with mock.patch(
+            "oc_index.scripts.ts_source_stats.count_locations", side_effect=ValueError
+        ):
+            with self.assertRaises(ValueError):
+                count_dump(self.tmp_dir.name, 2, 4)
+
+    def test_main(self):
+        self.write_dump()
+        dump_dir = self.tmp_dir.name
+        combinations, only = self.run_main("--source", dump_dir, "--sizes", "1", "2")
+        self.assertEqual(len(COLLECTIONS) * (len(COLLECTIONS) + 1) // 2, len(combinations))
+        for combination in itertools.combinations(COLLECTIONS, 2):
+            self.assertEqual(
+                str(sum(1 for colls in self.citations.values() if colls.issuperset(combination))),
+                combinations["-".join(combination)],
+            )
+        for collection in COLLECTIONS:
+            self.assertEqual(
+                str(sum(1 for colls in self.citations.values() if colls == {collection})),
+                only[collection],
+            )
+
+    def test_main_sparql(self):
+        with mock.patch("oc_index.scripts.ts_source_stats.run_query", return_value=5) as run_query:
+            combinations, only = self.run_main("--sizes", "1")
+        self.assertEqual(2 * len(COLLECTIONS), run_query.call_count)
+        self.assertEqual({"5"}, set(combinations.values()) | set(only.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!python
+
+# SPDX-FileCopyrightText: 2026 Arcangelo Massari <arcangelo.massari@unibo.it>
+#
+# SPDX-License-Identifier: ISC
+
+import tempfile
+import unittest
+from os.path import join
+
+from oc_index.glob.csv import CSVDataSource
+from oc_index.legacy.csv import CSVManager
+from oc_index.utils import config, value_store
+from oc_index.utils.value_store import ValueStore
+
+
+class ValueStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = join(self.tmp_dir.name, "store.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_add_get(self):
+        store = ValueStore(self.path)
+        store.add("10.1000/a", "date", "2020")
+        store.add_many([("10.1000/a", "issn", "1234-5678"), ("10.1000/a", "issn", "8765-4321")])
+        store.add("10.1000/a", "date", "2020")
+        self.assertEqual(
+            {"date": {"2020"}, "issn": {"1234-5678", "8765-4321"}}, store.get("10.1000/a")
+        )
+        self.assertIsNone(store.get("10.1000/none"))
+        store.close()
+
+        # The values added are written in the database when the store is closed
+        store = ValueStore(self.path)
+        store.add("10.1000/b", "date", "2021")
+        del store
+        store = ValueStore(self.path)
+        self.assertEqual({"2020"}, store.get("10.1000/a")["date"])
+        self.assertEqual({"date": {"2021"}}, store.get("10.1000/b"))
+        store.close()
+
+    def test_get_many(self):
+        store = ValueStore(self.path)
+        ids = ["10.1000/%d" % i for i in range(value_store.MAX_PARAMS * 2)]
+        store.add_many((i, "valid", "v") for i in ids[::2])
+        for lookup in (ids[:10], ids):
+            result = store.get_many(lookup + ["10.1000/none"])
+            self.assertEqual(set(lookup[::2]), set(result))
+            self.assertTrue(all(v == {"valid": {"v"}} for v in result.values()))
+        store.close()
+
+    def test_load_csv(self):
+        csv_path = join(self.tmp_dir.name, "id_date.csv")
+        legacy = CSVManager(csv_path)
+        legacy.add_value("10.1000/a", "2020")
+        legacy.add_value("10.1000/a", "2020-01")
+        legacy.add_value('10.1000/"b"', "2021")
+
+        store = ValueStore(self.path)
+        self.assertEqual(3, store.load_csv("date", csv_path, batch_size=2))
+        # The CSV is loaded again only if it changes
+        self.assertEqual(0, store.load_csv("date", csv_path))
+        for id_string in ("10.1000/a", '10.1000/"b"'):
+            self.assertEqual(legacy.get_value(id_string), store.get(id_string)["date"])
+        self.assertEqual(0, store.load_csv("date", join(self.tmp_dir.name, "none.csv")))
+        store.close()
+
+    def test_csv_paths(self):
+        csv_path = join(self.tmp_dir.name, "id_date.csv")
+        store = ValueStore(self.path, {"date": csv_path})
+        store.add_many([("10.1000/a", "date", "2020"), ('10.1000/"b"', "date", "2021")])
+        store.add("10.1000/a", "valid", "v")
+        store.flush()
+        # Only the new values are appended
+        store.add("10.1000/a", "date", "2020")
+        store.close()
+        self.assertEqual({"2020"}, CSVManager(csv_path).get_value("10.1000/a"))
+        self.assertEqual({"2021"}, CSVManager(csv_path).get_value('10.1000/"b"'))
+        with open(csv_path, encoding="utf8") as f:
+            self.assertEqual(3, len(f.readlines()))
+
+        # The CSV written by the store is in sync, one changed elsewhere is loaded again
+        store = ValueStore(self.path, {"date": csv_path})
+        self.assertEqual(0, store.load_csv("date", csv_path))
+        CSVManager(csv_path).add_value("10.1000/c", "2022")
+        self.assertEqual(3, store.load_csv("date", csv_path))
+        store.add("10.1000/d", "date", "2023")
+        store.close()
+        store = ValueStore(self.path, {"date": csv_path})
+        self.assertEqual(0, store.load_csv("date", csv_path))
+        self.assertEqual({"date": {"2022"}}, store.get("10.1000/c"))
+        store.close()
+
+
+class CSVDataSourceTest(unittest.TestCase):
+    def setUp(self):
+        # The previous config is restored afterwards
+        self.config_state = dict(config._state)
+        config.reset_config()
+        c = config.get_config(join("tests", "config.ini"))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        c.add_section("CSV_T")
+        for option in ("valid_id", "id_date", "id_orcid", "id_issn"):
+            c.set("CSV_T", option, join(self.tmp_dir.name, option + ".csv"))
+        CSVManager(join(self.tmp_dir.name, "valid_id.csv")).add_value("10.1000/a", "v")
+        CSVManager(join(self.tmp_dir.name, "id_date.csv")).add_value("10.1000/a", "2020")
+
+    def tearDown(self):
+        config._state.clear()
+        config._state.update(self.config_state)
+        self.tmp_dir.cleanup()
+
+    def test_datasource(self):
+        datasource = CSVDataSource("CSV_T")
+        self.assertEqual(
+            {"date": {"2020"}, "valid": {"v"}, "issn": None, "orcid": None},
+            datasource.get("10.1000/a"),
+        )
+        datasource.mset(
+            {
+                "10.1000/b": {"valid": True, "date": ["2021"], "issn": ["1234-5678"], "orcid": []},
+                "10.1000/c": {"valid": False},
+            }
+        )
+        result = datasource.mget(["10.1000/b", "10.1000/c", "10.1000/none"])
+        self.assertEqual(
+            {"date": {"2021"}, "valid": {"v"}, "issn": {"1234-5678"}, "orcid": None},
+            result["10.1000/b"],
+        )
+        self.assertEqual({"i"}, result["10.1000/c"]["valid"])
+        self.assertIsNone(result["10.1000/none"])
+        datasource.close()
+
+        # The data are stored next to the CSV files
+        datasource = CSVDataSource("CSV_T")
+        self.assertEqual({"v"}, datasource.get("10.1000/b")["valid"])
+        datasource.close()
+
+        # The new values are in the CSV files too
+        self.assertEqual(
+            {"10.1000/a", "10.1000/b", "10.1000/c"},
+            CSVManager.load_csv_column_as_set(join(self.tmp_dir.name, "valid_id.csv"), "id"),
+        )
+        self.assertEqual(
+            {"1234-5678"}, CSVManager(join(self.tmp_dir.name, "id_issn.csv")).get_value("10.1000/b")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()